@@ -0,0 +1,134 @@
+"""
+Dynamic micro-batching for the /predict endpoint.
+
+Concurrent single-patient requests are queued and a background worker
+scores them together, so the fixed DataFrame + DMatrix + Booster.predict
+cost is paid once per micro-batch instead of once per request.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from prometheus_client import Histogram
+
+MICROBATCH_SIZE = Histogram(
+    "microbatch_batch_size",
+    "Number of /predict requests scored together in one booster call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+)
+MICROBATCH_QUEUE_WAIT = Histogram(
+    "microbatch_queue_wait_seconds",
+    "Time a /predict request waited in the micro-batch queue before scoring",
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+_STOP = object()
+
+
+class _Pending:
+    __slots__ = ("row", "future", "enqueued_at")
+
+    def __init__(self, row):
+        self.row = row
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class MicroBatcher:
+    """
+    Collect rows for up to ``max_wait_ms`` (or ``max_batch_size`` rows) and
+    score them with one ``score_fn`` call.
+
+    ``score_fn`` receives a list of row dicts and must return one score per
+    row, in the same order; if it returns a different number of scores
+    every future in the batch fails. Each caller gets a ``Future`` for its
+    own row, and a row whose future was cancelled before scoring is skipped.
+    """
+
+    def __init__(self, score_fn, max_batch_size=64, max_wait_ms=2.0):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run, name="microbatcher", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, row) -> Future:
+        """Enqueue a single row; the returned future resolves to its score."""
+        pending = _Pending(row)
+        self._queue.put(pending)
+        return pending.future
+
+    def predict(self, row, timeout=None):
+        """
+        Blocking convenience wrapper around :meth:`submit`. Raises
+        ``TimeoutError`` after ``timeout`` seconds, and the row is dropped
+        if it has not been scored yet.
+        """
+        future = self.submit(row)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self, timeout=5.0):
+        """Score anything already queued, then stop the worker thread."""
+        self._queue.put(_STOP)
+        self._thread.join(timeout=timeout)
+
+    def _collect(self):
+        """Block for the first row, then gather more until the window closes."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None, True
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect()
+            if batch:
+                self._score(batch)
+
+    def _score(self, batch):
+        # Rows whose caller gave up (cancelled future) are not scored
+        batch = [p for p in batch if p.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        started = time.monotonic()
+        for pending in batch:
+            MICROBATCH_QUEUE_WAIT.observe(started - pending.enqueued_at)
+        MICROBATCH_SIZE.observe(len(batch))
+
+        try:
+            scores = list(self.score_fn([pending.row for pending in batch]))
+            if len(scores) != len(batch):
+                raise ValueError(
+                    f"score_fn returned {len(scores)} scores for {len(batch)} rows"
+                )
+        except Exception as e:
+            for pending in batch:
+                pending.future.set_exception(e)
+            return
+
+        for pending, score in zip(batch, scores):
+            pending.future.set_result(score)
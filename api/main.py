@@ -1,3 +1,8 @@
+import time
+
+# Process start, so the startup timing breakdown includes the imports
+_BOOT_START = time.perf_counter()
+
 import warnings
 
 # Suppress deprecation warnings from dependencies
@@ -10,21 +15,33 @@ warnings.filterwarnings(
 warnings.filterwarnings("ignore", message="pkg_resources is deprecated")
 warnings.filterwarnings("ignore", category=UserWarning, module="mlflow.*")
 
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 import pandas as pd
-import time
+import json
+import os
 from prometheus_fastapi_instrumentator import Instrumentator
 
-from pipeline.model import load_model
-from pipeline.feature_engineering import prepare_features
+from api.batching import MicroBatcher
+from api.model_watcher import DirectorySource, ModelWatcher, RegistrySource, ServedModel
+from pipeline.model import (
+    load_model_artifacts,
+    load_registered_reference_profile,
+    timed,
+    FEATURE_PIPELINE_PATH,
+    MODEL_NAME,
+    REFERENCE_PROFILE_PATH,
+)
+from pipeline.model_cache import DEFAULT_MODEL_CACHE_DIR, ModelCache
+from pipeline.feature_engineering import FeaturePipeline
 
-from pipeline.schema.data_schema import patient_feature_schema
+from pipeline.schema.data_schema import patient_feature_validator, record_violations
 
-from pipeline.monitor.lineage import log_lineage
-from pipeline.monitor.model_health import log_live_metrics
-from pipeline.monitor.drift import detect_drift
+from pipeline.monitor.lineage import LineageWriter, log_lineage, read_lineage
+from pipeline.monitor.model_health import get_live_metrics_aggregator, log_live_metrics
+from pipeline.monitor.drift import DriftMonitor, load_reference_profile
 
 from pipeline.llm.llm_utils import (
     explain_prediction,
@@ -34,22 +51,146 @@ from pipeline.llm.llm_utils import (
 )
 
 
-import xgboost as xgb
-
 app = FastAPI(title="Readmission Risk Predictor")
 
 # Add Prometheus metrics instrumentation
 instrumentator = Instrumentator()
 instrumentator.instrument(app).expose(app)
 
-# Load model and training data at startup
+# Opt-in pandas-free single-patient scoring (buffer -> Booster.inplace_predict)
+INFERENCE_FAST_PATH = os.getenv("INFERENCE_FAST_PATH", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# Hot-swap: poll the MLflow registry ("registry", MODEL_WATCH_STAGE) or a local
+# directory of versions ("directory", MODEL_WATCH_DIR) for a new model
+MODEL_WATCH = os.getenv("MODEL_WATCH", "")
+MODEL_WATCH_STAGE = os.getenv("MODEL_WATCH_STAGE", "Production")
+MODEL_WATCH_DIR = os.getenv("MODEL_WATCH_DIR", "models")
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "30"))
+
+# Local content-addressed cache of registry models (MODEL_CACHE_DIR="" disables)
+MODEL_CACHE_DIR = os.getenv("MODEL_CACHE_DIR", DEFAULT_MODEL_CACHE_DIR)
+model_cache = ModelCache(MODEL_CACHE_DIR) if MODEL_CACHE_DIR else None
+
+# Load model, fitted feature pipeline and reference distribution profile at
+# startup, timing each phase
+startup_timings = {"imports": time.perf_counter() - _BOOT_START}
 try:
-    model = load_model()
-    TRAIN_DF = pd.read_csv("data/training_snapshot.csv")
+    booster, feature_pipeline, version = load_model_artifacts(
+        stage=MODEL_WATCH_STAGE, cache=model_cache, timings=startup_timings
+    )
+    with timed(startup_timings, "feature_pipeline"):
+        if feature_pipeline is None:
+            feature_pipeline = FeaturePipeline.load(FEATURE_PIPELINE_PATH)
+    with timed(startup_timings, "reference_profile"):
+        reference_profile = None
+        if not version.startswith("local-"):
+            reference_profile = load_registered_reference_profile(MODEL_NAME, version)
+        if reference_profile is None and os.path.exists(REFERENCE_PROFILE_PATH):
+            reference_profile = load_reference_profile(REFERENCE_PROFILE_PATH)
+    with timed(startup_timings, "warm_up"):
+        served_model = ServedModel(
+            booster,
+            feature_pipeline,
+            version,
+            fast_path=INFERENCE_FAST_PATH,
+            reference_profile=reference_profile,
+        ).warm_up()
 except Exception as e:
-    print(f"Warning: Failed to load model or training data: {e}")
-    model = None
-    TRAIN_DF = None
+    print(f"Warning: Failed to load model artifacts: {e}")
+    served_model = None
+startup_timings["total"] = time.perf_counter() - _BOOT_START
+print(
+    "⏱️  Startup: "
+    + ", ".join(f"{phase} {s * 1000:.0f}ms" for phase, s in startup_timings.items())
+)
+
+model_source = None
+if MODEL_WATCH == "registry":
+    model_source = RegistrySource(stage=MODEL_WATCH_STAGE, cache=model_cache)
+elif MODEL_WATCH == "directory":
+    model_source = DirectorySource(MODEL_WATCH_DIR)
+elif MODEL_WATCH:
+    raise ValueError(
+        f"MODEL_WATCH must be 'registry' or 'directory', got {MODEL_WATCH!r}"
+    )
+
+# Background drift monitoring over a rolling window of scored rows: "sketch"
+# keeps per-bucket mergeable sketches of the last DRIFT_WINDOW_SECONDS (default
+# one hour); "exact" keeps the last DRIFT_WINDOW_SIZE raw rows
+DRIFT_METHOD = os.getenv("DRIFT_METHOD", "sketch")
+DRIFT_BUCKET_SECONDS = float(os.getenv("DRIFT_BUCKET_SECONDS", "60"))
+DRIFT_WINDOW_SIZE = int(os.getenv("DRIFT_WINDOW_SIZE", "5000"))
+DRIFT_WINDOW_SECONDS = os.getenv("DRIFT_WINDOW_SECONDS")
+DRIFT_RECOMPUTE_EVERY = int(os.getenv("DRIFT_RECOMPUTE_EVERY", "500"))
+DRIFT_INTERVAL_SECONDS = float(os.getenv("DRIFT_INTERVAL_SECONDS", "60"))
+
+
+def _start_drift_monitor(served):
+    """
+    Drift monitor against ``served``'s reference profile, or None without one.
+    Live rows are featurized with the same fitted pipeline the model scores with.
+    """
+    if served is None or served.reference_profile is None:
+        return None
+    return DriftMonitor(
+        served.reference_profile,
+        transform=served.feature_frame,
+        window_size=DRIFT_WINDOW_SIZE,
+        window_seconds=float(DRIFT_WINDOW_SECONDS) if DRIFT_WINDOW_SECONDS else None,
+        recompute_every=DRIFT_RECOMPUTE_EVERY,
+        interval_seconds=DRIFT_INTERVAL_SECONDS,
+        method=DRIFT_METHOD,
+        bucket_seconds=DRIFT_BUCKET_SECONDS,
+    )
+
+
+def _swap_drift_monitor(served):
+    """After a model swap, measure drift against the new version's reference."""
+    global drift_monitor
+    previous, drift_monitor = drift_monitor, _start_drift_monitor(served)
+    if previous is not None:
+        previous.stop()
+
+
+drift_monitor = _start_drift_monitor(served_model)
+
+# Requests score with model_watcher.current; new versions (with their own
+# feature pipeline and reference profile) are swapped in by its background thread
+model_watcher = ModelWatcher(
+    model_source,
+    current=served_model,
+    interval_seconds=MODEL_WATCH_INTERVAL_SECONDS,
+    fast_path=INFERENCE_FAST_PATH,
+    on_swap=_swap_drift_monitor,
+)
+
+# Upper bound on patients accepted by a single /predict/batch call
+BATCH_MAX_ROWS = int(os.getenv("BATCH_MAX_ROWS", "50000"))
+
+# Opt-in dynamic micro-batching of concurrent /predict calls
+MICROBATCH_ENABLED = os.getenv("MICROBATCH_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("MICROBATCH_MAX_WAIT_MS", "2"))
+MICROBATCH_MAX_ROWS = int(os.getenv("MICROBATCH_MAX_ROWS", "64"))
+# A /predict call waiting longer than this for its micro-batch gets a 503
+MICROBATCH_TIMEOUT_MS = float(os.getenv("MICROBATCH_TIMEOUT_MS", "1000"))
+
+# Asynchronous, batched lineage storage (append-only NDJSON files)
+LINEAGE_DIR = os.getenv("LINEAGE_DIR", "lineage")
+lineage_writer = LineageWriter(
+    directory=LINEAGE_DIR,
+    max_queue=int(os.getenv("LINEAGE_MAX_QUEUE", "10000")),
+    batch_size=int(os.getenv("LINEAGE_BATCH_SIZE", "500")),
+    max_file_bytes=int(os.getenv("LINEAGE_MAX_FILE_MB", "64")) * 1024 * 1024,
+    fsync=os.getenv("LINEAGE_FSYNC", "interval"),
+)
 
 
 class PatientFeatures(BaseModel):
@@ -65,13 +206,62 @@ class PatientFeatures(BaseModel):
 @app.get("/health")
 def health_check():
     """Health check endpoint for monitoring."""
+    served = model_watcher.current
     return {
         "status": "healthy",
-        "model_loaded": model is not None,
-        "training_data_loaded": TRAIN_DF is not None,
+        "model_loaded": served is not None,
+        "model_version": served.version if served is not None else None,
+        "model_loaded_at": served.loaded_at if served is not None else None,
+        "feature_pipeline_loaded": served is not None,
+        "reference_profile_loaded": served is not None
+        and served.reference_profile is not None,
     }
 
 
+@app.get("/drift")
+def drift_report():
+    """Latest drift report computed by the background drift monitor."""
+    monitor = drift_monitor
+    if monitor is None:
+        raise HTTPException(
+            status_code=503,
+            detail="No reference profile for the served model version.",
+        )
+    return monitor.latest()
+
+
+@app.get("/drift/sketch")
+def drift_sketch():
+    """Mergeable drift sketch of the current window, for aggregating replicas."""
+    monitor = drift_monitor
+    if monitor is None:
+        raise HTTPException(
+            status_code=503,
+            detail="No reference profile for the served model version.",
+        )
+    return monitor.sketch_state()
+
+
+@app.get("/lineage")
+def lineage_records(
+    start: str = None, end: str = None, input_hash: str = None, limit: int = 100
+):
+    """
+    Query this replica's lineage records by time range or input hash.
+
+    ``start``/``end`` are ISO times; naive times are taken as UTC.
+    """
+    records = []
+    try:
+        for record in read_lineage(LINEAGE_DIR, start, end, input_hash):
+            records.append(record)
+            if len(records) >= limit:
+                break
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"records": records}
+
+
 @app.get("/metrics")
 def metrics():
     """Prometheus metrics endpoint (exposed by instrumentator)."""
@@ -79,53 +269,90 @@ def metrics():
     pass
 
 
+def _score_micro_batch(rows: list):
+    """
+    Score function for the micro-batcher: one DataFrame, one DMatrix.
+    Each row gets ``(probability, model version)``.
+    """
+    served = model_watcher.current
+    probs = served.predict_rows(pd.DataFrame(rows)).tolist()
+    return [(prob, served.version) for prob in probs]
+
+
+batcher = None
+if MICROBATCH_ENABLED:
+    batcher = MicroBatcher(
+        _score_micro_batch,
+        max_batch_size=MICROBATCH_MAX_ROWS,
+        max_wait_ms=MICROBATCH_MAX_WAIT_MS,
+    )
+
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    if batcher is not None:
+        batcher.stop()
+    model_watcher.stop()
+    if drift_monitor is not None:
+        drift_monitor.stop()
+    lineage_writer.stop()
+    get_live_metrics_aggregator().stop()
+
+
 @app.post("/predict")
 def predict_risk(features: PatientFeatures, request: Request):
-    if model is None:
-        from fastapi import HTTPException
-
+    # One model version for the whole request, even if a swap happens meanwhile
+    served = model_watcher.current
+    if served is None:
         raise HTTPException(
             status_code=503, detail="Model not loaded. Please train the model first."
         )
 
-    if TRAIN_DF is None:
-        from fastapi import HTTPException
-
-        raise HTTPException(
-            status_code=503,
-            detail="Training data not loaded. Please train the model first.",
-        )
+    if served.fast_scorer is not None:
+        # 1-4. Validate, featurize and score without DataFrame/DMatrix
+        row = features.dict()
+        violations = record_violations(row)
+        if violations:
+            raise HTTPException(status_code=422, detail=violations)
+        start_time = time.time()
+        prob = served.fast_scorer.predict(row)
+        inference_time = time.time() - start_time
+        return _respond(features, prob, inference_time, served.version)
 
     # Convert request payload → DataFrame
     df = pd.DataFrame([features.dict()])
 
     # 1. Validate schema
-    df = patient_feature_schema.validate(df)
+    validation = patient_feature_validator.validate(df)
+    if not validation.ok:
+        raise HTTPException(status_code=422, detail=validation.errors())
 
-    # 2. Feature engineering
-    df = prepare_features(df)
-
-    # 3. Drift monitoring (only if we have enough data)
-    if len(df) > 0:
+    if batcher is not None:
+        # 2-4. Featurize and score together with other in-flight requests
+        start_time = time.time()
         try:
-            detect_drift(TRAIN_DF, df)
-        except Exception as e:
-            # Log but don't fail the request if drift detection fails
-            print(f"Drift detection warning: {e}")
-
-    # 4. Prepare features for inference (drop non-feature columns)
-    # The model was trained on features after dropping patient_id and readmitted_30d
-    feature_cols = [
-        col for col in df.columns if col not in ["patient_id", "readmitted_30d"]
-    ]
-    df_features = df[feature_cols]
-
-    # 5. Inference
-    start_time = time.time()
-    dmatrix = xgb.DMatrix(df_features)
-    prob = float(model.predict(dmatrix)[0])
-    inference_time = time.time() - start_time
-
+            prob, version = batcher.predict(
+                features.dict(), timeout=MICROBATCH_TIMEOUT_MS / 1000.0
+            )
+        except TimeoutError:
+            raise HTTPException(
+                status_code=503, detail="Timed out waiting for the scoring queue."
+            )
+        inference_time = time.time() - start_time
+    else:
+        # 2-4. Feature engineering (fitted pipeline) + inference
+        start_time = time.time()
+        prob = served.predict_rows(df)[0]
+        version = served.version
+        inference_time = time.time() - start_time
+
+    return _respond(features, float(prob), inference_time, version)
+
+
+def _respond(
+    features: PatientFeatures, prob: float, inference_time: float, model_version: str
+):
+    """Post-scoring bookkeeping shared by every /predict path."""
     # LLM explanation
     # explanation = explain_prediction(features.dict(), prob)
 
@@ -135,15 +362,164 @@ def predict_risk(features: PatientFeatures, request: Request):
     #  Safety check
     # safety_check = safety_guardrails(features.dict())
 
-    #  Log lineage + live model health
-    log_lineage(features.dict(), prob, model_version="v1")
+    #  Drift window (recomputed in the background) + lineage + live model health
+    monitor = drift_monitor
+    if monitor is not None:
+        monitor.ingest(features.dict())
+    log_lineage(features.dict(), prob, model_version=model_version, sink=lineage_writer)
     log_live_metrics(prob)
 
     return {
         "probability": prob,
         "risk_level": "High" if prob > 0.5 else "Low",
         "inference_time_ms": round(inference_time * 1000, 2),
+        "model_version": model_version,
         # "explanation": explanation,
         # "clinical_summary": summary,
         # "safety_review": safety_check
     }
+
+
+def _parse_batch_body(body: bytes, content_type: str) -> list:
+    """
+    Decode a batch request body into a list of raw records.
+
+    NDJSON bodies (``application/x-ndjson``) are decoded line by line so a
+    malformed line only fails that row; anything else must be a JSON array.
+    Rows that cannot be decoded are returned as the exception instead.
+    """
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        records = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError as e:
+                records.append(e)
+        return records
+
+    payload = json.loads(body)
+    if not isinstance(payload, list):
+        raise ValueError("expected a JSON array of patient records")
+    return payload
+
+
+def _format_validation_error(err: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in e['loc']) or 'record'}: {e['msg']}"
+        for e in err.errors()
+    )
+
+
+def _score_batch(records: list, served: ServedModel) -> dict:
+    """Validate, featurize and score a batch with a single booster call."""
+    results = [None] * len(records)
+
+    # 1. Per-row payload validation
+    rows, row_index = [], []
+    for i, record in enumerate(records):
+        if isinstance(record, Exception):
+            results[i] = {"index": i, "error": f"Invalid JSON: {record}"}
+            continue
+        try:
+            rows.append(PatientFeatures.model_validate(record).dict())
+            row_index.append(i)
+        except ValidationError as e:
+            results[i] = {"index": i, "error": _format_validation_error(e)}
+
+    df = pd.DataFrame(rows, index=row_index, columns=list(PatientFeatures.model_fields))
+
+    # 2. Schema validation over the whole batch; drop only the failing rows
+    if len(df) > 0:
+        validation = patient_feature_validator.validate(df)
+        if validation.dtype_errors:
+            # A column dtype problem comes from single values (e.g. an integer
+            # too large for int64): validate row by row to find the culprits
+            row_errors = {}
+            for position, row in enumerate(rows):
+                errors = patient_feature_validator.validate(
+                    pd.DataFrame([row], columns=df.columns)
+                ).errors()
+                if errors:
+                    row_errors[position] = errors
+        else:
+            row_errors = {
+                position: validation.row_errors(position)
+                for position in validation.invalid_rows
+            }
+        for position, errors in row_errors.items():
+            idx = row_index[position]
+            results[idx] = {"index": idx, "error": "; ".join(errors)}
+        if validation.dtype_errors:
+            # Rebuild so the remaining rows get their proper column dtypes
+            keep = [p for p in range(len(rows)) if p not in row_errors]
+            df = pd.DataFrame(
+                [rows[p] for p in keep],
+                index=[row_index[p] for p in keep],
+                columns=df.columns,
+            )
+        elif row_errors:
+            df = df.drop(index=df.index[list(row_errors)])
+
+    inference_time = 0.0
+    if len(df) > 0:
+        # 3. Feature engineering + one booster call for the whole matrix
+        start_time = time.time()
+        probs = served.predict_rows(df)
+        inference_time = time.time() - start_time
+
+        inputs = dict(zip(row_index, rows))
+        monitor = drift_monitor
+        if monitor is not None:
+            monitor.ingest_many([inputs[idx] for idx in df.index])
+        for idx, prob in zip(df.index, probs.tolist()):
+            results[idx] = {
+                "index": idx,
+                "probability": prob,
+                "risk_level": "High" if prob > 0.5 else "Low",
+            }
+            log_lineage(
+                inputs[idx], prob, model_version=served.version, sink=lineage_writer
+            )
+        log_live_metrics(probs)
+
+    n_errors = sum(1 for r in results if "error" in r)
+    return {
+        "results": results,
+        "n_scored": len(results) - n_errors,
+        "n_errors": n_errors,
+        "inference_time_ms": round(inference_time * 1000, 2),
+        "model_version": served.version,
+    }
+
+
+@app.post("/predict/batch")
+async def predict_batch(request: Request):
+    """
+    Score many patients in one call.
+
+    Accepts a JSON array of ``PatientFeatures`` records, or NDJSON with
+    ``Content-Type: application/x-ndjson``. Results are returned in input
+    order; invalid rows carry an ``error`` instead of failing the batch.
+    """
+    served = model_watcher.current
+    if served is None:
+        raise HTTPException(
+            status_code=503, detail="Model not loaded. Please train the model first."
+        )
+
+    body = await request.body()
+    try:
+        records = _parse_batch_body(body, request.headers.get("content-type", ""))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}")
+
+    if len(records) > BATCH_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(records)} exceeds BATCH_MAX_ROWS={BATCH_MAX_ROWS}",
+        )
+
+    # Scoring is CPU bound; keep it off the event loop
+    return await run_in_threadpool(_score_batch, records, served)
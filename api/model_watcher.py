@@ -0,0 +1,257 @@
+"""
+Hot-swapping of the served model without a process restart.
+
+A background thread polls a model source (the MLflow registry stage, or a
+local directory of model versions) for a new version. A new version is
+downloaded, loaded and warmed up on that thread, off the request path, and
+then published by replacing a single reference. Requests read
+``watcher.current`` once and score with that :class:`ServedModel` to the
+end, so a swap never mixes two versions within one request.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from prometheus_client import Counter
+
+from pipeline.feature_engineering import FeaturePipeline
+from pipeline.inference import FastPathScorer, best_iteration_range
+from pipeline.monitor.drift import load_reference_profile
+from pipeline.model import (
+    FEATURE_PIPELINE_PATH,
+    MODEL_NAME,
+    MODEL_PATH,
+    REFERENCE_PROFILE_PATH,
+    load_registered_model,
+    load_registered_reference_profile,
+    registered_version,
+)
+
+MODEL_SWAPS = Counter("model_swaps_total", "Times a new model version was swapped in")
+MODEL_RELOAD_FAILURES = Counter(
+    "model_reload_failures_total", "Failed checks or loads of a new model version"
+)
+
+
+class ServedModel:
+    """
+    One loaded model version and everything needed to score with it.
+
+    Instances are never mutated after construction, so a request holding a
+    reference keeps a consistent booster / feature pipeline / version /
+    reference profile (None if the version shipped without one, in which
+    case there is nothing to measure drift against).
+    """
+
+    def __init__(
+        self,
+        booster,
+        feature_pipeline,
+        version,
+        fast_path=False,
+        reference_profile=None,
+    ):
+        self.booster = booster
+        self.feature_pipeline = feature_pipeline
+        self.version = version
+        self.reference_profile = reference_profile
+        # Score with the trees up to the early-stopping best iteration
+        self.iteration_range = best_iteration_range(booster)
+        self.fast_scorer = (
+            FastPathScorer(booster, feature_pipeline) if fast_path else None
+        )
+        self.loaded_at = time.time()
+
+    def feature_frame(self, df):
+        """Fitted-pipeline features of raw rows, as the reference profile sees them."""
+        return pd.DataFrame(
+            self.feature_pipeline.transform(df),
+            columns=self.feature_pipeline.feature_columns,
+        )
+
+    def predict_rows(self, df):
+        """Featurize validated rows with the fitted pipeline; one booster call."""
+        X = self.feature_pipeline.transform(df)
+        dmatrix = xgb.DMatrix(X, feature_names=self.feature_pipeline.feature_columns)
+        return self.booster.predict(dmatrix, iteration_range=self.iteration_range)
+
+    def warm_up(self, rows=64):
+        """
+        Score a few synthetic rows (the training medians) through every path
+        used by requests, so the first real request does not pay for lazy
+        predictor setup.
+        """
+        medians = self.feature_pipeline.medians
+        row = {col: medians[col] for col in self.feature_pipeline.input_columns}
+        batch = {col: np.full(rows, value) for col, value in row.items()}
+        self.predict_rows(batch)
+        self.predict_rows({col: [value] for col, value in row.items()})
+        if self.fast_scorer is not None:
+            self.fast_scorer.predict(row)
+        return self
+
+
+class RegistrySource:
+    """
+    The version in ``stage`` of ``model_name`` in the MLflow registry.
+
+    With a :class:`~pipeline.model_cache.ModelCache` new versions are also
+    written to the local cache, so the next process start skips the download.
+    """
+
+    def __init__(self, model_name=MODEL_NAME, stage="Production", cache=None):
+        self.model_name = model_name
+        self.stage = stage
+        self.cache = cache
+
+    def latest_version(self):
+        return registered_version(self.model_name, self.stage)
+
+    def load(self, version):
+        """Returns ``(booster, feature_pipeline or None, reference_profile or None)``."""
+        booster, feature_pipeline = load_registered_model(
+            self.model_name, version, self.cache
+        )
+        profile = load_registered_reference_profile(self.model_name, version)
+        return booster, feature_pipeline, profile
+
+
+class DirectorySource:
+    """
+    The newest version in a local model directory.
+
+    Every version is a subdirectory holding ``readmission_model.json`` and
+    ``feature_pipeline.json`` (and optionally ``reference_profile.json``),
+    e.g. copied from a training run's artifacts; the subdirectory name is
+    the version, and the one whose model file was modified last is served.
+    Write the other files before the model file so a half-copied version
+    is not picked.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def latest_version(self):
+        newest, newest_mtime = None, None
+        for entry in os.scandir(self.directory):
+            path = os.path.join(entry.path, MODEL_PATH)
+            if entry.is_dir() and os.path.exists(path):
+                mtime = os.stat(path).st_mtime_ns
+                if newest_mtime is None or mtime > newest_mtime:
+                    newest, newest_mtime = entry.name, mtime
+        return newest
+
+    def load(self, version):
+        directory = os.path.join(self.directory, version)
+        booster = xgb.Booster()
+        booster.load_model(os.path.join(directory, MODEL_PATH))
+        pipeline_path = os.path.join(directory, FEATURE_PIPELINE_PATH)
+        feature_pipeline = None
+        if os.path.exists(pipeline_path):
+            feature_pipeline = FeaturePipeline.load(pipeline_path)
+        profile_path = os.path.join(directory, REFERENCE_PROFILE_PATH)
+        profile = None
+        if os.path.exists(profile_path):
+            profile = load_reference_profile(profile_path)
+        return booster, feature_pipeline, profile
+
+
+class ModelWatcher:
+    """
+    Poll ``source`` every ``interval_seconds`` and swap in new versions.
+
+    ``current`` is the :class:`ServedModel` to score with (None until a
+    model has been loaded). The first check runs as soon as the thread
+    starts; with ``source=None`` the initial model is served for good. A
+    version whose load or warm-up fails is retried on the next poll while
+    the current model keeps serving. A version shipped without a feature
+    pipeline is rejected the same way: its booster was trained on features
+    from its own fitted pipeline, so the current one cannot stand in for it.
+    ``on_swap`` (if given) is called on the watcher thread with every newly
+    published :class:`ServedModel`.
+    """
+
+    def __init__(
+        self,
+        source,
+        current=None,
+        interval_seconds=30.0,
+        fast_path=False,
+        autostart=True,
+        on_swap=None,
+    ):
+        self.source = source
+        self.on_swap = on_swap
+        self.interval_seconds = interval_seconds
+        self.fast_path = fast_path
+        self._current = current
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="model-watcher", daemon=True
+        )
+        if autostart and source is not None:
+            self._thread.start()
+
+    @property
+    def current(self):
+        return self._current
+
+    def check(self) -> bool:
+        """Load, warm and swap in the source's version if it is new."""
+        if self.source is None:
+            return False
+        current = self._current
+        version = self.source.latest_version()
+        if version is None or (current is not None and version == current.version):
+            return False
+
+        start = time.perf_counter()
+        booster, feature_pipeline, profile = self.source.load(version)
+        if feature_pipeline is None:
+            raise ValueError(f"Model version {version} has no feature pipeline")
+        served = ServedModel(
+            booster,
+            feature_pipeline,
+            version,
+            self.fast_path,
+            reference_profile=profile,
+        )
+        served.warm_up()
+
+        # A single reference assignment: requests see the old or the new model
+        self._current = served
+        MODEL_SWAPS.inc()
+        previous = current.version if current is not None else None
+        print(
+            f"🔄 Model {previous} -> {version} "
+            f"(loaded in {time.perf_counter() - start:.2f}s)"
+        )
+        if self.on_swap is not None:
+            self.on_swap(served)
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                MODEL_RELOAD_FAILURES.inc()
+                print(f"⚠️  Model watcher: {e}")
+            if self._stopped.wait(self.interval_seconds):
+                return
+
+    def stop(self, timeout=5.0):
+        """
+        Stop polling. Waits at most ``timeout`` seconds for a check in
+        progress (e.g. a hung registry download); the daemon thread is then
+        left behind rather than blocking shutdown.
+        """
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                print(f"⚠️  Model watcher still busy after {timeout}s; not waiting")
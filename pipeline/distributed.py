@@ -0,0 +1,140 @@
+"""
+Data-parallel XGBoost training across local worker processes.
+
+A ``RabitTracker`` on localhost wires ``workers`` spawned processes into
+one XGBoost collective (no external cluster). Each worker streams only its
+shard of the Parquet dataset (rows picked by a hash of their id, see
+:func:`pipeline.out_of_core.shard_mask`) into its own quantized or
+external-memory matrix; quantile sketches, gradient histograms and
+validation metrics are all-reduced, so every worker ends up with the same
+booster and early stopping happens at the same round everywhere.
+"""
+
+import multiprocessing
+import os
+import queue
+import traceback
+
+import xgboost as xgb
+from xgboost import collective
+from xgboost.tracker import RabitTracker
+
+from pipeline.feature_engineering import FeaturePipeline
+from pipeline.out_of_core import make_matrices
+from pipeline.storage import BATCH_ROWS
+
+
+def _train_worker(tracker_args, task, results):
+    """Runs in each worker process; rank 0 sends back the trained model."""
+    try:
+        with collective.CommunicatorContext(**tracker_args):
+            rank = collective.get_rank()
+            dtrain, dval = make_matrices(
+                task["path"],
+                FeaturePipeline(**task["feature_pipeline"]),
+                task["matrix"],
+                task["batch_rows"],
+                task["params"]["max_bin"],
+                cache_dir=task["cache_dir"],
+                shard=(rank, collective.get_world_size()),
+            )
+            booster = xgb.train(
+                params=task["params"],
+                dtrain=dtrain,
+                num_boost_round=task["num_boost_round"],
+                evals=[(dval, "validation")],
+                early_stopping_rounds=task["early_stopping_rounds"] or None,
+                verbose_eval=False,
+            )
+        results.put((rank, bytes(booster.save_raw("ubj")) if rank == 0 else None))
+    except Exception:
+        results.put((None, traceback.format_exc()))
+        raise
+
+
+def train_distributed(
+    path,
+    feature_pipeline,
+    params,
+    num_boost_round,
+    early_stopping_rounds=None,
+    workers=2,
+    matrix="quantile",
+    batch_rows=BATCH_ROWS,
+    cache_dir=None,
+):
+    """
+    Train one booster with ``workers`` local processes, each on its shard.
+
+    ``params`` must include ``max_bin``; without ``nthread`` the cores are
+    split evenly between the workers. With ``matrix="external"`` every
+    worker keeps its page cache under ``cache_dir``. If any worker fails
+    the others are terminated and a ``RuntimeError`` carries its traceback.
+    """
+    params = dict(params)
+    params.setdefault("nthread", max(1, (os.cpu_count() or 1) // workers))
+    task = {
+        "path": path,
+        "feature_pipeline": feature_pipeline.to_dict(),
+        "params": params,
+        "num_boost_round": num_boost_round,
+        "early_stopping_rounds": early_stopping_rounds,
+        "matrix": matrix,
+        "batch_rows": batch_rows,
+        "cache_dir": cache_dir,
+    }
+
+    tracker = RabitTracker(n_workers=workers, host_ip="127.0.0.1")
+    tracker.start()
+
+    # spawn, not fork: a forked child would inherit the parent's OpenMP state
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(
+            target=_train_worker,
+            args=(tracker.worker_args(), task, results),
+            name=f"xgb-worker-{i}",
+        )
+        for i in range(workers)
+    ]
+
+    model, pending = None, len(processes)
+    try:
+        for process in processes:
+            process.start()
+        while pending:
+            try:
+                rank, payload = results.get(timeout=1.0)
+            except queue.Empty:
+                # A worker that died before reporting (e.g. killed) never will
+                for process in processes:
+                    if process.exitcode not in (None, 0):
+                        raise RuntimeError(
+                            f"Distributed training worker {process.name} "
+                            f"exited with code {process.exitcode}"
+                        )
+                continue
+            if rank is None:
+                raise RuntimeError(f"Distributed training worker failed:\n{payload}")
+            if rank == 0:
+                model = payload
+            pending -= 1
+        tracker.wait_for()
+    finally:
+        if pending:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+        for process in processes:
+            if process.pid is not None:
+                process.join()
+        try:
+            tracker.free()
+        except xgb.core.XGBoostError:
+            # After a worker failure the tracker reports its own lost
+            # connections; the worker's error is the one worth raising
+            if not pending:
+                raise
+
+    return xgb.Booster(model_file=bytearray(model))
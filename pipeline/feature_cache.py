@@ -0,0 +1,127 @@
+"""
+Incremental on-disk cache of parsed FHIR bundle features.
+
+One parquet file holds the ``bundle_to_features`` row of every bundle that
+has been parsed, together with the file's path, size and mtime (and
+optionally a SHA-256 of its content). On the next build only new or
+modified bundles are parsed; rows of deleted bundles are evicted.
+"""
+
+import glob
+import hashlib
+import os
+
+import pandas as pd
+
+from pipeline.fhir_loader import FHIR_GLOB, _rows_to_frame, iter_file_rows
+from pipeline.storage import load_frame, save_frame
+
+# Bump when bundle_to_features changes so cached rows are re-parsed
+FEATURE_CACHE_VERSION = 1
+DEFAULT_CACHE_PATH = "data/fhir_feature_cache.parquet"
+
+_META_COLUMNS = ["_path", "_size", "_mtime_ns", "_sha256", "_version"]
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """
+    Feature rows cached per bundle file, keyed by path + size + mtime.
+
+    With ``verify="hash"`` a file whose size/mtime changed is re-hashed and
+    still counts as a hit if its content is unchanged (e.g. after a copy
+    or ``touch``). ``stats`` holds the hit/miss/evicted counts of the last
+    :meth:`build`.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, verify="stat"):
+        if verify not in ("stat", "hash"):
+            raise ValueError(f"verify must be 'stat' or 'hash', got {verify!r}")
+        self.path = path
+        self.verify = verify
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+    def load(self) -> pd.DataFrame:
+        if not os.path.exists(self.path):
+            return pd.DataFrame(columns=_META_COLUMNS)
+        cached = load_frame(self.path)
+        return cached[cached["_version"] == FEATURE_CACHE_VERSION]
+
+    def save(self, frame):
+        tmp_path = f"{self.path}.tmp.parquet"
+        save_frame(frame, tmp_path, legacy_csv=False)
+        os.replace(tmp_path, self.path)
+
+    def build(self, path=FHIR_GLOB, workers=None, chunksize=256, parser="auto"):
+        """Return the feature frame for ``path``, parsing only changed bundles."""
+        files = glob.glob(path)
+        cached = self.load()
+        known = dict(
+            zip(
+                cached["_path"],
+                zip(cached["_size"], cached["_mtime_ns"], cached["_sha256"]),
+            )
+        )
+
+        metadata, keep, changed, refreshed = {}, [], [], 0
+        for file in files:
+            st = os.stat(file)
+            meta = {"_size": st.st_size, "_mtime_ns": st.st_mtime_ns, "_sha256": None}
+            metadata[file] = meta
+            if file in known:
+                size, mtime_ns, sha256 = known[file]
+                if (size, mtime_ns) == (st.st_size, st.st_mtime_ns):
+                    meta["_sha256"] = sha256
+                    keep.append(file)
+                    continue
+                if self.verify == "hash":
+                    meta["_sha256"] = _sha256(file)
+                    if meta["_sha256"] == sha256:
+                        keep.append(file)
+                        refreshed += 1
+                        continue
+            changed.append(file)
+
+        evicted = len(set(known) - set(metadata))
+        self.stats = {"hits": len(keep), "misses": len(changed), "evicted": evicted}
+
+        rows = iter_file_rows(
+            changed, workers=workers, chunksize=chunksize, parser=parser
+        )
+        parsed = _rows_to_frame(rows, frame_chunk_rows=50000)
+        if len(parsed):
+            parsed["_path"] = changed
+            if self.verify == "hash":
+                for file in changed:
+                    if metadata[file]["_sha256"] is None:
+                        metadata[file]["_sha256"] = _sha256(file)
+
+        kept = cached[cached["_path"].isin(set(keep))]
+        frames = [f for f in (kept, parsed) if len(f)]
+        if frames:
+            frame = pd.concat(frames, ignore_index=True)
+            for column in ("_size", "_mtime_ns", "_sha256"):
+                frame[column] = [metadata[file][column] for file in frame["_path"]]
+            frame["_version"] = FEATURE_CACHE_VERSION
+            # Same row order as an uncached build_dataset (glob order)
+            order = {file: i for i, file in enumerate(files)}
+            frame = frame.iloc[frame["_path"].map(order).argsort()]
+        else:
+            frame = pd.DataFrame(columns=_META_COLUMNS)
+
+        if changed or evicted or refreshed or not os.path.exists(self.path):
+            self.save(frame)
+
+        print(
+            f"Feature cache: {len(keep)} hits, {len(changed)} misses, "
+            f"{evicted} evicted"
+        )
+        features = frame.drop(columns=_META_COLUMNS)
+        return features.reset_index(drop=True)
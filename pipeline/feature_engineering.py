@@ -1,23 +1,41 @@
+import json
+
 import pandas as pd
 import numpy as np
 
+# Columns that are never model inputs
+NON_FEATURE_COLUMNS = ["patient_id", "readmitted_30d"]
+
+# Derived clinical features. Each takes a column mapping (a DataFrame or a
+# dict of NumPy arrays) so pandas and the fitted FeaturePipeline share them.
+DERIVED_FEATURES = {
+    # Example: creatinine flags for kidney injury
+    "high_creatinine": lambda c: c["creatinine"] > 1.5,
+    # Blood pressure category
+    "high_bp": lambda c: c["systolic_bp"] >= 140,
+    # Tachycardia indicator
+    "tachycardia": lambda c: c["heart_rate"] >= 100,
+    # Encounter frequency per LOS ratio
+    "encounter_los_ratio": lambda c: c["num_encounters"] / (c["avg_los"] + 1e-6),
+}
+
+
+def feature_columns_for(input_columns) -> list:
+    """Model column order: the inputs, then derived features not among them."""
+    return list(input_columns) + [
+        name for name in DERIVED_FEATURES if name not in input_columns
+    ]
+
 
 def add_derived_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     Add new columns that are derived from raw FHIR features.
     """
 
-    # Example: creatinine flags for kidney injury
-    df["high_creatinine"] = (df["creatinine"] > 1.5).astype(int)
-
-    # Blood pressure category
-    df["high_bp"] = (df["systolic_bp"] >= 140).astype(int)
-
-    # Tachycardia indicator
-    df["tachycardia"] = (df["heart_rate"] >= 100).astype(int)
-
-    # Encounter frequency per LOS ratio
-    df["encounter_los_ratio"] = df["num_encounters"] / (df["avg_los"] + 1e-6)
+    for name, derive in DERIVED_FEATURES.items():
+        value = derive(df)
+        # Flags are stored as 0/1 integers
+        df[name] = value.astype(int) if value.dtype == bool else value
 
     return df
 
@@ -86,3 +104,115 @@ def prepare_features(df: pd.DataFrame, normalize=False) -> pd.DataFrame:
         df = normalize_features(df, exclude=["readmitted_30d", "patient_id"])
 
     return df
+
+
+class FeaturePipeline:
+    """
+    Fitted, serializable counterpart of :func:`prepare_features`.
+
+    ``fit`` captures the training medians and the model's column order;
+    ``transform`` imputes with those medians and adds the derived features
+    using NumPy only, writing into a float32 matrix (optionally a caller's
+    preallocated buffer) ready for the booster.
+    """
+
+    def __init__(self, input_columns=None, medians=None, feature_columns=None):
+        self.input_columns = input_columns or []
+        self.medians = medians or {}
+        self.feature_columns = feature_columns or []
+        self._median_array = np.array(
+            [self.medians[col] for col in self.input_columns], dtype=np.float64
+        )
+
+    def fit(self, df: pd.DataFrame) -> "FeaturePipeline":
+        raw = df.drop(columns=[c for c in NON_FEATURE_COLUMNS if c in df.columns])
+        self.input_columns = list(raw.columns)
+        self.medians = {col: float(raw[col].median()) for col in self.input_columns}
+        self.feature_columns = feature_columns_for(self.input_columns)
+        self._median_array = np.array(
+            [self.medians[col] for col in self.input_columns], dtype=np.float64
+        )
+        return self
+
+    def transform(self, X, out=None) -> np.ndarray:
+        """
+        Build the model input matrix.
+
+        ``X`` is a DataFrame or mapping of raw input columns (scalars for a
+        single row), or a 2D array already in ``input_columns`` order.
+        ``out`` must be a float32 array with ``len(feature_columns)``
+        columns and at least as many rows as ``X``; only the first rows
+        are written and returned.
+        """
+        if isinstance(X, np.ndarray):
+            raw = np.asarray(X, dtype=np.float64).reshape(-1, len(self.input_columns))
+        else:
+            raw = np.column_stack(
+                [
+                    np.atleast_1d(np.asarray(X[col], dtype=np.float64))
+                    for col in self.input_columns
+                ]
+            )
+
+        missing = np.isnan(raw)
+        if missing.any():
+            raw = np.where(missing, self._median_array, raw)
+
+        n = raw.shape[0]
+        n_features = len(self.feature_columns)
+        if out is None:
+            out = np.empty((n, n_features), dtype=np.float32)
+        else:
+            if out.dtype != np.float32:
+                raise ValueError(f"out must be float32, got {out.dtype}")
+            if out.ndim != 2 or out.shape[0] < n or out.shape[1] != n_features:
+                raise ValueError(
+                    f"out must have shape (>= {n}, {n_features}), got {out.shape}"
+                )
+            out = out[:n]
+
+        columns = {col: raw[:, i] for i, col in enumerate(self.input_columns)}
+        for name, derive in DERIVED_FEATURES.items():
+            columns[name] = derive(columns)
+        for j, name in enumerate(self.feature_columns):
+            out[:, j] = columns[name]
+
+        return out
+
+    def transform_row(self, row, out) -> np.ndarray:
+        """
+        Write one row straight into ``out`` (shape ``(1, n_features)``).
+
+        Scalar-only version of :meth:`transform` for single-patient scoring:
+        no intermediate arrays are allocated.
+        """
+        values = {}
+        for col in self.input_columns:
+            value = row[col]
+            values[col] = (
+                self.medians[col] if value is None or value != value else value
+            )
+        for name, derive in DERIVED_FEATURES.items():
+            values[name] = derive(values)
+
+        target = out[0]
+        for j, name in enumerate(self.feature_columns):
+            target[j] = values[name]
+        return out
+
+    def to_dict(self) -> dict:
+        return {
+            "input_columns": self.input_columns,
+            "medians": self.medians,
+            "feature_columns": self.feature_columns,
+        }
+
+    def save(self, path="feature_pipeline.json"):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+    @classmethod
+    def load(cls, path="feature_pipeline.json") -> "FeaturePipeline":
+        with open(path) as f:
+            return cls(**json.load(f))
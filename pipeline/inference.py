@@ -0,0 +1,47 @@
+import threading
+
+import numpy as np
+
+
+def best_iteration_range(booster):
+    """
+    ``iteration_range`` covering the trees up to the best iteration recorded
+    by early stopping, or ``(0, 0)`` (all trees) for models without one.
+    """
+    best_iteration = booster.attributes().get("best_iteration")
+    if best_iteration is None:
+        return (0, 0)
+    return (0, int(best_iteration) + 1)
+
+
+class FastPathScorer:
+    """
+    Pandas-free single-patient scoring.
+
+    The validated request fields and the derived features are written into
+    a reusable, contiguous float32 buffer (one per thread) that is passed to
+    ``Booster.inplace_predict``, skipping DataFrame and DMatrix construction.
+    Only the trees up to the model's best iteration are evaluated.
+    """
+
+    def __init__(self, booster, feature_pipeline):
+        self.booster = booster
+        self.feature_pipeline = feature_pipeline
+        self.iteration_range = best_iteration_range(booster)
+        self._local = threading.local()
+
+    def _buffer(self) -> np.ndarray:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            n_features = len(self.feature_pipeline.feature_columns)
+            buffer = np.empty((1, n_features), dtype=np.float32)
+            self._local.buffer = buffer
+        return buffer
+
+    def predict(self, record) -> float:
+        """Score one record (a mapping of the raw input fields)."""
+        buffer = self.feature_pipeline.transform_row(record, out=self._buffer())
+        prediction = self.booster.inplace_predict(
+            buffer, iteration_range=self.iteration_range
+        )
+        return float(prediction[0])
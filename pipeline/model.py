@@ -2,7 +2,11 @@ import mlflow
 import mlflow.xgboost
 import xgboost as xgb
 import pandas as pd
+import hashlib
 import os
+import tempfile
+import time
+from contextlib import contextmanager
 
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import (
@@ -13,19 +17,202 @@ from sklearn.metrics import (
     f1_score,
 )
 
-from pipeline.tuning import tune_hyperparams
-from pipeline.feature_engineering import prepare_features
+from pipeline.tuning import make_tuning_data, tune_hyperparams
+from pipeline.feature_engineering import FeaturePipeline, prepare_features
+from pipeline.monitor.drift import (
+    build_reference_profile,
+    load_reference_profile,
+    save_reference_profile,
+)
+from pipeline.inference import best_iteration_range
+from pipeline.distributed import train_distributed
+from pipeline.out_of_core import (
+    fit_feature_pipeline,
+    make_matrices,
+    predict_split,
+    write_training_snapshot,
+)
+from pipeline.storage import BATCH_ROWS, csv_path_for, legacy_csv_enabled, save_frame
 
 MODEL_PATH = "readmission_model.json"
-TRAINING_SNAPSHOT_PATH = "data/training_snapshot.csv"
+# Registered model name in the MLflow Model Registry
+MODEL_NAME = "readmission-risk-model"
+TRAINING_SNAPSHOT_PATH = "data/training_snapshot.parquet"
+REFERENCE_PROFILE_PATH = "reference_profile.json"
+FEATURE_PIPELINE_PATH = "feature_pipeline.json"
+
+# Fixed training parameters; tuned or default values are merged on top
+BASE_PARAMS = {
+    "objective": "binary:logistic",
+    "eval_metric": "auc",
+    "tree_method": "hist",
+}
+DEFAULT_PARAMS = {"eta": 0.1, "max_depth": 4, "subsample": 0.9}
+NUM_BOOST_ROUND = 200
+
+
+def _training_options(max_bin, nthread, early_stopping_rounds):
+    max_bin = int(os.getenv("XGB_MAX_BIN", "256")) if max_bin is None else max_bin
+    nthread = int(os.getenv("XGB_NTHREAD", "0")) if nthread is None else nthread
+    if early_stopping_rounds is None:
+        early_stopping_rounds = int(os.getenv("EARLY_STOPPING_ROUNDS", "20"))
+    return max_bin, nthread, early_stopping_rounds
+
+
+def _booster_params(X_tune, y_tune, tune, max_bin, nthread, early_stopping_rounds):
+    """Tune (or take the defaults), log the parameters and return them."""
+    if tune:
+        best_params = dict(
+            tune_hyperparams(X_tune, y_tune, n_trials=25, max_bin=max_bin)
+        )
+    else:
+        best_params = dict(DEFAULT_PARAMS)
+
+    num_boost_round = best_params.pop("num_boost_round", NUM_BOOST_ROUND)
+    params = {**BASE_PARAMS, "max_bin": max_bin, **best_params}
+    if nthread:
+        params["nthread"] = nthread
+
+    mlflow.log_params(params)
+    mlflow.log_params(
+        {
+            "num_boost_round": num_boost_round,
+            "early_stopping_rounds": early_stopping_rounds,
+        }
+    )
+    return params, num_boost_round
+
+
+def _save_reference_profile(X_reference):
+    # Compact reference distribution used for drift detection at serving time
+    save_reference_profile(build_reference_profile(X_reference), REFERENCE_PROFILE_PATH)
+    mlflow.log_artifact(REFERENCE_PROFILE_PATH)
+
+    print(f"Reference profile saved to {REFERENCE_PROFILE_PATH}")
+
+
+def _train_booster(params, dtrain, dval, num_boost_round, early_stopping_rounds):
+    """Train with early stopping on validation AUC; returns the best iteration range."""
+    model = xgb.train(
+        params=params,
+        dtrain=dtrain,
+        num_boost_round=num_boost_round,
+        evals=[(dval, "validation")],
+        early_stopping_rounds=early_stopping_rounds or None,
+        verbose_eval=False,
+    )
+    return model, _log_best_iteration(model)
+
+
+def _log_best_iteration(model):
+    iteration_range = best_iteration_range(model)
+    if iteration_range != (0, 0):
+        mlflow.log_metric("best_iteration", iteration_range[1] - 1)
+        print(
+            f"Early stopping: best iteration {iteration_range[1] - 1} "
+            f"of {model.num_boosted_rounds()} rounds"
+        )
+    return iteration_range
+
+
+def _log_metrics(y_test, preds):
+    preds_binary = (preds > 0.5).astype(int)
+
+    auc = roc_auc_score(y_test, preds)
+    acc = accuracy_score(y_test, preds_binary)
+    precision = precision_score(y_test, preds_binary)
+    recall = recall_score(y_test, preds_binary)
+    f1 = f1_score(y_test, preds_binary)
+
+    mlflow.log_metric("AUC", auc)
+    mlflow.log_metric("Accuracy", acc)
+    mlflow.log_metric("Precision", precision)
+    mlflow.log_metric("Recall", recall)
+    mlflow.log_metric("F1", f1)
+
+    print(
+        f"AUC: {auc:.4f}, Accuracy: {acc:.4f}, Precision: {precision:.4f}, Recall: {recall:.4f}, F1: {f1:.4f}"
+    )
+    return auc, f1
+
+
+def _save_and_register(model, feature_pipeline, auc, f1):
+    # -----------------------------
+    # Save Model
+    # -----------------------------
+    model.save_model(MODEL_PATH)
+    mlflow.log_artifact(MODEL_PATH)
+
+    print(f"Model saved to {MODEL_PATH}")
+
+    feature_pipeline.save(FEATURE_PIPELINE_PATH)
+    mlflow.log_artifact(FEATURE_PIPELINE_PATH)
 
+    print(f"Feature pipeline saved to {FEATURE_PIPELINE_PATH}")
 
-def train_model(df, tune=True):
-    """Train XGBoost model with optional hyperparameter tuning and MLflow logging."""
+    # -----------------------------
+    # Register Model in MLflow Model Registry
+    # -----------------------------
+    model_name = MODEL_NAME
+    model_uri = f"runs:/{mlflow.active_run().info.run_id}/{MODEL_PATH}"
+
+    try:
+        # Try to get existing model version
+        client = mlflow.tracking.MlflowClient()
+        latest_versions = client.get_latest_versions(model_name, stages=["None"])
+
+        # Register new model version
+        model_version = mlflow.register_model(model_uri=model_uri, name=model_name)
+        print(f"✅ Model registered: {model_name} version {model_version.version}")
+
+        # If metrics meet production threshold, transition to Production
+        if auc >= 0.75 and f1 >= 0.65:
+            client.transition_model_version_stage(
+                name=model_name, version=model_version.version, stage="Production"
+            )
+            print(f"✅ Model version {model_version.version} promoted to Production")
+        else:
+            client.transition_model_version_stage(
+                name=model_name, version=model_version.version, stage="Staging"
+            )
+            print(f"✅ Model version {model_version.version} set to Staging")
+
+    except Exception as e:
+        print(f"⚠️  Model registry warning: {e}")
+        print("   Continuing without registry (local model saved)")
+
+
+def train_model(
+    df,
+    tune=True,
+    eval_df=None,
+    max_bin=None,
+    nthread=None,
+    early_stopping_rounds=None,
+):
+    """
+    Train XGBoost model with optional hyperparameter tuning and MLflow logging.
+
+    Training uses the histogram method (``max_bin``, default ``$XGB_MAX_BIN``
+    or 256; ``nthread``, default ``$XGB_NTHREAD`` or all cores) and stops
+    once validation AUC has not improved for ``early_stopping_rounds``
+    rounds (default ``$EARLY_STOPPING_ROUNDS`` or 20; 0 disables it). The
+    validation set is ``eval_df`` (raw rows like ``df``) or, by default,
+    the same slice of the training split that tuning scores trials on.
+    The best iteration is stored in the saved model and used for serving.
+
+    For datasets that do not fit in memory see :func:`train_model_out_of_core`.
+    """
+    max_bin, nthread, early_stopping_rounds = _training_options(
+        max_bin, nthread, early_stopping_rounds
+    )
 
     # -----------------------------
     # 0. Feature Engineering
     # -----------------------------
+    # Fitted copy of the feature steps, reused at serving time
+    feature_pipeline = FeaturePipeline().fit(df)
+
     df = prepare_features(df)
 
     X = df.drop(["patient_id", "readmitted_30d"], axis=1)
@@ -38,26 +225,17 @@ def train_model(df, tune=True):
     with mlflow.start_run():
 
         # -----------------------------
-        # 1. Hyperparameter Tuning
+        # 1. Train/Test Split
         # -----------------------------
-        if tune:
-            best_params = tune_hyperparams(X, y, n_trials=25)
-        else:
-            best_params = {
-                "objective": "binary:logistic",
-                "eval_metric": "auc",
-                "eta": 0.1,
-                "max_depth": 4,
-                "subsample": 0.9,
-            }
-
-        mlflow.log_params(best_params)
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42
+        )
 
         # -----------------------------
-        # 2. Train/Test Split
+        # 2. Hyperparameter Tuning (training split only)
         # -----------------------------
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42
+        params, num_boost_round = _booster_params(
+            X_train, y_train, tune, max_bin, nthread, early_stopping_rounds
         )
 
         # -----------------------------
@@ -66,162 +244,354 @@ def train_model(df, tune=True):
         training_snapshot = X_train.copy()
         training_snapshot["readmitted_30d"] = y_train.values
 
-        training_snapshot.to_csv(TRAINING_SNAPSHOT_PATH, index=False)
+        # Typed Parquet; EXPORT_LEGACY_CSV=true also writes the old CSV
+        save_frame(training_snapshot, TRAINING_SNAPSHOT_PATH)
         mlflow.log_artifact(TRAINING_SNAPSHOT_PATH)
+        if legacy_csv_enabled():
+            mlflow.log_artifact(csv_path_for(TRAINING_SNAPSHOT_PATH))
 
         print(f"Training snapshot saved to {TRAINING_SNAPSHOT_PATH}")
 
+        _save_reference_profile(X_train)
+
         # -----------------------------
-        # 3. Train Booster
+        # 3. Train Booster (early stopping on validation AUC)
         # -----------------------------
-        dtrain = xgb.DMatrix(X_train, label=y_train)
+        if eval_df is not None:
+            eval_features = prepare_features(eval_df)
+            dtrain = xgb.QuantileDMatrix(X_train, label=y_train, max_bin=max_bin)
+            dval = xgb.DMatrix(
+                eval_features[X.columns], label=eval_features["readmitted_30d"]
+            )
+        else:
+            dtrain, dval, _ = make_tuning_data(X_train, y_train, max_bin=max_bin)
         dtest = xgb.DMatrix(X_test, label=y_test)
 
-        model = xgb.train(params=best_params, dtrain=dtrain, num_boost_round=200)
+        model, iteration_range = _train_booster(
+            params, dtrain, dval, num_boost_round, early_stopping_rounds
+        )
 
         # -----------------------------
         # 4. Evaluation Metrics
         # -----------------------------
-        preds = model.predict(dtest)
-        preds_binary = (preds > 0.5).astype(int)
+        preds = model.predict(dtest, iteration_range=iteration_range)
+        auc, f1 = _log_metrics(y_test, preds)
 
-        auc = roc_auc_score(y_test, preds)
-        acc = accuracy_score(y_test, preds_binary)
-        precision = precision_score(y_test, preds_binary)
-        recall = recall_score(y_test, preds_binary)
-        f1 = f1_score(y_test, preds_binary)
+        # -----------------------------
+        # 5. Save and Register Model
+        # -----------------------------
+        _save_and_register(model, feature_pipeline, auc, f1)
 
-        mlflow.log_metric("AUC", auc)
-        mlflow.log_metric("Accuracy", acc)
-        mlflow.log_metric("Precision", precision)
-        mlflow.log_metric("Recall", recall)
-        mlflow.log_metric("F1", f1)
+        return model
 
-        print(
-            f"AUC: {auc:.4f}, Accuracy: {acc:.4f}, Precision: {precision:.4f}, Recall: {recall:.4f}, F1: {f1:.4f}"
+
+def train_model_out_of_core(
+    path,
+    tune=True,
+    matrix="quantile",
+    batch_rows=BATCH_ROWS,
+    max_bin=None,
+    nthread=None,
+    early_stopping_rounds=None,
+    cache_dir=None,
+    workers=1,
+):
+    """
+    Train like :func:`train_model` from a Parquet dataset that is never
+    loaded whole: a file (such as the one ``run.py`` saves) or a directory
+    of part files with the same columns.
+
+    Batches of ``batch_rows`` rows are read, prepared with the fitted
+    :class:`FeaturePipeline` and fed to XGBoost through a
+    :class:`~pipeline.out_of_core.BatchIter`. ``matrix`` picks the
+    training matrix: "quantile" builds a ``QuantileDMatrix`` held in memory
+    in quantized form; "external" builds an external-memory ``DMatrix``
+    whose pages are cached under ``cache_dir`` (default a temporary
+    directory).
+
+    With ``workers > 1`` the booster is trained data-parallel by that many
+    local processes, each reading its own shard of the rows (see
+    :func:`~pipeline.distributed.train_distributed`).
+
+    The train / validation / test split is by a hash of ``patient_id``.
+    The drift reference profile and hyperparameter tuning use a uniform
+    sample of the training split (``$OUT_OF_CORE_SAMPLE_ROWS``, default
+    100k rows); the full training split is streamed to the snapshot.
+    """
+    if matrix not in ("quantile", "external"):
+        raise ValueError(f"Unknown training matrix: {matrix!r}")
+    max_bin, nthread, early_stopping_rounds = _training_options(
+        max_bin, nthread, early_stopping_rounds
+    )
+    sample_rows = int(os.getenv("OUT_OF_CORE_SAMPLE_ROWS", "100000"))
+
+    # -----------------------------
+    # 0. Feature Engineering (one column in memory at a time)
+    # -----------------------------
+    feature_pipeline = fit_feature_pipeline(path)
+
+    os.makedirs("data", exist_ok=True)
+
+    mlflow.set_experiment("Readmission Risk Model")
+
+    with mlflow.start_run(), tempfile.TemporaryDirectory() as tmpdir:
+        mlflow.log_params(
+            {"training_matrix": matrix, "batch_rows": batch_rows, "workers": workers}
         )
 
         # -----------------------------
-        # 5. Save Model
+        # 1. Training Snapshot + bounded sample of the training split
         # -----------------------------
-        model.save_model(MODEL_PATH)
-        mlflow.log_artifact(MODEL_PATH)
+        sample = write_training_snapshot(
+            path, feature_pipeline, TRAINING_SNAPSHOT_PATH, sample_rows, batch_rows
+        )
+        mlflow.log_artifact(TRAINING_SNAPSHOT_PATH)
+
+        print(f"Training snapshot saved to {TRAINING_SNAPSHOT_PATH}")
 
-        print(f"Model saved to {MODEL_PATH}")
+        X_sample = sample.drop(columns=["readmitted_30d"])
+        _save_reference_profile(X_sample)
 
         # -----------------------------
-        # 6. Register Model in MLflow Model Registry
+        # 2. Hyperparameter Tuning (on the sample)
         # -----------------------------
-        model_name = "readmission-risk-model"
-        model_uri = f"runs:/{mlflow.active_run().info.run_id}/{MODEL_PATH}"
-
-        try:
-            # Try to get existing model version
-            client = mlflow.tracking.MlflowClient()
-            latest_versions = client.get_latest_versions(model_name, stages=["None"])
+        params, num_boost_round = _booster_params(
+            X_sample,
+            sample["readmitted_30d"],
+            tune,
+            max_bin,
+            nthread,
+            early_stopping_rounds,
+        )
+        del sample, X_sample
 
-            # Register new model version
-            model_version = mlflow.register_model(model_uri=model_uri, name=model_name)
-            print(f"✅ Model registered: {model_name} version {model_version.version}")
+        # -----------------------------
+        # 3. Train Booster from batches
+        # -----------------------------
+        if workers > 1:
+            model = train_distributed(
+                path,
+                feature_pipeline,
+                params,
+                num_boost_round,
+                early_stopping_rounds,
+                workers=workers,
+                matrix=matrix,
+                batch_rows=batch_rows,
+                cache_dir=cache_dir or tmpdir,
+            )
+            iteration_range = _log_best_iteration(model)
+        else:
+            dtrain, dval = make_matrices(
+                path,
+                feature_pipeline,
+                matrix,
+                batch_rows,
+                max_bin,
+                cache_dir=cache_dir or tmpdir,
+            )
+            model, iteration_range = _train_booster(
+                params, dtrain, dval, num_boost_round, early_stopping_rounds
+            )
+            del dtrain, dval
 
-            # If metrics meet production threshold, transition to Production
-            if auc >= 0.75 and f1 >= 0.65:
-                client.transition_model_version_stage(
-                    name=model_name, version=model_version.version, stage="Production"
-                )
-                print(
-                    f"✅ Model version {model_version.version} promoted to Production"
-                )
-            else:
-                client.transition_model_version_stage(
-                    name=model_name, version=model_version.version, stage="Staging"
-                )
-                print(f"✅ Model version {model_version.version} set to Staging")
+        # -----------------------------
+        # 4. Evaluation Metrics (test split, batch by batch)
+        # -----------------------------
+        y_test, preds = predict_split(
+            model, path, feature_pipeline, "test", iteration_range=iteration_range
+        )
+        auc, f1 = _log_metrics(y_test, preds)
 
-        except Exception as e:
-            print(f"⚠️  Model registry warning: {e}")
-            print("   Continuing without registry (local model saved)")
+        # -----------------------------
+        # 5. Save and Register Model
+        # -----------------------------
+        _save_and_register(model, feature_pipeline, auc, f1)
 
         return model
 
 
-def load_model(model_name="readmission-risk-model", stage="Production"):
+@contextmanager
+def timed(timings, phase):
+    """Add the time spent in the block to ``timings[phase]`` (if a dict)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings[phase] = timings.get(phase, 0.0) + time.perf_counter() - start
+
+
+def _load_booster_file(directory):
+    """Booster from the first model file (.json, .ubj or .pkl) in ``directory``."""
+    for file in os.listdir(directory):
+        if file.endswith((".json", ".ubj", ".pkl")):
+            booster = xgb.Booster()
+            booster.load_model(os.path.join(directory, file))
+            return booster
+    return None
+
+
+def registered_version(model_name=MODEL_NAME, stage="Production"):
+    """Registry version currently in ``stage`` (as a string), or None."""
+    client = mlflow.tracking.MlflowClient()
+    model_versions = client.get_latest_versions(model_name, stages=[stage])
+    return str(model_versions[0].version) if model_versions else None
+
+
+def load_registered_model(model_name, version, cache=None, timings=None):
     """
-    Load the trained XGBoost Booster model.
+    Download registry ``version`` of ``model_name``.
+
+    Returns ``(booster, feature_pipeline)``; the feature pipeline comes from
+    the training run that logged the model and is None if it has none.
+    With a :class:`~pipeline.model_cache.ModelCache` a cached version is
+    loaded from local disk, and a downloaded one is added to the cache.
+    ``timings`` (a dict) receives seconds per phase: "cache", "download",
+    "parse" and "cache_write".
+    """
+    if cache is not None:
+        with timed(timings, "cache"):
+            cached = cache.get(model_name, version)
+        if cached is not None:
+            return cached
+
+    client = mlflow.tracking.MlflowClient()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with timed(timings, "download"):
+            # The registered source is the model file itself (see
+            # _save_and_register), which "models:/" URIs cannot download
+            path = mlflow.artifacts.download_artifacts(
+                artifact_uri=client.get_model_version_download_uri(model_name, version),
+                dst_path=tmpdir,
+            )
+        with timed(timings, "parse"):
+            booster = _load_booster_file(
+                path if os.path.isdir(path) else os.path.dirname(path)
+            )
+    if booster is None:
+        raise FileNotFoundError(f"No model file in {model_name} version {version}")
 
-    Args:
-        model_name: Name of the model in MLflow registry
-        stage: Stage to load from (Production, Staging, or None for latest)
+    feature_pipeline = None
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir, timed(timings, "download"):
+            run_id = client.get_model_version(model_name, version).run_id
+            path = mlflow.artifacts.download_artifacts(
+                run_id=run_id, artifact_path=FEATURE_PIPELINE_PATH, dst_path=tmpdir
+            )
+            feature_pipeline = FeaturePipeline.load(path)
+    except Exception as e:
+        print(f"⚠️  No feature pipeline for {model_name} v{version}: {e}")
 
-    Returns:
-        XGBoost Booster model
+    if cache is not None:
+        with timed(timings, "cache_write"):
+            cache.put(model_name, version, booster, feature_pipeline)
+    return booster, feature_pipeline
+
+
+def load_registered_reference_profile(model_name, version, timings=None):
     """
-    import mlflow
+    Reference profile logged by the training run of registry ``version``
+    (see :func:`_save_reference_profile`), or None if it has none.
+    """
+    client = mlflow.tracking.MlflowClient()
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir, timed(timings, "download"):
+            run_id = client.get_model_version(model_name, version).run_id
+            path = mlflow.artifacts.download_artifacts(
+                run_id=run_id, artifact_path=REFERENCE_PROFILE_PATH, dst_path=tmpdir
+            )
+            return load_reference_profile(path)
+    except Exception as e:
+        print(f"⚠️  No reference profile for {model_name} v{version}: {e}")
+        return None
 
+
+def local_model_version(path=MODEL_PATH):
+    """Content-derived version label of a local model file."""
+    with open(path, "rb") as f:
+        return "local-" + hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def load_model_artifacts(
+    model_name=MODEL_NAME, stage="Production", cache=None, timings=None
+):
+    """
+    Like :func:`load_model`, but returns ``(booster, feature_pipeline,
+    version)``. ``version`` is the registry version number, or
+    ``local-<sha256 prefix>`` when the local ``MODEL_PATH`` file was loaded
+    (``feature_pipeline`` is then None: use ``FEATURE_PIPELINE_PATH``).
+
+    With a :class:`~pipeline.model_cache.ModelCache` only the version
+    lookup goes to the registry when the version is already cached, and if
+    the registry cannot be reached the last version cached for ``stage``
+    is served before falling back to the local file. ``timings`` (a dict)
+    receives seconds per phase ("registry" plus those of
+    :func:`load_registered_model`).
+    """
     try:
         # Try to load from MLflow Model Registry
-        client = mlflow.tracking.MlflowClient()
-
         if stage:
-            model_versions = client.get_latest_versions(model_name, stages=[stage])
-            if model_versions:
-                model_version = model_versions[0]
-                # Download model artifact
-                model_uri = f"models:/{model_name}/{stage}"
+            with timed(timings, "registry"):
+                version = registered_version(model_name, stage)
+            if version is not None:
                 print(f"📦 Loading model from registry: {model_name} ({stage})")
-                # MLflow downloads to a temp directory, we need to load the JSON file
-                import tempfile
-
-                with tempfile.TemporaryDirectory() as tmpdir:
-                    mlflow.artifacts.download_artifacts(
-                        artifact_uri=model_uri, dst_path=tmpdir
-                    )
-                    # Find the model file (could be .json or .pkl)
-                    model_file = None
-                    for file in os.listdir(tmpdir):
-                        if file.endswith((".json", ".pkl")):
-                            model_file = os.path.join(tmpdir, file)
-                            break
-                    if model_file:
-                        booster = xgb.Booster()
-                        booster.load_model(model_file)
-                        return booster
+                booster, feature_pipeline = load_registered_model(
+                    model_name, version, cache, timings
+                )
+                if cache is not None:
+                    cache.set_stage(model_name, stage, version)
+                return booster, feature_pipeline, version
 
         # Fallback: try to get latest version
-        model_versions = client.get_latest_versions(model_name, stages=["None"])
-        if model_versions:
-            latest = model_versions[0]
-            model_uri = f"models:/{model_name}/{latest.version}"
-            print(
-                f"📦 Loading latest model from registry: {model_name} v{latest.version}"
+        with timed(timings, "registry"):
+            version = registered_version(model_name, "None")
+        if version is not None:
+            print(f"📦 Loading latest model from registry: {model_name} v{version}")
+            booster, feature_pipeline = load_registered_model(
+                model_name, version, cache, timings
             )
-            import tempfile
-
-            with tempfile.TemporaryDirectory() as tmpdir:
-                mlflow.artifacts.download_artifacts(
-                    artifact_uri=model_uri, dst_path=tmpdir
-                )
-                model_file = None
-                for file in os.listdir(tmpdir):
-                    if file.endswith((".json", ".pkl")):
-                        model_file = os.path.join(tmpdir, file)
-                        break
-                if model_file:
-                    booster = xgb.Booster()
-                    booster.load_model(model_file)
-                    return booster
+            return booster, feature_pipeline, version
 
     except Exception as e:
         print(f"⚠️  Could not load from registry: {e}")
+        version = cache.stage_version(model_name, stage) if cache and stage else None
+        if version is not None:
+            with timed(timings, "cache"):
+                cached = cache.get(model_name, version)
+            if cached is not None:
+                print(f"📦 Loading cached model: {model_name} v{version} ({stage})")
+                return cached[0], cached[1], version
         print(f"   Falling back to local model: {MODEL_PATH}")
 
     # Fallback to local file
     if os.path.exists(MODEL_PATH):
-        booster = xgb.Booster()
-        booster.load_model(MODEL_PATH)
-        return booster
+        with timed(timings, "parse"):
+            booster = xgb.Booster()
+            booster.load_model(MODEL_PATH)
+        return booster, None, local_model_version(MODEL_PATH)
     else:
         raise FileNotFoundError(
             f"Model not found. Please train the model first.\n"
             f"Expected: {MODEL_PATH} or model '{model_name}' in MLflow registry"
         )
+
+
+def load_model_version(model_name=MODEL_NAME, stage="Production"):
+    """Like :func:`load_model`, but returns ``(booster, version)``."""
+    booster, _, version = load_model_artifacts(model_name, stage)
+    return booster, version
+
+
+def load_model(model_name=MODEL_NAME, stage="Production"):
+    """
+    Load the trained XGBoost Booster model.
+
+    Args:
+        model_name: Name of the model in MLflow registry
+        stage: Stage to load from (Production, Staging, or None for latest)
+
+    Returns:
+        XGBoost Booster model
+    """
+    return load_model_version(model_name, stage)[0]
@@ -0,0 +1,147 @@
+"""
+Local content-addressed cache of registered model artifacts.
+
+Artifacts downloaded from the MLflow registry are stored once as blobs
+named by their SHA-256 (``blobs/<sha256>.<ext>``); a small JSON ref per
+model name and version (``refs/<name>/<version>.json``) points at the
+model and feature pipeline blobs. Later process starts load a version
+straight from disk instead of downloading it, and every blob is checked
+against its checksum on read. The model is stored as binary UBJSON by
+default, which XGBoost parses about twice as fast as JSON.
+
+The last version seen in each registry stage is remembered as well
+(``refs/<name>/stages/<stage>``) so a replica can still start when the
+tracking server is unreachable.
+"""
+
+import hashlib
+import json
+import os
+import time
+
+import xgboost as xgb
+
+from pipeline.feature_engineering import FeaturePipeline
+
+DEFAULT_MODEL_CACHE_DIR = "data/model_cache"
+MODEL_FORMATS = ("ubj", "json")
+
+
+def _write_atomic(path, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class ModelCache:
+    """
+    Model versions cached on local disk, keyed by name + version + checksum.
+
+    ``directory`` defaults to ``$MODEL_CACHE_DIR`` or ``data/model_cache``;
+    ``fmt`` (``$MODEL_CACHE_FORMAT``, default "ubj") is the format models
+    are written in, either format is read. ``stats`` counts hits, misses
+    and corrupt entries (which are evicted and re-downloaded).
+    """
+
+    def __init__(self, directory=None, fmt=None):
+        if directory is None:
+            directory = os.getenv("MODEL_CACHE_DIR", DEFAULT_MODEL_CACHE_DIR)
+        fmt = os.getenv("MODEL_CACHE_FORMAT", "ubj") if fmt is None else fmt
+        if fmt not in MODEL_FORMATS:
+            raise ValueError(f"fmt must be one of {MODEL_FORMATS}, got {fmt!r}")
+        self.directory = directory
+        self.fmt = fmt
+        self.stats = {"hits": 0, "misses": 0, "corrupt": 0}
+
+    def _ref_path(self, name, version):
+        return os.path.join(self.directory, "refs", name, f"{version}.json")
+
+    def _stage_path(self, name, stage):
+        return os.path.join(self.directory, "refs", name, "stages", stage)
+
+    def _blob_path(self, sha256, ext):
+        return os.path.join(self.directory, "blobs", f"{sha256}.{ext}")
+
+    def _blob_ok(self, path, sha256) -> bool:
+        try:
+            with open(path, "rb") as f:
+                return hashlib.sha256(f.read()).hexdigest() == sha256
+        except FileNotFoundError:
+            return False
+
+    def _put_blob(self, data: bytes, ext):
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha256, ext)
+        # An existing blob is only reused if it still matches its checksum
+        if not self._blob_ok(path, sha256):
+            _write_atomic(path, data)
+        return sha256
+
+    def _read_blob(self, sha256, ext):
+        path = self._blob_path(sha256, ext)
+        with open(path, "rb") as f:
+            data = f.read()
+        if hashlib.sha256(data).hexdigest() != sha256:
+            # Drop the bad blob so the next put writes it again
+            os.remove(path)
+            raise ValueError(f"Checksum mismatch for blob {sha256}")
+        return data
+
+    def put(self, name, version, booster, feature_pipeline=None) -> dict:
+        """Store ``version`` of ``name``; returns its ref."""
+        ref = {
+            "name": name,
+            "version": str(version),
+            "format": self.fmt,
+            "model": self._put_blob(bytes(booster.save_raw(self.fmt)), self.fmt),
+            "feature_pipeline": None,
+            "cached_at": time.time(),
+        }
+        if feature_pipeline is not None:
+            data = json.dumps(feature_pipeline.to_dict()).encode()
+            ref["feature_pipeline"] = self._put_blob(data, "json")
+        _write_atomic(self._ref_path(name, version), json.dumps(ref).encode())
+        return ref
+
+    def get(self, name, version):
+        """
+        ``(booster, feature_pipeline or None)`` for a cached version, or
+        None on a miss. A corrupt entry is evicted and counts as a miss.
+        """
+        ref_path = self._ref_path(name, version)
+        if not os.path.exists(ref_path):
+            self.stats["misses"] += 1
+            return None
+        try:
+            with open(ref_path) as f:
+                ref = json.load(f)
+            booster = xgb.Booster(
+                model_file=bytearray(self._read_blob(ref["model"], ref["format"]))
+            )
+            feature_pipeline = None
+            if ref["feature_pipeline"]:
+                data = self._read_blob(ref["feature_pipeline"], "json")
+                feature_pipeline = FeaturePipeline(**json.loads(data))
+        except (OSError, ValueError, xgb.core.XGBoostError) as e:
+            print(f"⚠️  Evicting corrupt model cache entry {name} v{version}: {e}")
+            if os.path.exists(ref_path):
+                os.remove(ref_path)
+            self.stats["corrupt"] += 1
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        return booster, feature_pipeline
+
+    def set_stage(self, name, stage, version):
+        """Remember ``version`` as the last one seen in registry ``stage``."""
+        _write_atomic(self._stage_path(name, stage), str(version).encode())
+
+    def stage_version(self, name, stage):
+        """Last version recorded for ``stage`` by :meth:`set_stage`, or None."""
+        try:
+            with open(self._stage_path(name, stage)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
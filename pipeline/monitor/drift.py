@@ -1,11 +1,141 @@
 import pandas as pd
 import numpy as np
-from scipy.stats import ks_2samp
+from scipy.stats import ks_2samp, kstwo
+from prometheus_client import Gauge
+from collections import deque
+import datetime
 import json
+import threading
+import time
+
+DRIFT_PSI = Gauge("drift_psi", "Latest PSI per feature", ["feature"])
+DRIFT_KS_STAT = Gauge("drift_ks_stat", "Latest KS statistic per feature", ["feature"])
+DRIFT_KS_PVALUE = Gauge("drift_ks_pvalue", "Latest KS p-value per feature", ["feature"])
+DRIFT_DETECTED = Gauge(
+    "drift_detected", "1 if drift was detected for the feature", ["feature"]
+)
+DRIFT_WINDOW_ROWS = Gauge("drift_window_rows", "Rows in the drift monitoring window")
+
+
+def build_reference_profile(reference_df: pd.DataFrame, buckets=10, sketch_size=1000):
+    """
+    Summarize the training distribution of every numeric feature.
+
+    Per feature the profile keeps quantile bucket cut points (the outer
+    buckets are open-ended), the reference proportion in each bucket, a
+    sorted ECDF sketch of at most ``sketch_size`` points for KS, and basic
+    moments. It replaces the raw training frame for drift detection.
+    """
+    features = {}
+    numeric_cols = reference_df.select_dtypes(include=[np.number]).columns
+
+    for col in numeric_cols:
+        values = np.sort(reference_df[col].dropna().to_numpy(dtype=float))
+        if len(values) == 0:
+            continue
+
+        quantiles = np.quantile(values, np.linspace(0, 1, buckets + 1))
+        bin_edges = np.unique(quantiles[1:-1])
+        counts = np.bincount(
+            np.searchsorted(bin_edges, values, side="right"),
+            minlength=len(bin_edges) + 1,
+        )
+
+        if len(values) > sketch_size:
+            ecdf = np.quantile(values, np.linspace(0, 1, sketch_size))
+        else:
+            ecdf = values
+
+        features[col] = {
+            "n": int(len(values)),
+            "bin_edges": bin_edges.tolist(),
+            "proportions": (counts / len(values)).tolist(),
+            "ecdf": ecdf.tolist(),
+            "mean": float(values.mean()),
+            "std": float(values.std()),
+            "min": float(values[0]),
+            "max": float(values[-1]),
+        }
+
+    return {"buckets": buckets, "features": features}
+
+
+def save_reference_profile(profile: dict, path="reference_profile.json"):
+    with open(path, "w") as f:
+        json.dump(profile, f)
+    return path
+
+
+def load_reference_profile(path="reference_profile.json") -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _psi_from_counts(feature_profile: dict, actual_counts):
+    expected_percents = np.asarray(feature_profile["proportions"]) + 1e-6
+    actual_percents = (actual_counts + 1e-6) / (actual_counts.sum() + 1e-6)
+
+    return np.sum(
+        (expected_percents - actual_percents)
+        * np.log((expected_percents / actual_percents) + 1e-6)
+    )
+
+
+def _bucket_counts(feature_profile: dict, values):
+    bin_edges = np.asarray(feature_profile["bin_edges"])
+    return np.bincount(
+        np.searchsorted(bin_edges, values, side="right"),
+        minlength=len(bin_edges) + 1,
+    )
+
+
+def _psi_from_profile(feature_profile: dict, actual):
+    """PSI against a profiled feature: one searchsorted + bincount."""
+    actual = np.asarray(actual, dtype=float)
+    return _psi_from_counts(feature_profile, _bucket_counts(feature_profile, actual))
+
+
+def _ks_against_profile(feature_profile: dict, cdf, points, m):
+    """KS statistic/p-value of a current CDF against the profile ECDF sketch."""
+    ref = np.asarray(feature_profile["ecdf"])
+    grid = np.concatenate([ref, points])
+
+    cdf_ref = np.searchsorted(ref, grid, side="right") / len(ref)
+    ks_stat = float(np.max(np.abs(cdf_ref - cdf(grid))))
+
+    n = feature_profile["n"]
+    ks_pvalue = float(kstwo.sf(ks_stat, np.round(n * m / (n + m))))
+    return ks_stat, ks_pvalue
+
+
+def ks_from_profile(feature_profile: dict, actual):
+    """
+    Two-sample KS test against a profiled feature's ECDF sketch.
+
+    Exact when the sketch holds the full reference sample; otherwise the
+    reference CDF is off by at most 1/len(ecdf). The p-value uses the
+    asymptotic distribution with the true reference size.
+    """
+    cur = np.sort(np.asarray(actual, dtype=float))
+    return _ks_against_profile(
+        feature_profile,
+        lambda grid: np.searchsorted(cur, grid, side="right") / len(cur),
+        cur,
+        len(cur),
+    )
 
 
 def psi(expected, actual, buckets=10):
-    """Population Stability Index (PSI) with smoothing to avoid divide-by-zero."""
+    """
+    Population Stability Index (PSI) with smoothing to avoid divide-by-zero.
+
+    ``expected`` is either the raw reference sample or a feature entry from
+    :func:`build_reference_profile`, in which case its stored bucket edges
+    and proportions are reused.
+    """
+    if isinstance(expected, dict):
+        return _psi_from_profile(expected, actual)
+
     expected_counts, bin_edges = np.histogram(expected, bins=buckets)
     actual_counts, _ = np.histogram(actual, bins=bin_edges)
 
@@ -20,19 +150,33 @@ def psi(expected, actual, buckets=10):
     return psi_value
 
 
-def detect_drift(
-    reference_df: pd.DataFrame, current_df: pd.DataFrame, save_path="drift_report.json"
-):
+def detect_drift(reference, current_df: pd.DataFrame, save_path="drift_report.json"):
+    """
+    Compare ``current_df`` against the reference distribution.
+
+    ``reference`` is either the raw reference DataFrame or a profile from
+    :func:`build_reference_profile`.
+    """
 
     drift_report = {}
-    numeric_cols = reference_df.select_dtypes(include=[np.number]).columns
+    if isinstance(reference, dict):
+        ref_features = reference["features"]
+    else:
+        ref_features = {
+            col: reference[col].dropna()
+            for col in reference.select_dtypes(include=[np.number]).columns
+        }
 
-    for col in numeric_cols:
-        ref = reference_df[col].dropna()
+    for col, ref in ref_features.items():
+        if col not in current_df:
+            continue
         cur = current_df[col].dropna()
 
         if len(ref) > 0 and len(cur) > 0:
-            ks_stat, ks_pvalue = ks_2samp(ref, cur)
+            if isinstance(ref, dict):
+                ks_stat, ks_pvalue = ks_from_profile(ref, cur)
+            else:
+                ks_stat, ks_pvalue = ks_2samp(ref, cur)
             psi_value = psi(ref, cur)
 
             drift_detected = (ks_pvalue < 0.05) or (psi_value > 0.1)
@@ -59,3 +203,420 @@ def detect_drift(
     print(f"Drift report saved to {save_path}")
 
     return clean_report
+
+
+class QuantileSketch:
+    """
+    Mergeable KLL quantile sketch (Karnin, Lang & Liberty, 2016).
+
+    Items live in levels of compactors; an item at level ``h`` stands for
+    ``2**h`` observations. A full level is sorted and every other item
+    (random offset) is promoted, so memory stays O(k log(n/k)) however many
+    values are added. Two sketches with the same ``k`` merge by
+    concatenating levels and compacting.
+
+    Error bound: the rank error of ``cdf``/``quantile`` is O(1/k) of ``n``.
+    For the default ``k=200`` it stays below about 1.7% of ``n`` with 99%
+    confidence, the figure published for the Apache DataSketches KLL. Merging
+    does not weaken the bound.
+    """
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                items = np.sort(items)
+                # Keep one item behind when the count is odd
+                keep, items = items[: len(items) % 2], items[len(items) % 2 :]
+                promoted = items[self._rng.integers(2) :: 2]
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level] = keep
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], promoted]
+                )
+            level += 1
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch"):
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={self.k} and k={other.k}")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def cdf(self, x):
+        """Approximate fraction of observations <= ``x`` (vectorized)."""
+        x = np.asarray(x, dtype=float)
+        rank = np.zeros(x.shape)
+        for level, items in enumerate(self.levels):
+            if len(items):
+                rank += np.searchsorted(np.sort(items), x, side="right") * 2**level
+        return rank / max(self.n, 1)
+
+    def quantile(self, q):
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(lvl), 2.0**level) for level, lvl in enumerate(self.levels)]
+        )
+        order = np.argsort(items)
+        cumulative = np.cumsum(weights[order]) / weights.sum()
+        idx = np.searchsorted(cumulative, q, side="left")
+        return items[order][np.minimum(idx, len(items) - 1)]
+
+    def items(self):
+        return np.sort(np.concatenate(self.levels))
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "n": self.n,
+            "levels": [items.tolist() for items in self.levels],
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(k=state["k"])
+        sketch.n = state["n"]
+        sketch.levels = [np.asarray(items, dtype=float) for items in state["levels"]]
+        return sketch
+
+
+class DriftSketch:
+    """
+    Mergeable per-feature drift state for one or more API replicas.
+
+    Each feature keeps exact counts over the reference profile's buckets
+    (so PSI from merged sketches equals PSI over the union of windows) and a
+    :class:`QuantileSketch` for approximate KS. The approximate KS statistic
+    is within the sketch rank error plus 1/len(ecdf) of the exact value.
+    The serialized state is a few KB per feature regardless of row count.
+    """
+
+    def __init__(self, profile: dict, k=200):
+        self.profile = profile
+        self.k = k
+        self.counts = {}
+        self.quantiles = {}
+        for col, feature in profile["features"].items():
+            self.counts[col] = np.zeros(len(feature["bin_edges"]) + 1, dtype=np.int64)
+            self.quantiles[col] = QuantileSketch(k=k)
+
+    def update(self, current_df: pd.DataFrame):
+        for col, feature in self.profile["features"].items():
+            if col not in current_df:
+                continue
+            values = current_df[col].dropna().to_numpy(dtype=float)
+            self.counts[col] += _bucket_counts(feature, values)
+            self.quantiles[col].update(values)
+        return self
+
+    def merge(self, other: "DriftSketch"):
+        for col in self.counts:
+            self.counts[col] += other.counts[col]
+            self.quantiles[col].merge(other.quantiles[col])
+        return self
+
+    def report(self) -> dict:
+        """Drift report in the same shape as :func:`detect_drift`."""
+        drift_report = {}
+        for col, feature in self.profile["features"].items():
+            sketch = self.quantiles[col]
+            if sketch.n == 0:
+                continue
+            ks_stat, ks_pvalue = _ks_against_profile(
+                feature, sketch.cdf, sketch.items(), sketch.n
+            )
+            psi_value = float(_psi_from_counts(feature, self.counts[col]))
+            drift_report[col] = {
+                "ks_stat": ks_stat,
+                "ks_pvalue": ks_pvalue,
+                "psi": psi_value,
+                "drift_detected": bool((ks_pvalue < 0.05) or (psi_value > 0.1)),
+                "n": int(sketch.n),
+            }
+        return drift_report
+
+    def to_dict(self):
+        return {
+            "k": self.k,
+            "features": {
+                col: {
+                    "counts": self.counts[col].tolist(),
+                    "quantiles": self.quantiles[col].to_dict(),
+                }
+                for col in self.counts
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict, profile: dict):
+        sketch = cls(profile, k=state["k"])
+        for col, feature_state in state["features"].items():
+            sketch.counts[col] = np.asarray(feature_state["counts"], dtype=np.int64)
+            sketch.quantiles[col] = QuantileSketch.from_dict(feature_state["quantiles"])
+        return sketch
+
+
+def merge_drift_sketches(states, profile: dict) -> DriftSketch:
+    """Merge serialized :class:`DriftSketch` states (e.g. one per replica)."""
+    merged = None
+    for state in states:
+        sketch = DriftSketch.from_dict(state, profile)
+        merged = sketch if merged is None else merged.merge(sketch)
+    return merged
+
+
+DRIFT_METHODS = ("sketch", "exact")
+# Window of the sketch method when no window_seconds is given
+SKETCH_WINDOW_SECONDS = 3600.0
+
+
+class DriftMonitor:
+    """
+    Rolling-window drift detection that runs off the request path.
+
+    Callers ``ingest`` scored rows (an O(1) append); a background thread
+    recomputes the KS/PSI report every ``recompute_every`` new rows or every
+    ``interval_seconds``, whichever comes first. The latest report is
+    published via ``latest()`` and Prometheus gauges.
+
+    With ``method="sketch"`` (the default when ``reference`` is a profile)
+    no raw rows are kept: ingested rows are folded into a ring of
+    :class:`DriftSketch` objects, one per ``bucket_seconds`` of wall-clock
+    time, covering the last ``window_seconds`` (default one hour, rounded
+    up to whole buckets). The report is the PSI and approximate KS of the
+    merged ring, and ``sketch_state()`` exports the same window, so states
+    merged across replicas describe the same period.
+
+    ``method="exact"`` (required when ``reference`` is the raw reference
+    DataFrame) keeps the last ``window_size`` rows (and, if
+    ``window_seconds`` is set, only rows younger than that) and runs
+    :func:`detect_drift` on them; with a profile the sketch ring is kept
+    as well for ``sketch_state()``.
+    """
+
+    def __init__(
+        self,
+        reference,
+        transform=None,
+        window_size=5000,
+        window_seconds=None,
+        recompute_every=500,
+        interval_seconds=60.0,
+        min_rows=30,
+        save_path="drift_report.json",
+        method=None,
+        bucket_seconds=60.0,
+    ):
+        is_profile = isinstance(reference, dict)
+        if method is None:
+            method = "sketch" if is_profile else "exact"
+        if method not in DRIFT_METHODS:
+            raise ValueError(f"method must be one of {DRIFT_METHODS}, got {method!r}")
+        if method == "sketch" and not is_profile:
+            raise ValueError("The sketch method needs a reference profile")
+
+        self.reference = reference
+        self.transform = transform
+        self.method = method
+        self.window_seconds = window_seconds
+        self.recompute_every = recompute_every
+        self.interval_seconds = interval_seconds
+        self.min_rows = min_rows
+        self.save_path = save_path
+
+        self._window = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+        self._new_rows = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+        self._report = {}
+        self._computed_at = None
+        self._report_rows = 0
+
+        # Ring of [bucket id, DriftSketch, rows], oldest first
+        self.bucket_seconds = bucket_seconds
+        sketch_window = window_seconds or SKETCH_WINDOW_SECONDS
+        self._ring_buckets = max(1, int(np.ceil(sketch_window / bucket_seconds)))
+        self._ring = deque() if is_profile else None
+        self._unsketched = []
+        self._sketch_lock = threading.Lock()
+
+        self._thread = threading.Thread(
+            target=self._run, name="drift-monitor", daemon=True
+        )
+        self._thread.start()
+
+    def ingest(self, row: dict):
+        """Add one scored row to the window."""
+        now = time.time()
+        with self._lock:
+            if self.method == "exact":
+                self._window.append((now, row))
+            if self._ring is not None:
+                self._unsketched.append((now, row))
+            self._new_rows += 1
+            due = self._new_rows >= self.recompute_every
+        if due:
+            self._wakeup.set()
+
+    def ingest_many(self, rows):
+        """Add several scored rows to the window."""
+        now = time.time()
+        with self._lock:
+            if self.method == "exact":
+                self._window.extend((now, row) for row in rows)
+            if self._ring is not None:
+                self._unsketched.extend((now, row) for row in rows)
+            self._new_rows += len(rows)
+            due = self._new_rows >= self.recompute_every
+        if due:
+            self._wakeup.set()
+
+    def latest(self) -> dict:
+        """Return the most recent drift report and when it was computed."""
+        return {
+            "computed_at": self._computed_at,
+            "window_rows": self._report_rows,
+            "report": self._report,
+        }
+
+    def sketch_state(self):
+        """
+        Serialized sketch of the current window for cross-replica merging.
+
+        Buckets are aligned on multiples of ``bucket_seconds`` since the
+        epoch, so replicas with the same settings cover the same period;
+        ``window_start`` / ``window_end`` (epoch seconds) record it.
+        """
+        if self._ring is None:
+            return None
+        with self._sketch_lock:
+            sketch, _, window_start = self._window_sketch()
+        state = sketch.to_dict()
+        state["window_start"] = window_start
+        state["window_end"] = time.time()
+        return state
+
+    def _frame(self, rows):
+        current_df = pd.DataFrame(rows)
+        if self.transform is not None:
+            current_df = self.transform(current_df)
+        return current_df
+
+    def _fold_into_ring(self):
+        """Move pending rows into their time buckets and drop expired ones."""
+        with self._lock:
+            pending, self._unsketched = self._unsketched, []
+
+        groups = {}
+        for ts, row in pending:
+            groups.setdefault(int(ts // self.bucket_seconds), []).append(row)
+        for bucket_id, rows in sorted(groups.items()):
+            entry = next((e for e in self._ring if e[0] == bucket_id), None)
+            if entry is None:
+                entry = [bucket_id, DriftSketch(self.reference), 0]
+                self._ring.append(entry)
+            entry[1].update(self._frame(rows))
+            entry[2] += len(rows)
+
+        oldest = int(time.time() // self.bucket_seconds) - self._ring_buckets + 1
+        while self._ring and self._ring[0][0] < oldest:
+            self._ring.popleft()
+        return oldest
+
+    def _window_sketch(self):
+        """``(merged DriftSketch, rows, window start)`` over the ring."""
+        oldest = self._fold_into_ring()
+        merged, rows = DriftSketch(self.reference), 0
+        for _, sketch, bucket_rows in self._ring:
+            merged.merge(sketch)
+            rows += bucket_rows
+        return merged, rows, oldest * self.bucket_seconds
+
+    def _exact_rows(self):
+        with self._lock:
+            if self.window_seconds is not None:
+                cutoff = time.time() - self.window_seconds
+                while self._window and self._window[0][0] < cutoff:
+                    self._window.popleft()
+            return [row for _, row in self._window]
+
+    def recompute(self):
+        """Recompute the drift report over the current window."""
+        with self._lock:
+            self._new_rows = 0
+
+        sketch = None
+        if self._ring is not None:
+            with self._sketch_lock:
+                sketch, n_rows, _ = self._window_sketch()
+        if self.method == "exact":
+            rows = self._exact_rows()
+            n_rows = len(rows)
+
+        DRIFT_WINDOW_ROWS.set(n_rows)
+        if n_rows < self.min_rows:
+            return self.latest()
+
+        if self.method == "exact":
+            current_df = self._frame(rows)
+            report = detect_drift(self.reference, current_df, save_path=self.save_path)
+        else:
+            report = sketch.report()
+            with open(self.save_path, "w") as f:
+                json.dump(report, f, indent=4)
+
+        for col, stats in report.items():
+            DRIFT_PSI.labels(feature=col).set(stats["psi"])
+            DRIFT_KS_STAT.labels(feature=col).set(stats["ks_stat"])
+            DRIFT_KS_PVALUE.labels(feature=col).set(stats["ks_pvalue"])
+            DRIFT_DETECTED.labels(feature=col).set(int(stats["drift_detected"]))
+
+        self._report = report
+        self._report_rows = n_rows
+        self._computed_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        return self.latest()
+
+    def stop(self, timeout=5.0):
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join(timeout=timeout)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(timeout=self.interval_seconds)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.recompute()
+            except Exception as e:
+                # Never let a bad window kill the monitor thread
+                print(f"Drift monitor warning: {e}")
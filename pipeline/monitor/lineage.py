@@ -1,9 +1,29 @@
-import hashlib, json, datetime
+import hashlib, json, datetime, glob, heapq, itertools, os, queue, socket, threading, time
 
+from prometheus_client import Counter, Gauge
 
-def log_lineage(features, prediction_prob, model_version):
-    record = {
-        "timestamp": datetime.datetime.utcnow().isoformat(),
+LINEAGE_WRITTEN = Counter(
+    "lineage_records_written_total", "Lineage records appended to storage"
+)
+LINEAGE_DROPPED = Counter(
+    "lineage_records_dropped_total",
+    "Lineage records dropped because the queue was full",
+)
+LINEAGE_QUEUE_DEPTH = Gauge(
+    "lineage_queue_depth", "Lineage records waiting to be written"
+)
+LINEAGE_BATCH_SECONDS = Gauge(
+    "lineage_last_batch_write_seconds", "Time spent writing the last lineage batch"
+)
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+_STOP = object()
+
+
+def build_lineage_record(features, prediction_prob, model_version):
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
         "model_version": model_version,
         "input_hash": hashlib.md5(
             json.dumps(features, sort_keys=True).encode()
@@ -11,5 +31,271 @@ def log_lineage(features, prediction_prob, model_version):
         "inputs": features,
         "prediction": prediction_prob,
     }
-    print("Lineage:", record)
+
+
+def log_lineage(features, prediction_prob, model_version, sink=None):
+    """
+    Record the lineage of one prediction.
+
+    With a ``sink`` (a :class:`LineageWriter`) the record is only enqueued;
+    without one it is printed to stdout as before.
+    """
+    record = build_lineage_record(features, prediction_prob, model_version)
+    if sink is None:
+        print("Lineage:", record)
+    else:
+        sink.submit(record)
     return record
+
+
+class LineageWriter:
+    """
+    Durable, append-only lineage storage fed by a bounded in-memory queue.
+
+    A background thread drains the queue in batches of up to ``batch_size``
+    records (or whatever arrived within ``flush_interval`` seconds) and
+    appends them to NDJSON files in ``directory``, rotating to a new file
+    once ``max_file_bytes`` is reached. ``fsync`` controls durability:
+
+    - ``"always"``: fsync after every batch
+    - ``"interval"``: fsync at most every ``fsync_interval`` seconds
+    - ``"never"``: leave flushing to the OS
+
+    When the queue is full ``submit`` waits up to ``block_timeout`` seconds
+    (0 = never block the caller) and then drops the record, counting it in
+    ``lineage_records_dropped_total``.
+
+    Files are named ``lineage-<writer_id>-<UTC stamp>.ndjson``; the writer
+    id (default ``<hostname>-<pid>``) keeps the files of several workers or
+    replicas sharing ``directory`` apart.
+    """
+
+    def __init__(
+        self,
+        directory="lineage",
+        max_queue=10000,
+        batch_size=500,
+        flush_interval=1.0,
+        max_file_bytes=64 * 1024 * 1024,
+        fsync="interval",
+        fsync_interval=1.0,
+        block_timeout=0.0,
+        autostart=True,
+        writer_id=None,
+    ):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.block_timeout = block_timeout
+        self.writer_id = writer_id or f"{socket.gethostname()}-{os.getpid()}"
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop_requested = threading.Event()
+        self._file = None
+        self._file_bytes = 0
+        self._last_fsync = time.monotonic()
+        self.dropped = 0
+        self.written = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(
+            target=self._run, name="lineage-writer", daemon=True
+        )
+        if autostart:
+            self.start()
+
+    def start(self):
+        self._thread.start()
+
+    def submit(self, record) -> bool:
+        """Enqueue a record; returns False if it had to be dropped."""
+        try:
+            if self.block_timeout:
+                self._queue.put(record, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            LINEAGE_DROPPED.inc()
+            return False
+        LINEAGE_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    def stop(self, timeout=10.0):
+        """
+        Write everything already queued, fsync and close the file, waiting
+        at most ``timeout`` seconds for the writer thread.
+        """
+        self._stop_requested.set()
+        try:
+            if self.block_timeout:
+                self._queue.put(_STOP, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(_STOP)
+        except queue.Full:
+            # The writer also stops once it has drained the queue
+            pass
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stop_requested.is_set():
+                    break
+                self._maybe_fsync(force=False)
+                continue
+
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    # Keep the writer alive; the batch is lost but counted
+                    print(f"Lineage writer warning: {e}")
+                    self.dropped += len(batch)
+                    LINEAGE_DROPPED.inc(len(batch))
+            LINEAGE_QUEUE_DEPTH.set(self._queue.qsize())
+
+        self._close()
+
+    def _open_new_file(self):
+        self._close()
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        path = os.path.join(self.directory, f"lineage-{self.writer_id}-{stamp}.ndjson")
+        self._file = open(path, "ab")
+        self._file_bytes = self._file.tell()
+
+    def _write(self, batch):
+        start = time.monotonic()
+        payload = "".join(json.dumps(record) + "\n" for record in batch).encode()
+
+        if self._file is None or self._file_bytes + len(payload) > self.max_file_bytes:
+            self._open_new_file()
+
+        self._file.write(payload)
+        self._file.flush()
+        self._file_bytes += len(payload)
+        self._maybe_fsync(force=self.fsync == "always")
+
+        self.written += len(batch)
+        LINEAGE_WRITTEN.inc(len(batch))
+        LINEAGE_BATCH_SECONDS.set(time.monotonic() - start)
+
+    def _maybe_fsync(self, force):
+        if self._file is None or self.fsync == "never":
+            return
+        now = time.monotonic()
+        if force or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def _close(self):
+        if self._file is not None:
+            self._file.flush()
+            if self.fsync != "never":
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+
+def _as_datetime(value):
+    """Timezone-aware UTC datetime; naive values (and ISO strings) are UTC."""
+    if value is None:
+        return None
+    if not isinstance(value, datetime.datetime):
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value.astimezone(datetime.timezone.utc)
+
+
+def _file_key(path):
+    """``(writer id, stamp)`` of a lineage file ("" for unnamed writers)."""
+    name = os.path.basename(path)[len("lineage-") : -len(".ndjson")]
+    writer, _, stamp = name.rpartition("-")
+    return writer, stamp
+
+
+def _file_start(stamp):
+    return datetime.datetime.strptime(stamp, "%Y%m%dT%H%M%S%f").replace(
+        tzinfo=datetime.timezone.utc
+    )
+
+
+def _iter_file(path, start, end, input_hash):
+    """``(timestamp, record)`` pairs of one file that match the filters."""
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if input_hash is not None and record["input_hash"] != input_hash:
+                continue
+            # Records written before timestamps carried an offset are UTC
+            timestamp = _as_datetime(record["timestamp"])
+            if start is not None and timestamp < start:
+                continue
+            if end is not None and timestamp > end:
+                continue
+            yield timestamp, record
+
+
+def read_lineage(directory="lineage", start=None, end=None, input_hash=None):
+    """
+    Yield stored lineage records, oldest first.
+
+    ``start``/``end`` (datetimes or ISO strings) bound the record
+    timestamp; bounds with an offset (``+00:00``, ``Z``) are converted to
+    UTC and naive ones are taken as UTC. An unparseable bound raises
+    ``ValueError``; ``input_hash`` restricts to one input. Each writer's
+    files are named by creation time, so a file the same writer rotated
+    out before ``start`` is never opened. The files of several writers
+    (workers or replicas sharing ``directory``) are merged by timestamp.
+    """
+    start, end = _as_datetime(start), _as_datetime(end)
+    writers = {}
+    for path in glob.glob(os.path.join(directory, "lineage-*.ndjson")):
+        writer, stamp = _file_key(path)
+        writers.setdefault(writer, []).append((stamp, path))
+
+    streams = []
+    for files in writers.values():
+        files.sort()
+        paths = [
+            path
+            for i, (_, path) in enumerate(files)
+            # Records in this file all precede the writer's next file
+            if start is None
+            or i + 1 == len(files)
+            or _file_start(files[i + 1][0]) >= start
+        ]
+        streams.append(
+            itertools.chain.from_iterable(
+                _iter_file(path, start, end, input_hash) for path in paths
+            )
+        )
+
+    for _, record in heapq.merge(*streams, key=lambda item: item[0]):
+        yield record
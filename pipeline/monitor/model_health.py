@@ -1,48 +1,187 @@
 import mlflow
 import numpy as np
 import os
+import threading
+import time
 
+from mlflow.entities import Metric
+from prometheus_client import Counter, Gauge
+
+LIVE_PREDICTIONS = Counter("live_predictions_total", "Predictions scored by the API")
+LIVE_MEAN = Gauge("live_prediction_mean", "Running mean of predicted probabilities")
+LIVE_VARIANCE = Gauge(
+    "live_prediction_variance", "Running variance of predicted probabilities"
+)
+LIVE_SCORE_BUCKET = Gauge(
+    "live_prediction_score_bucket",
+    "Predictions per probability bucket since startup",
+    ["bucket"],
+)
+
+
+class LiveMetricsAggregator:
+    """
+    Accumulate live prediction statistics in memory and flush them periodically.
+
+    ``update`` is O(batch) arithmetic under a lock: the prediction count,
+    running mean and variance (Welford/Chan merge) and a fixed-bin score
+    histogram over [0, 1]. Every ``flush_interval`` seconds a background
+    thread publishes the current snapshot to Prometheus and, with a single
+    ``log_batch`` call, to one long-lived MLflow run.
+    """
+
+    def __init__(
+        self,
+        flush_interval=60.0,
+        experiment_name="Default",
+        run_name="live-metrics",
+        histogram_bins=10,
+        tracking_uri=None,
+        autostart=True,
+    ):
+        self.flush_interval = flush_interval
+        self.experiment_name = experiment_name
+        self.run_name = run_name
+        self.tracking_uri = tracking_uri
+        self.bin_edges = np.linspace(0.0, 1.0, histogram_bins + 1)
+
+        self._lock = threading.Lock()
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.histogram = np.zeros(histogram_bins, dtype=np.int64)
+
+        self._client = None
+        self._run_id = None
+        self._step = 0
+
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="live-metrics", daemon=True
+        )
+        if autostart:
+            self._thread.start()
+
+    def update(self, prob):
+        """Fold one probability or an array of probabilities into the stats."""
+        values = np.atleast_1d(np.asarray(prob, dtype=float))
+        if len(values) == 0:
+            return
+        batch_mean = values.mean()
+        batch_m2 = ((values - batch_mean) ** 2).sum()
+        bucket = np.clip(
+            np.searchsorted(self.bin_edges, values, side="right") - 1,
+            0,
+            len(self.histogram) - 1,
+        )
+        batch_hist = np.bincount(bucket, minlength=len(self.histogram))
+
+        with self._lock:
+            n = self.count + len(values)
+            delta = batch_mean - self.mean
+            self.mean += delta * len(values) / n
+            self._m2 += batch_m2 + delta**2 * self.count * len(values) / n
+            self.count = n
+            self.histogram += batch_hist
+        LIVE_PREDICTIONS.inc(len(values))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "count": self.count,
+                "mean": self.mean,
+                "variance": self._m2 / self.count if self.count else 0.0,
+                "histogram": self.histogram.tolist(),
+            }
+
+    def flush(self):
+        """Publish the current snapshot to Prometheus and MLflow."""
+        stats = self.snapshot()
+        if stats["count"] == 0:
+            return stats
+
+        LIVE_MEAN.set(stats["mean"])
+        LIVE_VARIANCE.set(stats["variance"])
+        for lower, upper, value in zip(
+            self.bin_edges[:-1], self.bin_edges[1:], stats["histogram"]
+        ):
+            LIVE_SCORE_BUCKET.labels(bucket=f"{lower:.1f}-{upper:.1f}").set(value)
 
-def log_live_metrics(prob):
-    """Log live prediction metrics to MLflow. Fails gracefully if MLflow is not configured."""
-    try:
-        # Only log if MLflow tracking URI is properly configured
-        tracking_uri = os.getenv("MLFLOW_TRACKING_URI", "./mlruns")
-        
-        # Ensure mlruns directory exists
-        mlruns_dir = tracking_uri.replace("file://", "").replace("./", "")
-        if not os.path.exists(mlruns_dir):
-            os.makedirs(mlruns_dir, exist_ok=True)
-        
-        # Set or create Default experiment
         try:
-            mlflow.set_experiment("Default")
-        except Exception:
-            # Create experiment if it doesn't exist
+            self._log_to_mlflow(stats)
+        except Exception as e:
+            # Fail gracefully - don't break the API if MLflow logging fails
+            print(f"Warning: Could not log metrics to MLflow: {e}")
+        return stats
+
+    def stop(self, timeout=10.0):
+        """Flush one last time and close the MLflow run."""
+        self._stopped.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+        self.flush()
+        if self._run_id is not None:
             try:
-                mlflow.create_experiment("Default")
-                mlflow.set_experiment("Default")
-            except Exception:
-                # If we can't create experiment, skip logging
-                return
-        
-        # Start a run if none is active
-        active_run = mlflow.active_run()
-        if active_run is None:
-            mlflow.start_run(run_name=f"live-metrics", nested=False)
-        
-        # Log metrics
-        mlflow.log_metric("live_average_confidence", float(np.mean(prob)))
-        mlflow.log_metric("live_prediction_variance", float(np.var(prob)))
-        
-        # End the run
-        mlflow.end_run()
-            
-    except Exception as e:
-        # Fail gracefully - don't break the API if MLflow logging fails
-        print(f"Warning: Could not log metrics to MLflow: {e}")
-        # Ensure we end any active run to avoid leaving it open
-        try:
-            mlflow.end_run()
-        except Exception:
-            pass
+                self._client.set_terminated(self._run_id)
+            except Exception as e:
+                print(f"Warning: Could not close MLflow live-metrics run: {e}")
+
+    def _ensure_run(self):
+        if self._run_id is not None:
+            return
+        tracking_uri = self.tracking_uri or os.getenv("MLFLOW_TRACKING_URI", "./mlruns")
+        if "://" not in tracking_uri or tracking_uri.startswith("file://"):
+            os.makedirs(tracking_uri.replace("file://", ""), exist_ok=True)
+
+        self._client = mlflow.tracking.MlflowClient(tracking_uri=tracking_uri)
+        experiment = self._client.get_experiment_by_name(self.experiment_name)
+        if experiment is None:
+            experiment_id = self._client.create_experiment(self.experiment_name)
+        else:
+            experiment_id = experiment.experiment_id
+        run = self._client.create_run(experiment_id, run_name=self.run_name)
+        self._run_id = run.info.run_id
+
+    def _log_to_mlflow(self, stats):
+        self._ensure_run()
+        timestamp = int(time.time() * 1000)
+        values = {
+            "live_prediction_count": stats["count"],
+            "live_average_confidence": stats["mean"],
+            "live_prediction_variance": stats["variance"],
+        }
+        for i, value in enumerate(stats["histogram"]):
+            values[f"live_score_bucket_{i}"] = value
+
+        self._client.log_batch(
+            self._run_id,
+            metrics=[
+                Metric(key, float(value), timestamp, self._step)
+                for key, value in values.items()
+            ],
+        )
+        self._step += 1
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+def get_live_metrics_aggregator() -> LiveMetricsAggregator:
+    """Process-wide aggregator, created on first use."""
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            _aggregator = LiveMetricsAggregator(
+                flush_interval=float(os.getenv("LIVE_METRICS_FLUSH_SECONDS", "60"))
+            )
+        return _aggregator
+
+
+def log_live_metrics(prob):
+    """Record live prediction(s); flushed to MLflow/Prometheus in the background."""
+    get_live_metrics_aggregator().update(prob)
@@ -0,0 +1,243 @@
+"""
+Out-of-core training inputs read batch by batch from the columnar store.
+
+A :class:`BatchIter` streams a Parquet dataset (one file or a directory of
+part files) through the fitted :class:`FeaturePipeline` and hands each
+batch to XGBoost, which builds a ``QuantileDMatrix`` (quantized in memory,
+about one byte per value) or an external-memory ``DMatrix`` (pages cached
+on disk) without the raw frame ever being loaded. Rows are assigned to the
+train / validation / test splits by a hash of their id, so the splits are
+stable across passes and as the dataset grows.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import xgboost as xgb
+
+from pipeline.feature_engineering import (
+    NON_FEATURE_COLUMNS,
+    FeaturePipeline,
+    feature_columns_for,
+)
+from pipeline.storage import BATCH_ROWS, iter_frames, load_frame, open_dataset
+
+ID_COLUMN = "patient_id"
+LABEL_COLUMN = "readmitted_30d"
+# Same proportions as the in-memory split: 20% test, then 20% of the rest
+# for validation
+TEST_FRACTION = 0.2
+VALIDATION_FRACTION = 0.2
+SPLITS = ("train", "validation", "test")
+_BUCKETS = 10_000
+
+
+def row_hashes(ids) -> np.ndarray:
+    """Stable 64-bit hash of each row id."""
+    # Ids are unique, so skip the factorize step pandas does by default
+    return pd.util.hash_array(np.asarray(ids, dtype=object), categorize=False)
+
+
+def split_mask(hashes, split) -> np.ndarray:
+    """Rows of ``hashes`` that belong to ``split`` ("train", "validation", "test")."""
+    if split not in SPLITS:
+        raise ValueError(f"Unknown split: {split!r}")
+    bucket = (hashes % _BUCKETS) / _BUCKETS
+    validation_end = TEST_FRACTION + (1 - TEST_FRACTION) * VALIDATION_FRACTION
+    if split == "test":
+        return bucket < TEST_FRACTION
+    if split == "validation":
+        return (bucket >= TEST_FRACTION) & (bucket < validation_end)
+    return bucket >= validation_end
+
+
+def _sample_mask(hashes, fraction) -> np.ndarray:
+    # Uses the hash bits above the split bucket, so it is independent of it
+    return ((hashes // _BUCKETS) % _BUCKETS) / _BUCKETS < fraction
+
+
+def shard_mask(hashes, rank, world_size) -> np.ndarray:
+    """Rows of ``hashes`` owned by worker ``rank`` of ``world_size``."""
+    # Uses hash bits above those of the split and sample buckets
+    return (hashes // _BUCKETS**2) % world_size == rank
+
+
+def iter_split(path, split=None, columns=None, batch_rows=BATCH_ROWS, shard=None):
+    """
+    Yield ``(frame, hashes)`` batches of ``path``, keeping only ``split``
+    rows and, with ``shard=(rank, world_size)``, only that worker's share.
+    """
+    for frame in iter_frames(path, columns=columns, batch_rows=batch_rows):
+        hashes = row_hashes(frame[ID_COLUMN])
+        mask = np.ones(len(frame), dtype=bool)
+        if split is not None:
+            mask &= split_mask(hashes, split)
+        if shard is not None:
+            mask &= shard_mask(hashes, *shard)
+        if not mask.any():
+            continue
+        if not mask.all():
+            frame, hashes = frame[mask], hashes[mask]
+        yield frame, hashes
+
+
+def fit_feature_pipeline(path) -> FeaturePipeline:
+    """
+    Fit a :class:`FeaturePipeline` on the dataset at ``path``.
+
+    Medians are exact and match ``FeaturePipeline().fit(load_frame(path))``,
+    but only one column is read into memory at a time.
+    """
+    names = open_dataset(path).schema.names
+    input_columns = [c for c in names if c not in NON_FEATURE_COLUMNS]
+    medians = {
+        col: float(load_frame(path, columns=[col])[col].median())
+        for col in input_columns
+    }
+    return FeaturePipeline(input_columns, medians, feature_columns_for(input_columns))
+
+
+class BatchIter(xgb.DataIter):
+    """
+    Feed one split of a Parquet dataset to XGBoost, ``batch_rows`` at a time.
+
+    Each batch is imputed and extended with the derived features by
+    ``feature_pipeline.transform`` just before XGBoost consumes it.
+    ``shard=(rank, world_size)`` keeps one worker's share of the rows for
+    distributed training. With ``cache_prefix`` set, ``xgb.DMatrix(it)`` keeps its pages on disk
+    there (external memory); otherwise pass it to ``xgb.QuantileDMatrix``.
+    """
+
+    def __init__(
+        self,
+        path,
+        feature_pipeline,
+        split=None,
+        batch_rows=BATCH_ROWS,
+        cache_prefix=None,
+        shard=None,
+    ):
+        self.path = path
+        self.feature_pipeline = feature_pipeline
+        self.split = split
+        self.batch_rows = batch_rows
+        self.shard = shard
+        self._columns = [ID_COLUMN, LABEL_COLUMN] + feature_pipeline.input_columns
+        self._batches = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def reset(self):
+        self._batches = None
+
+    def next(self, input_data):
+        if self._batches is None:
+            self._batches = iter_split(
+                self.path, self.split, self._columns, self.batch_rows, self.shard
+            )
+        batch = next(self._batches, None)
+        if batch is None:
+            return 0
+        frame, _ = batch
+        input_data(
+            data=self.feature_pipeline.transform(frame),
+            label=frame[LABEL_COLUMN].to_numpy(dtype=np.float32),
+            feature_names=self.feature_pipeline.feature_columns,
+        )
+        return 1
+
+
+def make_matrices(
+    path,
+    feature_pipeline,
+    matrix="quantile",
+    batch_rows=BATCH_ROWS,
+    max_bin=256,
+    cache_dir=None,
+    shard=None,
+):
+    """
+    Build the ``(dtrain, dval)`` pair from the train and validation splits.
+
+    ``matrix="quantile"`` quantizes both into ``QuantileDMatrix`` objects
+    (validation cut points taken from training); ``"external"`` builds
+    external-memory ``DMatrix`` objects cached under ``cache_dir``.
+    """
+    if matrix not in ("quantile", "external"):
+        raise ValueError(f"Unknown training matrix: {matrix!r}")
+
+    def batches(split):
+        cache_prefix = None
+        if matrix == "external":
+            name = split if shard is None else f"{split}-{shard[0]}"
+            cache_prefix = os.path.join(cache_dir, f"{name}.cache")
+        return BatchIter(
+            path,
+            feature_pipeline,
+            split,
+            batch_rows,
+            cache_prefix=cache_prefix,
+            shard=shard,
+        )
+
+    if matrix == "quantile":
+        dtrain = xgb.QuantileDMatrix(batches("train"), max_bin=max_bin)
+        dval = xgb.QuantileDMatrix(batches("validation"), ref=dtrain, max_bin=max_bin)
+    else:
+        dtrain = xgb.DMatrix(batches("train"))
+        dval = xgb.DMatrix(batches("validation"))
+    return dtrain, dval
+
+
+def write_training_snapshot(
+    path, feature_pipeline, snapshot_path, sample_rows=100_000, batch_rows=BATCH_ROWS
+):
+    """
+    Stream the prepared training split to ``snapshot_path`` (Parquet).
+
+    Returns a uniform sample of at most about ``sample_rows`` prepared rows
+    (features plus label), used for the drift reference profile and for
+    tuning, which need the values in memory.
+    """
+    columns = [ID_COLUMN, LABEL_COLUMN] + feature_pipeline.input_columns
+    fraction = min(1.0, sample_rows / max(1, open_dataset(path).count_rows()))
+    # Only train rows are kept, so over-sample to still end up near sample_rows
+    fraction = min(1.0, fraction / (1 - TEST_FRACTION) / (1 - VALIDATION_FRACTION))
+
+    writer, samples = None, []
+    try:
+        for frame, hashes in iter_split(path, "train", columns, batch_rows):
+            prepared = pd.DataFrame(
+                feature_pipeline.transform(frame),
+                columns=feature_pipeline.feature_columns,
+            )
+            prepared[LABEL_COLUMN] = frame[LABEL_COLUMN].to_numpy()
+            table = pa.Table.from_pandas(prepared, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(
+                    snapshot_path, table.schema, compression="zstd"
+                )
+            writer.write_table(table)
+            samples.append(prepared[_sample_mask(hashes, fraction)])
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if not samples:
+        raise ValueError(f"No training rows in {path}")
+    return pd.concat(samples, ignore_index=True)
+
+
+def predict_split(booster, path, feature_pipeline, split="test", **predict_kwargs):
+    """Predict every ``split`` row batch by batch; returns ``(labels, preds)``."""
+    columns = [ID_COLUMN, LABEL_COLUMN] + feature_pipeline.input_columns
+    labels, preds = [], []
+    for frame, _ in iter_split(path, split, columns):
+        X = feature_pipeline.transform(frame)
+        preds.append(booster.inplace_predict(X, **predict_kwargs))
+        labels.append(frame[LABEL_COLUMN].to_numpy())
+    if not preds:
+        raise ValueError(f"No {split} rows in {path}")
+    return np.concatenate(labels), np.concatenate(preds)
@@ -1,5 +1,8 @@
+import numpy as np
+import pandas as pd
 import pandera as pa
 from pandera import Column, DataFrameSchema
+from pandera.engines import pandas_engine
 
 patient_feature_schema = DataFrameSchema(
     {
@@ -12,3 +15,209 @@ patient_feature_schema = DataFrameSchema(
         "systolic_bp": Column(float, pa.Check.in_range(50, 250)),
     }
 )
+
+
+def _check_passes(check, value) -> bool:
+    """Evaluate a built-in pandera check on a single scalar."""
+    stats = check.statistics
+    if check.name == "in_range":
+        lower_ok = (
+            value >= stats["min_value"]
+            if stats["include_min"]
+            else value > stats["min_value"]
+        )
+        upper_ok = (
+            value <= stats["max_value"]
+            if stats["include_max"]
+            else value < stats["max_value"]
+        )
+        return lower_ok and upper_ok
+    if check.name == "isin":
+        return value in stats["allowed_values"]
+    if check.name == "greater_than_or_equal_to":
+        return value >= stats["min_value"]
+    if check.name == "greater_than":
+        return value > stats["min_value"]
+    if check.name == "less_than_or_equal_to":
+        return value <= stats["max_value"]
+    if check.name == "less_than":
+        return value < stats["max_value"]
+    # Anything custom goes through pandera itself
+    return bool(check(pd.Series([value])).check_passed)
+
+
+def record_violations(record, schema=patient_feature_schema) -> list:
+    """
+    Validate one already-typed record (e.g. a Pydantic model's dict) against
+    the schema's null and value checks without building a DataFrame.
+
+    Returns a list of error messages; empty when the record is valid.
+    """
+    errors = []
+    for name, column in schema.columns.items():
+        value = record.get(name)
+        if value is None or value != value:
+            if not column.nullable:
+                errors.append(f"{name}: null value not allowed")
+            continue
+        for check in column.checks:
+            if not _check_passes(check, value):
+                errors.append(f"{name}: failed {check.error} (got {value})")
+    return errors
+
+
+def _compile_check(check):
+    """Turn a built-in pandera check into a vectorized ``values -> bool mask``."""
+    stats = check.statistics
+    if check.name == "in_range":
+        lo, hi = stats["min_value"], stats["max_value"]
+        lower = np.greater_equal if stats["include_min"] else np.greater
+        upper = np.less_equal if stats["include_max"] else np.less
+        return lambda v: lower(v, lo) & upper(v, hi)
+    if check.name == "isin":
+        allowed = list(stats["allowed_values"])
+        return lambda v: np.isin(v, allowed)
+    if check.name == "greater_than_or_equal_to":
+        return lambda v: v >= stats["min_value"]
+    if check.name == "greater_than":
+        return lambda v: v > stats["min_value"]
+    if check.name == "less_than_or_equal_to":
+        return lambda v: v <= stats["max_value"]
+    if check.name == "less_than":
+        return lambda v: v < stats["max_value"]
+
+    # Anything custom goes through pandera itself (nulls may be dropped)
+    def run_pandera(v):
+        output = check(pd.Series(v)).check_output
+        return output.reindex(range(len(v)), fill_value=True).to_numpy(dtype=bool)
+
+    return run_pandera
+
+
+def _null_mask(values) -> np.ndarray:
+    if values.dtype.kind == "f":
+        return np.isnan(values)
+    if values.dtype.kind in "iub":
+        return np.zeros(len(values), dtype=bool)
+    return pd.isna(values)
+
+
+class ValidationResult:
+    """
+    Outcome of :meth:`CompiledValidator.validate`.
+
+    ``codes`` has one int8 per (row, column): 0 = valid, 1 = null where not
+    allowed, ``k + 2`` = failed the column's k-th check. ``mask`` is the
+    boolean violation mask and ``dtype_errors`` lists column-level problems
+    (missing columns, wrong dtypes) that are not attributable to a row.
+    """
+
+    def __init__(self, validator, columns, codes, values, dtype_errors):
+        self._validator = validator
+        self.columns = columns
+        self.codes = codes
+        self._values = values
+        self.dtype_errors = dtype_errors
+
+    @property
+    def mask(self) -> np.ndarray:
+        return self.codes != 0
+
+    @property
+    def invalid_rows(self) -> np.ndarray:
+        """Positions of rows with at least one violation."""
+        return np.flatnonzero(self.mask.any(axis=1))
+
+    @property
+    def ok(self) -> bool:
+        return not self.dtype_errors and not self.codes.any()
+
+    def row_errors(self, position) -> list:
+        """Error messages for one row, in the same format as record_violations."""
+        errors = []
+        for j in np.flatnonzero(self.codes[position]):
+            name = self.columns[j]
+            code = self.codes[position, j]
+            if code == 1:
+                errors.append(f"{name}: null value not allowed")
+            else:
+                check = self._validator.checks[name][code - 2]
+                value = self._values[name][position]
+                errors.append(f"{name}: failed {check.error} (got {value})")
+        return errors
+
+    def errors(self) -> list:
+        """Every message: column-level problems first, then row by row."""
+        messages = list(self.dtype_errors)
+        for position in self.invalid_rows:
+            messages.extend(self.row_errors(position))
+        return messages
+
+
+class CompiledValidator:
+    """
+    Vectorized validator generated from a pandera ``DataFrameSchema``.
+
+    Each column's dtype, nullability and built-in checks (in_range, isin,
+    ge/gt/le/lt) are compiled once into NumPy comparisons, so validating a
+    batch costs a handful of array operations per column instead of
+    pandera's per-check machinery. pandera stays the reference
+    implementation (see tests/test_schema.py).
+    """
+
+    def __init__(self, schema=patient_feature_schema):
+        self.schema = schema
+        self.columns = list(schema.columns)
+        self.checks = {name: list(col.checks) for name, col in schema.columns.items()}
+        self._compiled = {
+            name: [_compile_check(check) for check in checks]
+            for name, checks in self.checks.items()
+        }
+        self._dtype_ok = {}
+
+    def _check_dtype(self, name, dtype) -> bool:
+        key = (name, dtype)
+        if key not in self._dtype_ok:
+            expected = self.schema.columns[name].dtype
+            self._dtype_ok[key] = expected is None or bool(
+                expected.check(pandas_engine.Engine.dtype(dtype))
+            )
+        return self._dtype_ok[key]
+
+    def validate(self, data) -> ValidationResult:
+        """Validate a DataFrame (or a mapping of column -> 1-D array)."""
+        n_rows = len(data) if isinstance(data, pd.DataFrame) else None
+        codes, values, dtype_errors = None, {}, []
+
+        for j, name in enumerate(self.columns):
+            if name not in data:
+                dtype_errors.append(f"column '{name}' not in dataframe")
+                continue
+            column = np.asarray(data[name])
+            values[name] = column
+            if n_rows is None:
+                n_rows = len(column)
+            if codes is None:
+                codes = np.zeros((n_rows, len(self.columns)), dtype=np.int8)
+
+            if not self._check_dtype(name, column.dtype):
+                dtype_errors.append(
+                    f"{name}: expected {self.schema.columns[name].dtype}, "
+                    f"got {column.dtype}"
+                )
+                if column.dtype.kind not in "iufb":
+                    continue
+
+            null = _null_mask(column)
+            if not self.schema.columns[name].nullable:
+                codes[null, j] = 1
+            for k, check_fn in enumerate(self._compiled[name]):
+                failed = ~np.asarray(check_fn(column), dtype=bool) & ~null
+                codes[failed & (codes[:, j] == 0), j] = k + 2
+
+        if codes is None:
+            codes = np.zeros((n_rows or 0, len(self.columns)), dtype=np.int8)
+        return ValidationResult(self, self.columns, codes, values, dtype_errors)
+
+
+patient_feature_validator = CompiledValidator(patient_feature_schema)
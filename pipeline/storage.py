@@ -0,0 +1,116 @@
+"""
+Typed columnar storage for training datasets.
+
+Frames are written as Parquet (``.parquet``) or Arrow IPC / Feather
+(``.feather``, ``.arrow``) so integer, boolean and string columns round-trip
+with their dtypes; ``.csv`` is still supported as a legacy export. A
+directory of Parquet part files is read as one partitioned dataset.
+"""
+
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+PARQUET_SUFFIXES = (".parquet", ".pq")
+# Rows per batch when streaming a dataset with iter_frames
+BATCH_ROWS = 100_000
+FEATHER_SUFFIXES = (".feather", ".arrow", ".ipc")
+
+
+def _format(path):
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in PARQUET_SUFFIXES:
+        return "parquet"
+    if suffix in FEATHER_SUFFIXES:
+        return "feather"
+    if suffix == ".csv":
+        return "csv"
+    raise ValueError(f"Unsupported dataset format: {path}")
+
+
+def legacy_csv_enabled() -> bool:
+    """Whether to also write CSV copies of datasets (``EXPORT_LEGACY_CSV``)."""
+    return os.getenv("EXPORT_LEGACY_CSV", "false").lower() in ("1", "true", "yes")
+
+
+def csv_path_for(path):
+    return os.path.splitext(path)[0] + ".csv"
+
+
+def save_frame(df, path, legacy_csv=None, compression=None):
+    """
+    Write ``df`` to ``path`` in the format given by its extension.
+
+    Parquet defaults to zstd compression; Feather is written uncompressed so
+    it can be memory-mapped. With ``legacy_csv`` (default
+    ``$EXPORT_LEGACY_CSV``) a CSV copy is written next to it.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    fmt = _format(path)
+    if fmt == "csv":
+        df.to_csv(path, index=False)
+        return path
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == "parquet":
+        pq.write_table(table, path, compression=compression or "zstd")
+    else:
+        feather.write_feather(table, path, compression=compression or "uncompressed")
+
+    if legacy_csv if legacy_csv is not None else legacy_csv_enabled():
+        df.to_csv(csv_path_for(path), index=False)
+    return path
+
+
+def load_frame(path, columns=None, memory_map=False):
+    """
+    Read a frame written by :func:`save_frame` (or a legacy CSV).
+
+    ``path`` may also be a directory of Parquet part files, which are read
+    in file name order (files starting with ``_`` or ``.`` are skipped).
+    ``memory_map`` maps the file instead of reading it into memory; for
+    uncompressed Feather this keeps column buffers backed by the page cache.
+    """
+    fmt = "parquet" if os.path.isdir(path) else _format(path)
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=columns)
+    if fmt == "parquet":
+        table = pq.read_table(path, columns=columns, memory_map=memory_map)
+    else:
+        table = feather.read_table(path, columns=columns, memory_map=memory_map)
+    # Release Arrow buffers column by column while converting, so peak
+    # memory stays near one copy of the frame instead of two
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def open_dataset(path):
+    """Open a Parquet or Feather file, or a directory of Parquet parts, lazily."""
+    fmt = "parquet" if os.path.isdir(path) else _format(path)
+    if fmt == "csv":
+        raise ValueError(f"CSV datasets cannot be streamed: {path}")
+    return ds.dataset(path, format="ipc" if fmt == "feather" else "parquet")
+
+
+def iter_frames(path, columns=None, batch_rows=BATCH_ROWS):
+    """
+    Yield ``path`` as DataFrames of at most ``batch_rows`` rows, in file order.
+
+    Only one batch is decoded at a time (no read-ahead), so memory is
+    bounded by ``batch_rows`` rather than the size of the dataset.
+    """
+    batches = open_dataset(path).to_batches(
+        columns=columns,
+        batch_size=batch_rows,
+        batch_readahead=0,
+        fragment_readahead=0,
+    )
+    for batch in batches:
+        if batch.num_rows:
+            yield batch.to_pandas()
@@ -0,0 +1,246 @@
+"""
+Pure NumPy evaluator for XGBoost models saved as JSON.
+
+The saved booster (e.g. ``readmission_model.json``) is parsed into flat,
+padded node tables (feature index, threshold, left/right child, default
+direction, leaf value) and all trees are evaluated for a batch with
+vectorized traversal. This module never imports xgboost, so lightweight
+workers can serve the model with only NumPy installed.
+"""
+
+import json
+
+import numpy as np
+
+# Objectives whose prediction is sigmoid(margin); the rest are identity
+_LOGISTIC_OBJECTIVES = {"binary:logistic", "reg:logistic"}
+_IDENTITY_OBJECTIVES = {
+    "reg:squarederror",
+    "reg:squaredlogerror",
+    "reg:pseudohubererror",
+    "reg:absoluteerror",
+    "binary:logitraw",
+}
+
+
+class TreeEnsemble:
+    """
+    Array-backed tree ensemble evaluated with NumPy.
+
+    ``predict`` matches ``Booster.predict`` within float32 rounding of the
+    leaf sum. Only numerical splits of single-output models are supported.
+
+    ``iteration_range`` follows XGBoost: ``(0, 0)`` means all trees. The
+    default ``None`` uses the trees up to the early-stopping best iteration
+    (all trees for models without one).
+    """
+
+    def __init__(self, model: dict):
+        learner = model["learner"]
+        self.feature_names = learner.get("feature_names") or None
+        self.objective = learner["objective"]["name"]
+        if self.objective not in _LOGISTIC_OBJECTIVES | _IDENTITY_OBJECTIVES:
+            raise ValueError(f"Unsupported objective: {self.objective}")
+
+        params = learner["learner_model_param"]
+        if (
+            int(params.get("num_class", "0")) > 1
+            or int(params.get("num_target", "1")) > 1
+        ):
+            raise ValueError("Only single-output models are supported")
+
+        base_score = float(params["base_score"])
+        if self.objective in _LOGISTIC_OBJECTIVES:
+            base_score = np.log(base_score / (1.0 - base_score))
+        self.base_margin = np.float32(base_score)
+
+        booster = learner["gradient_booster"]
+        if booster["name"] != "gbtree":
+            raise ValueError(f"Unsupported booster: {booster['name']}")
+        trees = booster["model"]["trees"]
+        self.iteration_indptr = np.asarray(
+            booster["model"].get("iteration_indptr", range(len(trees) + 1))
+        )
+        best_iteration = learner.get("attributes", {}).get("best_iteration")
+        self.best_iteration = (
+            int(best_iteration) if best_iteration is not None else None
+        )
+
+        self._build_tables(trees)
+
+    def _build_tables(self, trees):
+        n_trees = len(trees)
+        max_nodes = max(len(tree["left_children"]) for tree in trees)
+
+        self.split_index = np.zeros((n_trees, max_nodes), dtype=np.int32)
+        self.threshold = np.zeros((n_trees, max_nodes), dtype=np.float32)
+        self.left = np.full((n_trees, max_nodes), -1, dtype=np.int32)
+        self.right = np.full((n_trees, max_nodes), -1, dtype=np.int32)
+        self.default_left = np.zeros((n_trees, max_nodes), dtype=bool)
+        self.value = np.zeros((n_trees, max_nodes), dtype=np.float32)
+
+        depth = 0
+        for t, tree in enumerate(trees):
+            if any(tree.get("split_type", [])):
+                raise ValueError("Categorical splits are not supported")
+            n = len(tree["left_children"])
+            left = np.asarray(tree["left_children"], dtype=np.int32)
+            self.split_index[t, :n] = tree["split_indices"]
+            self.left[t, :n] = left
+            self.right[t, :n] = tree["right_children"]
+            self.default_left[t, :n] = np.asarray(tree["default_left"], dtype=bool)
+            # For leaves XGBoost stores the leaf value in split_conditions
+            conditions = np.asarray(tree["split_conditions"], dtype=np.float32)
+            is_leaf = left == -1
+            self.threshold[t, :n] = np.where(is_leaf, 0.0, conditions)
+            self.value[t, :n] = np.where(is_leaf, conditions, 0.0)
+            depth = max(
+                depth, _tree_depth(tree["left_children"], tree["right_children"])
+            )
+
+        self.max_depth = depth
+        self.is_leaf = self.left == -1
+
+        # Flat views for traversal: node id -> row in the flattened table
+        self._offsets = (np.arange(n_trees) * max_nodes).astype(np.int64)
+        self._flat = {
+            "feature": self.split_index.ravel(),
+            "threshold": self.threshold.ravel(),
+            "left": (self.left + self._offsets[:, None]).ravel(),
+            "right": (self.right + self._offsets[:, None]).ravel(),
+            "default_left": self.default_left.ravel(),
+            "is_leaf": self.is_leaf.ravel(),
+            "value": self.value.ravel(),
+        }
+
+    @classmethod
+    def load(cls, path) -> "TreeEnsemble":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    @property
+    def n_trees(self) -> int:
+        return self.split_index.shape[0]
+
+    def _tree_range(self, iteration_range):
+        if iteration_range is None:
+            if self.best_iteration is None:
+                return 0, self.n_trees
+            iteration_range = (0, self.best_iteration + 1)
+        begin, end = iteration_range
+        if end == 0:
+            # XGBoost: an end of 0 means up to the last iteration
+            end = len(self.iteration_indptr) - 1
+        return int(self.iteration_indptr[begin]), int(self.iteration_indptr[end])
+
+    def leaf_values(self, X, tree_range=None) -> np.ndarray:
+        """Leaf value reached in every tree, shape ``(n_rows, n_trees)``."""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        begin, end = tree_range or (0, self.n_trees)
+        flat = self._flat
+        n_rows, n_features = X.shape
+
+        # One cursor per (row, tree), as an index into the flat node tables
+        node = np.broadcast_to(self._offsets[begin:end], (n_rows, end - begin)).copy()
+        row_base = (np.arange(n_rows, dtype=np.int64) * n_features)[:, None]
+        X_flat = X.ravel()
+
+        for _ in range(self.max_depth):
+            x = X_flat.take(row_base + flat["feature"].take(node))
+            go_left = np.where(
+                np.isnan(x),
+                flat["default_left"].take(node),
+                x < flat["threshold"].take(node),
+            )
+            child = np.where(go_left, flat["left"].take(node), flat["right"].take(node))
+            node = np.where(flat["is_leaf"].take(node), node, child)
+
+        return flat["value"].take(node)
+
+    def predict_margin(self, X, iteration_range=None, chunk_size=4096) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        tree_range = self._tree_range(iteration_range)
+
+        margin = np.full(X.shape[0], self.base_margin, dtype=np.float32)
+        for start in range(0, X.shape[0], chunk_size):
+            leaves = self.leaf_values(X[start : start + chunk_size], tree_range)
+            # float32 sum like XGBoost (pairwise, so rounding may differ by ~1 ulp)
+            margin[start : start + chunk_size] += leaves.sum(axis=1, dtype=np.float32)
+        return margin
+
+    def predict(self, X, output_margin=False, iteration_range=None) -> np.ndarray:
+        margin = self.predict_margin(X, iteration_range=iteration_range)
+        if output_margin or self.objective not in _LOGISTIC_OBJECTIVES:
+            return margin
+        return (1.0 / (1.0 + np.exp(-margin.astype(np.float64)))).astype(np.float32)
+
+    # Drop-in for Booster.inplace_predict (e.g. in FastPathScorer)
+    inplace_predict = predict
+
+
+def _tree_depth(left_children, right_children) -> int:
+    depth, frontier = 0, [0]
+    while frontier:
+        frontier = [
+            child
+            for node in frontier
+            for child in (left_children[node], right_children[node])
+            if child != -1
+        ]
+        if frontier:
+            depth += 1
+    return depth
+
+
+def generate_predictor_source(ensemble: TreeEnsemble, iteration_range=None) -> str:
+    """
+    Generate pure-Python source for a single-row predictor.
+
+    The result defines ``predict_row(x)`` where ``x`` is a sequence of
+    float32-representable feature values (NaN = missing). Each tree becomes a
+    nested if/else block; thresholds are emitted as exact float32 values.
+    """
+    begin, end = ensemble._tree_range(iteration_range)
+    lines = ["import math", "", "", "def predict_row(x):"]
+    lines.append(f"    margin = {float(ensemble.base_margin)!r}")
+
+    def emit(t, node, indent):
+        pad = "    " * indent
+        if ensemble.is_leaf[t, node]:
+            lines.append(f"{pad}margin += {float(ensemble.value[t, node])!r}")
+            return
+        feature = int(ensemble.split_index[t, node])
+        threshold = float(ensemble.threshold[t, node])
+        # NaN compares False: route missing values by default_left
+        if ensemble.default_left[t, node]:
+            lines.append(f"{pad}if not (x[{feature}] >= {threshold!r}):")
+        else:
+            lines.append(f"{pad}if x[{feature}] < {threshold!r}:")
+        emit(t, int(ensemble.left[t, node]), indent + 1)
+        lines.append(f"{pad}else:")
+        emit(t, int(ensemble.right[t, node]), indent + 1)
+
+    for t in range(begin, end):
+        emit(t, 0, 1)
+
+    if ensemble.objective in _LOGISTIC_OBJECTIVES:
+        lines.append("    return 1.0 / (1.0 + math.exp(-margin))")
+    else:
+        lines.append("    return margin")
+    return "\n".join(lines) + "\n"
+
+
+def compile_predictor(ensemble: TreeEnsemble, iteration_range=None):
+    """Compile :func:`generate_predictor_source` into a callable."""
+    namespace = {}
+    source = generate_predictor_source(ensemble, iteration_range=iteration_range)
+    exec(compile(source, "<tree_ensemble>", "exec"), namespace)
+    predict_row = namespace["predict_row"]
+
+    def predict(row):
+        # Round inputs to float32 exactly like XGBoost before comparing
+        return predict_row(np.asarray(row, dtype=np.float32).tolist())
+
+    return predict
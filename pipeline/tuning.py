@@ -1,15 +1,70 @@
+import hashlib
+import os
+
+import numpy as np
 import optuna
+import pandas as pd
 import xgboost as xgb
 from sklearn.metrics import roc_auc_score
 from sklearn.model_selection import train_test_split
 
+STUDY_NAME = "readmission-xgb"
+# Bump when the search space in objective() changes, so stored studies of
+# the old space are not resumed
+SEARCH_SPACE_VERSION = 1
+MAX_BOOST_ROUNDS = 500
+# Boosting rounds between pruning checks
+REPORT_INTERVAL = 10
+
+
+class PruningCallback(xgb.callback.TrainingCallback):
+    """
+    Report the validation metric to Optuna every ``interval`` boosting
+    rounds and stop hopeless trials early (like optuna-integration's
+    ``XGBoostPruningCallback``, without the extra dependency). Each report
+    is a storage write, so with a database-backed study reporting every
+    round costs more than the pruning saves.
+    """
+
+    def __init__(self, trial, observation_key="eval-auc", interval=REPORT_INTERVAL):
+        self.trial = trial
+        self.data_name, self.metric_name = observation_key.split("-", 1)
+        self.interval = interval
 
-def objective(trial, X, y):
+    def after_iteration(self, model, epoch, evals_log):
+        if (epoch + 1) % self.interval:
+            return False
+        score = evals_log[self.data_name][self.metric_name][-1]
+        # Step = boosting rounds trained so far
+        self.trial.report(score, step=epoch + 1)
+        if self.trial.should_prune():
+            raise optuna.TrialPruned(f"Trial was pruned at round {epoch + 1}.")
+        return False
+
+
+def make_tuning_data(X, y, test_size=0.2, random_state=42, max_bin=256):
+    """
+    Split once and build the matrices shared by every trial: the training
+    set is quantized up front (``QuantileDMatrix``), the validation set is
+    a plain ``DMatrix`` because predicting from raw values is faster than
+    from a quantized index.
+    """
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=test_size, random_state=random_state
+    )
+    dtrain = xgb.QuantileDMatrix(X_train, label=y_train, max_bin=max_bin)
+    dval = xgb.DMatrix(X_val, label=y_val)
+    return dtrain, dval, y_val
+
+
+def objective(trial, dtrain, dval, y_val, nthread=None, max_bin=256):
     """Defines the search space and trains an XGBoost model on each trial."""
 
     param = {
         "objective": "binary:logistic",
         "eval_metric": "auc",
+        "tree_method": "hist",
+        "max_bin": max_bin,
         "eta": trial.suggest_float("eta", 0.01, 0.3),
         "max_depth": trial.suggest_int("max_depth", 2, 10),
         "subsample": trial.suggest_float("subsample", 0.5, 1.0),
@@ -18,19 +73,15 @@ def objective(trial, X, y):
         "alpha": trial.suggest_float("alpha", 0.1, 3.0),
         "min_child_weight": trial.suggest_int("min_child_weight", 1, 10),
     }
-
-    X_train, X_val, y_train, y_val = train_test_split(
-        X, y, test_size=0.2, random_state=42
-    )
-
-    dtrain = xgb.DMatrix(X_train, label=y_train)
-    dval = xgb.DMatrix(X_val, label=y_val)
+    if nthread:
+        param["nthread"] = nthread
 
     booster = xgb.train(
         params=param,
         dtrain=dtrain,
         evals=[(dval, "eval")],
-        num_boost_round=trial.suggest_int("num_boost_round", 100, 500),
+        num_boost_round=trial.suggest_int("num_boost_round", 100, MAX_BOOST_ROUNDS),
+        callbacks=[PruningCallback(trial, "eval-auc")],
         verbose_eval=False,
     )
 
@@ -40,8 +91,94 @@ def objective(trial, X, y):
     return auc
 
 
-def tune_hyperparams(X, y, n_trials=25):
-    """Runs Optuna tuning process."""
-    study = optuna.create_study(direction="maximize")
-    study.optimize(lambda trial: objective(trial, X, y), n_trials=n_trials)
+def tuning_study_name(X, y, max_bin=256) -> str:
+    """
+    ``STUDY_NAME`` plus a fingerprint of the tuning data (shape, columns,
+    values and labels) and the search space, so a stored study is only
+    resumed for the same data and space.
+    """
+    frame = pd.DataFrame(X)
+    digest = hashlib.sha256()
+    digest.update(repr((frame.shape, list(frame.columns))).encode())
+    digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    digest.update(np.asarray(y, dtype=np.float64).tobytes())
+    digest.update(repr((SEARCH_SPACE_VERSION, MAX_BOOST_ROUNDS, max_bin)).encode())
+    return f"{STUDY_NAME}-{digest.hexdigest()[:12]}"
+
+
+def make_pruner(name="median"):
+    """``"median"``, ``"hyperband"`` or ``"none"``."""
+    if name == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=30)
+    if name == "hyperband":
+        return optuna.pruners.HyperbandPruner(
+            min_resource=30, max_resource=MAX_BOOST_ROUNDS, reduction_factor=3
+        )
+    if name == "none":
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"Unknown pruner: {name!r}")
+
+
+def tune_hyperparams(
+    X,
+    y,
+    n_trials=25,
+    n_jobs=None,
+    storage=None,
+    study_name=None,
+    pruner=None,
+    seed=None,
+    max_bin=256,
+):
+    """
+    Runs Optuna tuning process.
+
+    The split and DMatrix objects are built once for all trials, and
+    trials that fall behind are pruned every ``REPORT_INTERVAL`` rounds
+    (``pruner``, default ``$TUNING_PRUNER`` or "median"). ``n_jobs`` trials (default
+    ``$TUNING_N_JOBS`` or 1) run concurrently in threads, splitting the
+    cores between them; XGBoost releases the GIL while training.
+
+    With ``storage`` (an Optuna storage URL such as
+    ``sqlite:///data/optuna.db``, default ``$TUNING_STORAGE``) the study is
+    persisted: re-running resumes it up to ``n_trials`` finished trials,
+    and several processes can tune the same ``study_name`` at once. The
+    default name is :func:`tuning_study_name`, so only a run on the same
+    data and search space resumes; new data starts a new study. Pass
+    ``study_name`` explicitly to resume a study regardless of the data.
+    ``seed`` seeds the TPE sampler; ``max_bin`` must match training.
+    """
+    n_jobs = int(os.getenv("TUNING_N_JOBS", "1")) if n_jobs is None else n_jobs
+    storage = os.getenv("TUNING_STORAGE") if storage is None else storage
+    pruner = os.getenv("TUNING_PRUNER", "median") if pruner is None else pruner
+
+    dtrain, dval, y_val = make_tuning_data(X, y, max_bin=max_bin)
+    nthread = max(1, (os.cpu_count() or 1) // max(1, n_jobs))
+
+    if storage and study_name is None:
+        study_name = tuning_study_name(X, y, max_bin=max_bin)
+
+    study = optuna.create_study(
+        direction="maximize",
+        study_name=study_name if storage else None,
+        storage=storage or None,
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=make_pruner(pruner),
+        load_if_exists=True,
+    )
+    states = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    finished = len(study.get_trials(deepcopy=False, states=states))
+    if finished:
+        print(f"🔁 Resuming tuning study {study_name}: {finished} trials finished")
+    remaining = n_trials - finished
+    if remaining > 0:
+        study.optimize(
+            lambda trial: objective(
+                trial, dtrain, dval, y_val, nthread=nthread, max_bin=max_bin
+            ),
+            n_trials=remaining,
+            n_jobs=n_jobs,
+            # Stop at n_trials in total when other processes share the study
+            callbacks=[optuna.study.MaxTrialsCallback(n_trials, states=states)],
+        )
     return study.best_params
@@ -8,26 +8,59 @@ and trains the readmission prediction model.
 
 Usage:
     python run.py
+    FHIR_BULK_DIR=/path/to/export python run.py   # FHIR Bulk Data NDJSON
+    FHIR_FEATURE_CACHE= python run.py             # disable the feature cache
+    OUT_OF_CORE=quantile python run.py            # train from the saved dataset in batches
+    python run.py --workers 4                     # data-parallel training, 4 local processes
 """
 
-from pipeline.fhir_loader import build_dataset
-from pipeline.model import train_model
+import argparse
+import os
 
+from pipeline.feature_cache import DEFAULT_CACHE_PATH as FEATURE_CACHE
+from pipeline.fhir_loader import DATASET_PATH, build_bulk_dataset, build_dataset
+from pipeline.model import train_model, train_model_out_of_core
+from pipeline.storage import save_frame
 
-def main():
-    print("📥 Building dataset from FHIR bundles...")
-    df = build_dataset()
+
+def main(workers=1):
+    bulk_dir = os.getenv("FHIR_BULK_DIR")
+    if bulk_dir:
+        print(f"📥 Building dataset from FHIR Bulk export in {bulk_dir}...")
+        df = build_bulk_dataset(bulk_dir)
+    else:
+        print("📥 Building dataset from FHIR bundles...")
+        df = build_dataset(cache_path=os.getenv("FHIR_FEATURE_CACHE", FEATURE_CACHE))
     print(f"✔ Dataset loaded. Shape: {df.shape}")
 
+    dataset_path = save_frame(df, os.getenv("DATASET_PATH", DATASET_PATH))
+    print(f"✔ Dataset saved to {dataset_path}")
+
     print("🤖 Training readmission risk model...")
-    train_model(df, tune=True)
+    matrix = os.getenv("OUT_OF_CORE")  # "quantile" or "external"
+    if matrix or workers > 1:
+        # Train from the file in batches instead of the in-memory frame
+        del df
+        train_model_out_of_core(
+            dataset_path, tune=True, matrix=matrix or "quantile", workers=workers
+        )
+    else:
+        train_model(df, tune=True)
 
     print("🎉 Model training completed, model saved!")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the dataset and train.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("TRAINING_WORKERS", "1")),
+        help="Local worker processes for data-parallel training (default 1)",
+    )
+    args = parser.parse_args()
     try:
-        main()
+        main(workers=args.workers)
     except Exception as e:
         print("❌ Error during execution:", e)
         raise
@@ -0,0 +1,67 @@
+"""
+Benchmark data-parallel training wall-clock against the number of local
+workers, to size training nodes.
+
+Trains a fixed number of rounds (no early stopping) on a synthetic
+FHIR-shaped Parquet dataset: in-process for 1 worker, otherwise with
+``pipeline.distributed.train_distributed`` (one process per shard, cores
+split evenly). Matrix construction is included in the timing since every
+worker builds its own from disk.
+
+Usage:
+    python scripts/benchmark_distributed.py [n_rows] [rounds] [workers ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import xgboost as xgb
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmark_out_of_core import make_dataset  # noqa: E402
+from pipeline.distributed import train_distributed  # noqa: E402
+from pipeline.model import BASE_PARAMS, DEFAULT_PARAMS  # noqa: E402
+from pipeline.out_of_core import fit_feature_pipeline, make_matrices  # noqa: E402
+from pipeline.storage import save_frame  # noqa: E402
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    counts = [int(w) for w in sys.argv[3:]] or [1, 2, 4]
+    params = {**BASE_PARAMS, **DEFAULT_PARAMS, "max_bin": 256}
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "dataset.parquet")
+        save_frame(make_dataset(n), path, legacy_csv=False)
+        feature_pipeline = fit_feature_pipeline(path)
+
+        print(f"{n:,} rows, {rounds} rounds, {os.cpu_count()} cores\n")
+        print(f"{'workers':>7} {'wall s':>8} {'speedup':>8}")
+        baseline = None
+        for workers in counts:
+            start = time.perf_counter()
+            if workers == 1:
+                dtrain, dval = make_matrices(path, feature_pipeline)
+                xgb.train(
+                    params,
+                    dtrain,
+                    rounds,
+                    evals=[(dval, "validation")],
+                    verbose_eval=False,
+                )
+            else:
+                train_distributed(
+                    path, feature_pipeline, params, rounds, workers=workers
+                )
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            print(f"{workers:>7} {seconds:>8.1f} {baseline / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
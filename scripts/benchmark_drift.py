@@ -0,0 +1,73 @@
+"""
+Benchmark exact vs sketch-based drift detection.
+
+Compares ks_2samp over the raw current window against the mergeable
+DriftSketch path (4 simulated replicas, serialized and merged) for growing
+window sizes, reporting wall-clock time, serialized state size and the
+absolute KS statistic error.
+
+Usage:
+    python scripts/benchmark_drift.py
+"""
+
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import ks_2samp
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.monitor.drift import (  # noqa: E402
+    DriftSketch,
+    build_reference_profile,
+    merge_drift_sketches,
+)
+
+N_REPLICAS = 4
+
+
+def make_frame(n, shift=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "heart_rate": rng.normal(85 + shift, 15, n),
+            "creatinine": rng.lognormal(0.1, 0.4, n),
+        }
+    )
+
+
+def main():
+    reference = make_frame(100_000, seed=0)
+    profile = build_reference_profile(reference)
+
+    print(
+        f"{'rows':>10} {'exact_s':>9} {'sketch_s':>9} {'state_kb':>9} {'max|dKS|':>9}"
+    )
+    for n in (10_000, 100_000, 1_000_000, 5_000_000):
+        current = make_frame(n, shift=2.0, seed=1)
+
+        start = time.perf_counter()
+        exact = {col: ks_2samp(reference[col], current[col])[0] for col in reference}
+        exact_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        states = [
+            DriftSketch(profile).update(current.iloc[i::N_REPLICAS]).to_dict()
+            for i in range(N_REPLICAS)
+        ]
+        report = merge_drift_sketches(states, profile).report()
+        sketch_time = time.perf_counter() - start
+
+        state_kb = len(json.dumps(states[0])) / 1024
+        error = max(abs(report[col]["ks_stat"] - exact[col]) for col in reference)
+        print(
+            f"{n:>10,} {exact_time:>9.3f} {sketch_time:>9.3f} {state_kb:>9.1f} {error:>9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark per-row feature engineering latency at serving time.
+
+Compares the DataFrame path used before (prepare_features + column filter)
+with the fitted FeaturePipeline writing into a preallocated float32 buffer.
+
+Usage:
+    python scripts/benchmark_features.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.feature_engineering import (  # noqa: E402
+    NON_FEATURE_COLUMNS,
+    FeaturePipeline,
+    prepare_features,
+)
+
+N_SINGLE = 2000
+N_BATCH = 100_000
+
+
+def make_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "age": rng.integers(18, 90, n),
+            "gender": rng.integers(0, 2, n),
+            "num_encounters": rng.integers(1, 10, n),
+            "avg_los": rng.uniform(1, 15, n),
+            "creatinine": rng.uniform(0.5, 3.0, n),
+            "heart_rate": rng.uniform(60, 120, n),
+            "systolic_bp": rng.uniform(100, 180, n),
+        }
+    )
+
+
+def dataframe_path(df):
+    df = prepare_features(df)
+    return df[[c for c in df.columns if c not in NON_FEATURE_COLUMNS]]
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    pipeline = FeaturePipeline().fit(make_rows(5000))
+    row = make_rows(1, seed=1).iloc[0].to_dict()
+    buffer = np.empty((1, len(pipeline.feature_columns)), dtype=np.float32)
+
+    single_df = timed(lambda: dataframe_path(pd.DataFrame([row])), N_SINGLE)
+    single_np = timed(lambda: pipeline.transform(row, out=buffer), N_SINGLE)
+
+    batch = make_rows(N_BATCH, seed=2)
+    batch_df = timed(lambda: dataframe_path(batch), 5) / N_BATCH
+    batch_np = timed(lambda: pipeline.transform(batch), 5) / N_BATCH
+
+    print(f"{'path':<34} {'single row (us)':>16} {'per row @100k (us)':>20}")
+    print(
+        f"{'prepare_features (DataFrame)':<34} {single_df*1e6:>16.1f} {batch_df*1e6:>20.3f}"
+    )
+    print(
+        f"{'FeaturePipeline.transform':<34} {single_np*1e6:>16.1f} {batch_np*1e6:>20.3f}"
+    )
+    print(f"single-row speedup: {single_df / single_np:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
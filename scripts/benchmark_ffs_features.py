@@ -0,0 +1,286 @@
+"""
+Benchmark FFS stay-level feature steps on a synthetic claims stay table.
+
+The original row-by-row implementations are quadratic in the number of
+stays, so they are timed on small tables only; the vectorized versions
+in extract_ffs_features.py run on 1M+ stays.
+
+The end-to-end comparison of the pandas and SQLite window-function
+extraction modes runs against a generated claims database. On the same
+database the full pipeline (steps 1-6) is run once on the whole table and
+once in stream mode, each in a fresh subprocess, reporting wall time and
+peak RSS growth (Linux /proc only).
+
+Usage:
+    python scripts/benchmark_ffs_features.py [n_stays] [n_sql_stays] [partitions]
+"""
+
+import contextlib
+import io
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import extract_ffs_features as ffs  # noqa: E402
+
+
+def make_stays(n_stays, n_members, seed=0):
+    rng = np.random.default_rng(seed)
+    admit = pd.Timestamp("2020-01-01") + pd.to_timedelta(
+        rng.integers(0, 4 * 365, n_stays), unit="D"
+    )
+    los = rng.integers(0, 12, n_stays)
+    stays = pd.DataFrame(
+        {
+            "IPSTAY_ID": np.arange(n_stays),
+            "member_id": rng.integers(0, n_members, n_stays).astype(str),
+            "admit_date": admit,
+            "discharge_date": admit + pd.to_timedelta(los, unit="D"),
+            "length_of_stay": los.astype(float),
+            "total_paid_amount": rng.uniform(500, 50000, n_stays).round(2),
+        }
+    )
+    stays.loc[rng.random(n_stays) < 0.02, "discharge_date"] = pd.NaT
+    return stays
+
+
+def loop_readmission_target(stays_df, readmission_window_days=30):
+    """The original per-member / per-stay implementation."""
+    stays_df = stays_df.sort_values(["member_id", "discharge_date"]).copy()
+    stays_df["readmitted_30d"] = 0
+    for member_id in stays_df["member_id"].unique():
+        member_stays = stays_df[stays_df["member_id"] == member_id].copy()
+        if len(member_stays) > 1:
+            for i in range(len(member_stays) - 1):
+                current_discharge = member_stays.iloc[i]["discharge_date"]
+                next_admit = member_stays.iloc[i + 1]["admit_date"]
+                if pd.notna(current_discharge) and pd.notna(next_admit):
+                    days_between = (next_admit - current_discharge).days
+                    if 0 < days_between <= readmission_window_days:
+                        stay_id = member_stays.iloc[i]["IPSTAY_ID"]
+                        stays_df.loc[
+                            stays_df["IPSTAY_ID"] == stay_id, "readmitted_30d"
+                        ] = 1
+    return stays_df
+
+
+def loop_member_historical_features(stays_df):
+    """The original nested iterrows implementation."""
+    stays_df = stays_df.sort_values(["member_id", "discharge_date"]).copy()
+    stays_df["stay_sequence"] = 0
+    stays_df["total_historical_stays"] = 0
+    stays_df["avg_historical_los"] = 0.0
+    stays_df["days_since_last_stay"] = np.nan
+    stays_df["total_historical_paid"] = 0.0
+    for member_id in stays_df["member_id"].unique():
+        member_stays = stays_df[stays_df["member_id"] == member_id].copy()
+        member_stays = member_stays.sort_values("discharge_date")
+        for idx, (_, stay) in enumerate(member_stays.iterrows()):
+            rows = stays_df["IPSTAY_ID"] == stay["IPSTAY_ID"]
+            stays_df.loc[rows, "stay_sequence"] = idx + 1
+            if idx > 0:
+                prior_stays = member_stays.iloc[:idx]
+                stays_df.loc[rows, "total_historical_stays"] = len(prior_stays)
+                if prior_stays["length_of_stay"].notna().any():
+                    avg_los = prior_stays["length_of_stay"].mean()
+                    stays_df.loc[rows, "avg_historical_los"] = avg_los
+                last_discharge = prior_stays.iloc[-1]["discharge_date"]
+                current_admit = stay["admit_date"]
+                if pd.notna(last_discharge) and pd.notna(current_admit):
+                    days_since = (current_admit - last_discharge).days
+                    stays_df.loc[rows, "days_since_last_stay"] = days_since
+                if prior_stays["total_paid_amount"].notna().any():
+                    total_paid = prior_stays["total_paid_amount"].sum()
+                    stays_df.loc[rows, "total_historical_paid"] = total_paid
+    return stays_df
+
+
+def make_claims_db(path, n_stays, n_members, seed=0):
+    """sas_table_subset with 1-3 claim lines per stay (unused columns NULL)."""
+    rng = np.random.default_rng(seed)
+    admit = pd.Timestamp("2020-01-01") + pd.to_timedelta(
+        rng.integers(0, 4 * 365, n_stays), unit="D"
+    )
+    los = rng.integers(0, 12, n_stays)
+    stays = pd.DataFrame(
+        {
+            "IPSTAY_ID": np.arange(1, n_stays + 1),
+            "C_HDR_MBR_SYS_ID": rng.integers(0, n_members, n_stays),
+            "C_HDR_ADMIT_DT": admit.strftime("%Y-%m-%d"),
+            "C_HDR_DISCH_DT": (admit + pd.to_timedelta(los, unit="D")).strftime(
+                "%Y-%m-%d"
+            ),
+            "IPSTAY_LOS": los,
+            "C_HDR_MBR_AGE": rng.integers(18, 90, n_stays),
+            "C_HDR_MBR_GENDER_CD": rng.choice(["F", "M"], n_stays),
+            "C_HDR_DIAG_PRIM_CD": rng.choice(["I500", "J441", "N179"], n_stays),
+            "BILL_AMT": rng.uniform(9000, 20000, n_stays).round(2),
+            "PAID_AMT": rng.uniform(100, 9000, n_stays).round(2),
+        }
+    )
+    lines = stays.loc[stays.index.repeat(rng.integers(1, 4, n_stays))]
+    for column in [
+        "IPSTAY_BEG_DT",
+        "IPSTAY_END_DT",
+        "C_HDR_MBR_RACE_CD",
+        "C_HDR_DIAG_1_CD",
+        "C_HDR_DIAG_2_CD",
+        "C_HDR_DIAG_3_CD",
+        "C_HDR_DRG_CD",
+        "C_HDR_DRG_CD_DESC",
+        "R_CD_REL_WT_AMT",
+        "C_HDR_ADMIT_TYP_CD",
+        "C_HDR_ADMIT_TYP_CD_DESC",
+        "C_HDR_PMT_TY_CD",
+        "C_HDR_PMT_TY_CD_DESC",
+        "C_HDR_CLM_STAT_CD",
+        "IPSTAY_ID_PRIOR",
+        "IPSTAY_NUM_CLAIMS",
+        "ALLOW_AMT",
+        "IPSTAY_TOTAL_PAID",
+        "EXC_CD_H_1",
+        "EXC_CD_H_2",
+    ]:
+        lines[column] = None
+    with sqlite3.connect(path) as conn:
+        lines.to_sql("sas_table_subset", conn, index=False, chunksize=100_000)
+
+
+def pandas_mode(conn):
+    stays = ffs.extract_stay_level_features(conn)
+    stays = ffs.calculate_readmission_target(stays)
+    return ffs.add_member_historical_features(stays)
+
+
+def full_table_mode(db_path, output_dir):
+    with sqlite3.connect(db_path) as conn:
+        stays = pandas_mode(conn)
+    stays = ffs.add_temporal_features(stays)
+    stays = ffs.encode_categorical_features(stays)
+    stays = ffs.handle_missing_values(stays)
+    ffs.save_frame(stays, os.path.join(output_dir, "full.parquet"), legacy_csv=False)
+
+
+def _status_kb(field):
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def run_in_child(mode, db_path, output_dir, partitions):
+    """Runs in the subprocess: one end-to-end extraction, report time / RSS."""
+    baseline = _status_kb("VmRSS")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == "full":
+            full_table_mode(db_path, output_dir)
+        else:
+            ffs.extract_features_partitioned(
+                db_path, os.path.join(output_dir, "stream"), partitions=partitions
+            )
+    seconds = time.perf_counter() - start
+    peak = _status_kb("VmHWM")
+    print(json.dumps({"seconds": seconds, "rss_mb": (peak - baseline) / 1024}))
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        run_in_child(sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5]))
+        return
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    steps = [
+        (
+            "readmission target",
+            loop_readmission_target,
+            ffs.calculate_readmission_target,
+        ),
+        (
+            "member history",
+            loop_member_historical_features,
+            ffs.add_member_historical_features,
+        ),
+    ]
+
+    print(f"{'step':<22} {'impl':<11} {'stays':>10} {'seconds':>9}")
+    for name, loop_fn, vectorized_fn in steps:
+        for small in (2_000, 8_000):
+            stays = make_stays(small, small // 4)
+            expected, loop_s = timed(loop_fn, stays)
+            result, vec_s = timed(vectorized_fn, stays)
+            pd.testing.assert_frame_equal(result, expected)
+            print(f"{name:<22} {'loop':<11} {small:>10,} {loop_s:>9.2f}")
+            print(f"{name:<22} {'vectorized':<11} {small:>10,} {vec_s:>9.3f}")
+
+        stays = make_stays(n, n // 4)
+        _, vec_s = timed(vectorized_fn, stays)
+        print(f"{name:<22} {'vectorized':<11} {n:>10,} {vec_s:>9.2f}")
+
+    n_sql = int(sys.argv[2]) if len(sys.argv) > 2 else 300_000
+    partitions = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "claims.db")
+        make_claims_db(path, n_sql, n_sql // 4)
+        with sqlite3.connect(path) as conn:
+            _, pandas_s = timed(pandas_mode, conn)
+            # First SQL run includes building the index
+            _, sql_cold_s = timed(ffs.extract_stay_features_sql, conn)
+            _, sql_s = timed(ffs.extract_stay_features_sql, conn)
+
+        end_to_end = {}
+        for mode in ("full", "stream"):
+            out = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--child",
+                    mode,
+                    path,
+                    directory,
+                    str(partitions),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            end_to_end[mode] = json.loads(out.stdout.strip().splitlines()[-1])
+    print(
+        f"{'extraction (steps 1-3)':<22} {'pandas':<11} {n_sql:>10,} {pandas_s:>9.2f}"
+    )
+    print(
+        f"{'extraction (steps 1-3)':<22} {'sql+index':<11} {n_sql:>10,} {sql_cold_s:>9.2f}"
+    )
+    print(f"{'extraction (steps 1-3)':<22} {'sql':<11} {n_sql:>10,} {sql_s:>9.2f}")
+
+    print(
+        f"\n{'pipeline (steps 1-6)':<22} {'mode':<11} {'stays':>10} {'seconds':>9} {'RSS MB':>8}"
+    )
+    for mode, label in (("full", "full table"), ("stream", f"stream/{partitions}")):
+        result = end_to_end[mode]
+        print(
+            f"{'pipeline (steps 1-6)':<22} {label:<11} {n_sql:>10,} "
+            f"{result['seconds']:>9.2f} {result['rss_mb']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark the FHIR Bulk Data (NDJSON) reader in resources/second.
+
+Generates a synthetic $export (Patient / Encounter / Observation NDJSON)
+and streams it through iter_bulk_feature_rows with each JSON parser.
+About 7 resources (~1.3 KB) per patient: 2,000,000 patients is ~2.5 GB.
+
+Usage:
+    python scripts/benchmark_fhir_bulk.py [n_patients] [export_dir]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.fhir_loader import iter_bulk_feature_rows, orjson  # noqa: E402
+
+
+def write_export(directory, n):
+    rng = random.Random(0)
+    os.makedirs(directory, exist_ok=True)
+    base = datetime(2024, 1, 1)
+    with open(os.path.join(directory, "Patient.ndjson"), "w") as patients, open(
+        os.path.join(directory, "Encounter.ndjson"), "w"
+    ) as encounters, open(
+        os.path.join(directory, "Observation.ndjson"), "w"
+    ) as observations:
+        for i in range(n):
+            pid = f"patient-{i:08d}"
+            subject = {"reference": f"Patient/{pid}"}
+            patient = {
+                "resourceType": "Patient",
+                "id": pid,
+                "gender": rng.choice(["male", "female"]),
+                "birthDate": f"{rng.randint(1950, 2005)}-01-01",
+            }
+            patients.write(json.dumps(patient) + "\n")
+            for j in range(rng.randint(1, 3)):
+                admit = base + timedelta(days=rng.randint(0, 200))
+                discharge = admit + timedelta(days=rng.randint(2, 7))
+                encounter = {
+                    "resourceType": "Encounter",
+                    "id": f"{pid}-e{j}",
+                    "subject": subject,
+                    "period": {
+                        "start": admit.isoformat(),
+                        "end": discharge.isoformat(),
+                    },
+                    "status": "finished",
+                    "class": {"code": "IMP", "display": "inpatient encounter"},
+                }
+                encounters.write(json.dumps(encounter) + "\n")
+            for code in ("creatinine", "heart_rate", "systolic_bp"):
+                observation = {
+                    "resourceType": "Observation",
+                    "id": f"{pid}-{code}",
+                    "subject": subject,
+                    "status": "final",
+                    "code": {"text": code},
+                    "valueQuantity": {"value": round(rng.uniform(0.5, 150), 2)},
+                }
+                observations.write(json.dumps(observation) + "\n")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    directory = sys.argv[2] if len(sys.argv) > 2 else tempfile.mkdtemp()
+
+    if not os.path.exists(os.path.join(directory, "Patient.ndjson")):
+        start = time.perf_counter()
+        write_export(directory, n)
+        print(f"Generated export in {time.perf_counter() - start:.1f}s")
+
+    size = sum(
+        os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+    )
+    print(f"{directory}: {size / 1e9:.2f} GB\n")
+
+    parsers = ["json"] + (["orjson"] if orjson is not None else [])
+    print(f"{'parser':<8} {'rows':>10} {'resources':>11} {'seconds':>9} {'res/s':>11}")
+    for parser in parsers:
+        stats = {}
+        start = time.perf_counter()
+        rows = sum(
+            1 for _ in iter_bulk_feature_rows(directory, parser=parser, stats=stats)
+        )
+        seconds = time.perf_counter() - start
+        resources = sum(stats.values())
+        print(
+            f"{parser:<8} {rows:>10,} {resources:>11,} {seconds:>9.2f} "
+            f"{resources / seconds:>11,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
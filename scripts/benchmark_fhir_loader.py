@@ -0,0 +1,138 @@
+"""
+Benchmark FHIR bundle ingestion: legacy list-of-bundles vs streaming.
+
+Writes synthetic bundles to a temporary directory and reports wall time
+and peak Python heap (tracemalloc, parent process) for each mode, then
+cold vs warm builds through the incremental FeatureCache.
+
+Usage:
+    python scripts/benchmark_fhir_loader.py [n_bundles]
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.feature_cache import FeatureCache  # noqa: E402
+from pipeline.fhir_loader import (  # noqa: E402
+    build_dataset,
+    bundle_to_features,
+    load_fhir_bundles,
+)
+
+
+def write_bundles(directory, n):
+    rng = random.Random(0)
+    for i in range(n):
+        entries = [
+            {
+                "resource": {
+                    "resourceType": "Patient",
+                    "id": f"p{i}",
+                    "gender": rng.choice(["male", "female"]),
+                    "birthDate": f"{rng.randint(1950, 2005)}-01-01",
+                }
+            }
+        ]
+        for _ in range(rng.randint(1, 3)):
+            entries.append(
+                {
+                    "resource": {
+                        "resourceType": "Encounter",
+                        "period": {
+                            "start": "2024-03-01T00:00:00",
+                            "end": f"2024-03-0{rng.randint(2, 8)}T00:00:00",
+                        },
+                    }
+                }
+            )
+        for code in ("creatinine", "heart_rate", "systolic_bp"):
+            entries.append(
+                {
+                    "resource": {
+                        "resourceType": "Observation",
+                        "code": {"text": code},
+                        "valueQuantity": {"value": round(rng.uniform(0.5, 150), 2)},
+                    }
+                }
+            )
+        with open(os.path.join(directory, f"p{i}.json"), "w") as f:
+            json.dump({"entry": entries, "readmission_label": rng.randint(0, 1)}, f)
+
+
+def legacy_build(path):
+    return pd.DataFrame([bundle_to_features(b) for b in load_fhir_bundles(path)])
+
+
+def measure(fn):
+    start = time.perf_counter()
+    df = fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(df), elapsed, peak / 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    workers = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_bundles(directory, n)
+        path = os.path.join(directory, "*.json")
+
+        modes = [
+            ("legacy (json, list)", lambda: legacy_build(path)),
+            (
+                "streaming, json, 1 proc",
+                lambda: build_dataset(path, workers=1, parser="json"),
+            ),
+            ("streaming, auto, 1 proc", lambda: build_dataset(path, workers=1)),
+            (
+                f"streaming, auto, {workers} procs",
+                lambda: build_dataset(path, workers=workers),
+            ),
+        ]
+
+        print(f"{n:,} bundles\n")
+        print(f"{'mode':<28} {'rows':>8} {'seconds':>9} {'peak MB':>9}")
+        for name, fn in modes:
+            rows, seconds, peak_mb = measure(fn)
+            print(f"{name:<28} {rows:>8,} {seconds:>9.2f} {peak_mb:>9.1f}")
+
+        # Incremental feature cache: cold, warm, then warm after touching 1%
+        cache = FeatureCache(os.path.join(directory, "cache.parquet"))
+        files = sorted(os.listdir(directory))
+        runs = [
+            ("cache cold", None),
+            ("cache warm", None),
+            ("cache warm, 1% new", 0.01),
+        ]
+
+        print(f"\n{'mode':<28} {'seconds':>9} {'hits':>8} {'misses':>8}")
+        for name, fraction in runs:
+            if fraction:
+                for file in files[: int(len(files) * fraction)]:
+                    os.utime(os.path.join(directory, file), ns=(0, 0))
+            start = time.perf_counter()
+            cache.build(path, workers=1)
+            seconds = time.perf_counter() - start
+            stats = cache.stats
+            print(
+                f"{name:<28} {seconds:>9.2f} {stats['hits']:>8,} {stats['misses']:>8,}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark single-patient /predict scoring paths.
+
+- dataframe: pd.DataFrame -> pandera -> prepare_features -> DMatrix -> predict
+- fast path: record_violations -> FeaturePipeline.transform_row into a
+  reusable float32 buffer -> Booster.inplace_predict
+
+Usage:
+    python scripts/benchmark_inference.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.feature_engineering import FeaturePipeline, prepare_features  # noqa: E402
+from pipeline.inference import FastPathScorer  # noqa: E402
+from pipeline.model import FEATURE_PIPELINE_PATH, MODEL_PATH  # noqa: E402
+from pipeline.schema.data_schema import (  # noqa: E402
+    patient_feature_schema,
+    record_violations,
+)
+
+N_CALLS = 2000
+
+PATIENT = {
+    "age": 72,
+    "gender": 1,
+    "num_encounters": 2,
+    "avg_los": 4.5,
+    "creatinine": 1.8,
+    "heart_rate": 110.0,
+    "systolic_bp": 145.0,
+}
+
+
+def latencies(fn):
+    samples = np.empty(N_CALLS)
+    for i in range(N_CALLS):
+        start = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - start
+    return samples * 1e6
+
+
+def main():
+    booster = xgb.Booster()
+    booster.load_model(MODEL_PATH)
+    scorer = FastPathScorer(booster, FeaturePipeline.load(FEATURE_PIPELINE_PATH))
+
+    def dataframe_path():
+        df = patient_feature_schema.validate(pd.DataFrame([PATIENT]))
+        df = prepare_features(df)
+        return float(booster.predict(xgb.DMatrix(df))[0])
+
+    def fast_path():
+        assert not record_violations(PATIENT)
+        return scorer.predict(PATIENT)
+
+    assert abs(dataframe_path() - fast_path()) < 1e-6
+
+    print(f"{'path':<12} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for name, fn in (("dataframe", dataframe_path), ("fast path", fast_path)):
+        samples = latencies(fn)
+        print(
+            f"{name:<12} {np.percentile(samples, 50):>10.1f} "
+            f"{np.percentile(samples, 99):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark in-memory vs out-of-core training: wall time and peak RSS.
+
+Writes a synthetic FHIR-shaped dataset as Parquet, then trains on it in a
+fresh subprocess per mode (inside a scratch directory, so the repo's model
+artifacts are untouched) and reports the RSS growth caused by training
+(peak RSS minus RSS after imports; Linux /proc only). Tuning is off.
+
+Usage:
+    python scripts/benchmark_out_of_core.py [n_rows] [batch_rows]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.model import train_model, train_model_out_of_core  # noqa: E402
+from pipeline.storage import load_frame, save_frame  # noqa: E402
+
+
+def make_dataset(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "patient_id": [f"P{i}" for i in range(n)],
+            "age": rng.integers(18, 90, n),
+            "gender": rng.integers(0, 2, n),
+            "num_encounters": rng.integers(1, 10, n),
+            "avg_los": rng.uniform(1, 15, n),
+            "creatinine": rng.uniform(0.5, 3.0, n),
+            "heart_rate": rng.uniform(60, 120, n),
+            "systolic_bp": rng.uniform(100, 180, n),
+        }
+    )
+    df.loc[rng.random(n) < 0.05, "creatinine"] = np.nan
+    risk = (df["creatinine"].fillna(1.0) > 1.5) + (df["num_encounters"] > 6)
+    df["readmitted_30d"] = (risk + rng.normal(scale=0.7, size=n) > 1).astype(int)
+    return df
+
+
+def _status_kb(field):
+    # /proc rather than ru_maxrss, which survives exec from the parent
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def train_in_child(path, mode, batch_rows):
+    """Runs in the subprocess: train once and report time / RSS growth."""
+    baseline = _status_kb("VmRSS")
+    start = time.perf_counter()
+    if mode == "in-memory":
+        model = train_model(load_frame(path), tune=False)
+    else:
+        model = train_model_out_of_core(
+            path, tune=False, matrix=mode, batch_rows=batch_rows
+        )
+    seconds = time.perf_counter() - start
+    peak = _status_kb("VmHWM")
+    print(
+        json.dumps(
+            {
+                "seconds": seconds,
+                "rss_mb": (peak - baseline) / 1024,
+                "rounds": model.num_boosted_rounds(),
+            }
+        )
+    )
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        train_in_child(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+        return
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    batch_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "dataset.parquet")
+        save_frame(make_dataset(n), path, legacy_csv=False)
+        env = {**os.environ, "MLFLOW_TRACKING_URI": f"file://{directory}/mlruns"}
+
+        print(f"{n:,} rows, batches of {batch_rows:,}\n")
+        print(f"{'mode':<10} {'train s':>8} {'RSS MB':>8} {'rounds':>7}")
+        for mode in ("in-memory", "quantile", "external"):
+            out = subprocess.run(
+                [
+                    sys.executable,
+                    os.path.abspath(__file__),
+                    "--child",
+                    path,
+                    mode,
+                    str(batch_rows),
+                ],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=directory,
+                env=env,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{mode:<10} {result['seconds']:>8.1f} {result['rss_mb']:>8.1f} "
+                f"{result['rounds']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
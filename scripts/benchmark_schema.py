@@ -0,0 +1,68 @@
+"""
+Benchmark schema validation: pandera vs the compiled NumPy validator.
+
+Usage:
+    python scripts/benchmark_schema.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.schema.data_schema import (  # noqa: E402
+    patient_feature_schema,
+    patient_feature_validator,
+    record_violations,
+)
+
+
+def make_batch(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "age": rng.integers(18, 90, n),
+            "gender": rng.integers(0, 2, n),
+            "num_encounters": rng.integers(1, 10, n),
+            "avg_los": rng.uniform(1, 15, n),
+            "creatinine": rng.uniform(0.5, 3.0, n),
+            "heart_rate": rng.uniform(60, 120, n),
+            "systolic_bp": rng.uniform(100, 180, n),
+        }
+    )
+
+
+def per_call_ms(fn, repeat):
+    fn()  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    print(f"{'rows':>10} {'pandera (ms)':>14} {'compiled (ms)':>14} {'speedup':>9}")
+    for n, repeat in [(1, 200), (1_000, 50), (1_000_000, 3)]:
+        df = make_batch(n)
+        pandera_ms = per_call_ms(
+            lambda: patient_feature_schema.validate(df, lazy=True), repeat
+        )
+        compiled_ms = per_call_ms(
+            lambda: patient_feature_validator.validate(df).ok, repeat
+        )
+        print(
+            f"{n:>10,} {pandera_ms:>14.3f} {compiled_ms:>14.3f} "
+            f"{pandera_ms / compiled_ms:>8.1f}x"
+        )
+
+    record = make_batch(1).to_dict(orient="records")[0]
+    scalar_ms = per_call_ms(lambda: record_violations(record), 2000)
+    print(f"\nrecord_violations (one dict, no DataFrame): {scalar_ms * 1000:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark training-dataset storage formats: load time and RSS.
+
+Writes a snapshot-shaped frame as CSV, Parquet and Feather, then loads
+each one in a fresh subprocess and reports wall time and the RSS growth
+caused by the load (peak RSS minus RSS after imports; Linux /proc only).
+
+Usage:
+    python scripts/benchmark_storage.py [n_rows]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.storage import load_frame, save_frame  # noqa: E402
+
+
+def make_snapshot(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "age": rng.integers(18, 90, n),
+            "gender": rng.integers(0, 2, n),
+            "num_encounters": rng.integers(1, 10, n),
+            "avg_los": rng.uniform(1, 15, n),
+            "creatinine": rng.uniform(0.5, 3.0, n),
+            "heart_rate": rng.integers(60, 120, n),
+            "systolic_bp": rng.integers(90, 180, n),
+            "high_creatinine": rng.integers(0, 2, n),
+            "high_bp": rng.integers(0, 2, n),
+            "tachycardia": rng.integers(0, 2, n),
+            "encounter_los_ratio": rng.uniform(0, 5, n),
+            "readmitted_30d": rng.integers(0, 2, n).astype(bool),
+        }
+    )
+
+
+def _status_kb(field):
+    # /proc rather than ru_maxrss, which survives exec from the parent
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1])
+    return 0
+
+
+def load_in_child(path, memory_map):
+    """Runs in the subprocess: load once and report time / RSS growth."""
+    baseline = _status_kb("VmRSS")
+    start = time.perf_counter()
+    df = load_frame(path, memory_map=memory_map)
+    seconds = time.perf_counter() - start
+    peak = _status_kb("VmHWM")
+    ints = int(sum(dtype.kind == "i" for dtype in df.dtypes))
+    print(
+        json.dumps(
+            {"seconds": seconds, "rss_mb": (peak - baseline) / 1024, "ints": ints}
+        )
+    )
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        load_in_child(sys.argv[2], sys.argv[3] == "1")
+        return
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = make_snapshot(n)
+
+    with tempfile.TemporaryDirectory() as directory:
+        cases = [
+            ("csv (legacy)", "snapshot.csv", False),
+            ("parquet", "snapshot.parquet", False),
+            ("parquet, mmap", "snapshot.parquet", True),
+            ("feather", "snapshot.feather", False),
+            ("feather, mmap", "snapshot.feather", True),
+        ]
+        for _, name, _ in cases:
+            path = os.path.join(directory, name)
+            if not os.path.exists(path):
+                save_frame(df, path, legacy_csv=False)
+
+        print(f"{n:,} rows, {df.shape[1]} columns\n")
+        print(
+            f"{'format':<16} {'file MB':>8} {'load s':>8} {'RSS MB':>8} {'int cols':>9}"
+        )
+        for label, name, memory_map in cases:
+            path = os.path.join(directory, name)
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", path, str(int(memory_map))],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{label:<16} {os.path.getsize(path) / 1e6:>8.1f} "
+                f"{result['seconds']:>8.3f} {result['rss_mb']:>8.1f} {result['ints']:>9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark the NumPy tree evaluator against libxgboost.
+
+Usage:
+    python scripts/benchmark_tree_eval.py
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import xgboost as xgb
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.model import MODEL_PATH  # noqa: E402
+from pipeline.tree_eval import TreeEnsemble, compile_predictor  # noqa: E402
+
+
+def per_call_us(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    booster = xgb.Booster()
+    booster.load_model(MODEL_PATH)
+    ensemble = TreeEnsemble.load(MODEL_PATH)
+    predict_row = compile_predictor(ensemble)
+
+    rng = np.random.default_rng(0)
+    X = rng.uniform(0, 150, (10_000, booster.num_features())).astype(np.float32)
+    row = X[:1]
+
+    error = np.abs(ensemble.predict(X) - booster.inplace_predict(X)).max()
+    print(f"trees: {ensemble.n_trees}, max depth: {ensemble.max_depth}")
+    print(f"max |numpy - xgboost| over {len(X):,} rows: {error:.2e}\n")
+
+    print(f"{'path':<28} {'1 row (us)':>12} {'10k rows (ms)':>14}")
+    results = [
+        (
+            "xgboost inplace_predict",
+            per_call_us(lambda: booster.inplace_predict(row), 1000),
+            per_call_us(lambda: booster.inplace_predict(X), 10) / 1000,
+        ),
+        (
+            "numpy TreeEnsemble",
+            per_call_us(lambda: ensemble.predict(row), 1000),
+            per_call_us(lambda: ensemble.predict(X), 3) / 1000,
+        ),
+        (
+            "generated python predictor",
+            per_call_us(lambda: predict_row(row[0]), 1000),
+            per_call_us(lambda: [predict_row(r) for r in X], 1) / 1000,
+        ),
+    ]
+    for name, single, batch in results:
+        print(f"{name:<28} {single:>12.1f} {batch:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark Optuna tuning: wall-clock per study.
+
+- legacy: the previous objective (split + two DMatrix per trial, every
+  trial trains to completion), sequential
+- cached: split and DMatrix built once, no pruning
+- median / hyperband: cached data plus round-by-round pruning
+- median, n_jobs=2: two trials at a time in threads
+
+All studies use the same TPE seed and a SQLite study storage (except
+legacy, which has no storage), so "legacy" and "cached" run identical trials.
+
+Usage:
+    python scripts/benchmark_tuning.py [n_rows] [n_trials]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import optuna
+import pandas as pd
+import xgboost as xgb
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.tuning import STUDY_NAME, tune_hyperparams  # noqa: E402
+
+
+def make_data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(
+        {
+            "age": rng.integers(18, 90, n),
+            "gender": rng.integers(0, 2, n),
+            "num_encounters": rng.integers(1, 10, n),
+            "avg_los": rng.uniform(1, 15, n),
+            "creatinine": rng.uniform(0.5, 3.0, n),
+            "heart_rate": rng.integers(60, 120, n),
+            "systolic_bp": rng.integers(90, 180, n),
+        }
+    )
+    logit = (
+        0.03 * (X["age"] - 60)
+        + 0.4 * (X["num_encounters"] - 5)
+        + 1.2 * (X["creatinine"] - 1.5)
+        + rng.normal(scale=1.5, size=n)
+    )
+    return X, (logit > 0).astype(int)
+
+
+def legacy_objective(trial, X, y):
+    """The previous objective: re-splits and rebuilds DMatrix every trial."""
+    param = {
+        "objective": "binary:logistic",
+        "eval_metric": "auc",
+        "eta": trial.suggest_float("eta", 0.01, 0.3),
+        "max_depth": trial.suggest_int("max_depth", 2, 10),
+        "subsample": trial.suggest_float("subsample", 0.5, 1.0),
+        "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
+        "lambda": trial.suggest_float("lambda", 0.1, 3.0),
+        "alpha": trial.suggest_float("alpha", 0.1, 3.0),
+        "min_child_weight": trial.suggest_int("min_child_weight", 1, 10),
+    }
+    X_train, X_val, y_train, y_val = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+    dtrain = xgb.DMatrix(X_train, label=y_train)
+    dval = xgb.DMatrix(X_val, label=y_val)
+    booster = xgb.train(
+        params=param,
+        dtrain=dtrain,
+        evals=[(dval, "eval")],
+        num_boost_round=trial.suggest_int("num_boost_round", 100, 500),
+        verbose_eval=False,
+    )
+    return roc_auc_score(y_val, booster.predict(dval))
+
+
+def legacy_study(X, y, n_trials):
+    study = optuna.create_study(
+        direction="maximize", sampler=optuna.samplers.TPESampler(seed=0)
+    )
+    study.optimize(lambda trial: legacy_objective(trial, X, y), n_trials=n_trials)
+    return study.best_value
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    n_trials = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    X, y = make_data(n)
+
+    cases = [
+        ("legacy", lambda: legacy_study(X, y, n_trials)),
+        ("cached", dict(pruner="none", n_jobs=1)),
+        ("median", dict(pruner="median", n_jobs=1)),
+        ("hyperband", dict(pruner="hyperband", n_jobs=1)),
+        ("median, n_jobs=2", dict(pruner="median", n_jobs=2)),
+    ]
+
+    print(f"{n:,} rows, {n_trials} trials, {os.cpu_count()} CPU(s)\n")
+    print(f"{'study':<18} {'seconds':>9} {'best AUC':>9}")
+    for label, case in cases:
+        start = time.perf_counter()
+        if callable(case):
+            best_auc = case()
+        else:
+            with tempfile.TemporaryDirectory() as directory:
+                storage = f"sqlite:///{os.path.join(directory, 'optuna.db')}"
+                tune_hyperparams(
+                    X,
+                    y,
+                    n_trials=n_trials,
+                    storage=storage,
+                    study_name=STUDY_NAME,
+                    seed=0,
+                    **case,
+                )
+                study = optuna.load_study(study_name=STUDY_NAME, storage=storage)
+                best_auc = study.best_value
+        seconds = time.perf_counter() - start
+        print(f"{label:<18} {seconds:>9.1f} {best_auc:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
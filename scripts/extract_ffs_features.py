@@ -4,27 +4,40 @@ Transforms claim-level data into member-level and stay-level features
 for readmission risk prediction.
 """
 
+import argparse
+import glob
+import os
+import shutil
 import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from datetime import datetime, timedelta
 import warnings
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipeline.storage import (  # noqa: E402
+    csv_path_for, legacy_csv_enabled, load_frame, save_frame,
+)
 
 warnings.filterwarnings("ignore")
 
 DB_PATH = "data/dhcf_claims.db"
-OUTPUT_PATH = "data/ffs_features.csv"
+# Typed Parquet; EXPORT_LEGACY_CSV=true also writes data/ffs_features.csv
+OUTPUT_PATH = "data/ffs_features.parquet"
+# Partitioned dataset (one Parquet file per member range) written in stream mode
+OUTPUT_DIR = "data/ffs_features"
 
 
-def extract_stay_level_features(conn):
-    """
-    Extract features at the inpatient stay level.
-    Groups claim-level data by IPSTAY_ID.
-    """
-    print("Extracting stay-level features...")
-    
-    query = """
+# Claim lines -> one row per inpatient stay
+_STAY_AGGREGATE_TEMPLATE = """
     SELECT 
         IPSTAY_ID,
         C_HDR_MBR_SYS_ID as member_id,
@@ -63,12 +76,101 @@ def extract_stay_level_features(conn):
         COUNT(DISTINCT CASE WHEN EXC_CD_H_1 = '0102' THEN 1 END) as has_duplicate_flag
     FROM sas_table_subset
     WHERE IPSTAY_ID IS NOT NULL 
-      AND C_HDR_MBR_SYS_ID IS NOT NULL
+      AND C_HDR_MBR_SYS_ID IS NOT NULL{member_filter}
     GROUP BY IPSTAY_ID, C_HDR_MBR_SYS_ID
-    """
-    
-    df = pd.read_sql_query(query, conn)
-    
+"""
+STAY_AGGREGATE_SQL = _STAY_AGGREGATE_TEMPLATE.format(member_filter="")
+# Stays of the members in one key range (stream mode)
+STAY_PARTITION_SQL = _STAY_AGGREGATE_TEMPLATE.format(
+    member_filter="\n      AND C_HDR_MBR_SYS_ID BETWEEN :member_lo AND :member_hi"
+)
+
+# Claim lines per member, in member id order; used to cut key ranges
+MEMBER_LINE_COUNTS_SQL = """
+    SELECT C_HDR_MBR_SYS_ID, COUNT(*)
+    FROM sas_table_subset
+    WHERE IPSTAY_ID IS NOT NULL
+      AND C_HDR_MBR_SYS_ID IS NOT NULL
+    GROUP BY C_HDR_MBR_SYS_ID
+    ORDER BY C_HDR_MBR_SYS_ID
+"""
+
+# Indexes used by the SQL extraction mode: the stay aggregate walks claim
+# lines in (IPSTAY_ID, member) order instead of sorting them into a temp
+# B-tree for the GROUP BY.
+STAY_INDEXES = {
+    "idx_sas_stay_member": "IPSTAY_ID, C_HDR_MBR_SYS_ID",
+}
+# Stream mode: member key ranges become index range scans
+MEMBER_INDEXES = {
+    "idx_sas_member_stay": "C_HDR_MBR_SYS_ID, IPSTAY_ID",
+}
+
+# Per-member ordering features computed inside SQLite with window functions.
+# Day gaps are floored like pandas' Timedelta.days.
+STAY_WINDOW_SQL = """
+WITH stays AS (
+    SELECT
+        aggregated.*,
+        julianday(admit_date) AS admit_jd,
+        julianday(discharge_date) AS discharge_jd
+    FROM ({stays}) AS aggregated
+),
+ordered AS (
+    SELECT
+        stays.*,
+        ROW_NUMBER() OVER member_order AS stay_sequence,
+        LEAD(admit_jd) OVER member_order - discharge_jd AS gap_to_next,
+        admit_jd - LAG(discharge_jd) OVER member_order AS gap_from_prev,
+        AVG(length_of_stay) OVER member_prior AS prior_avg_los,
+        SUM(total_paid_amount) OVER member_prior AS prior_total_paid
+    FROM stays
+    WINDOW
+        member_order AS (
+            PARTITION BY member_id ORDER BY discharge_jd NULLS LAST, IPSTAY_ID
+        ),
+        member_prior AS (
+            member_order ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+        )
+),
+gaps AS (
+    SELECT
+        ordered.*,
+        CAST(gap_to_next AS INTEGER)
+            - (gap_to_next < CAST(gap_to_next AS INTEGER)) AS days_to_next,
+        CAST(gap_from_prev AS INTEGER)
+            - (gap_from_prev < CAST(gap_from_prev AS INTEGER)) AS days_from_prev
+    FROM ordered
+)
+SELECT
+    gaps.*,
+    CASE WHEN days_to_next > 0 AND days_to_next <= :window_days
+        THEN 1 ELSE 0 END AS readmitted_30d,
+    stay_sequence - 1 AS total_historical_stays,
+    COALESCE(prior_avg_los, 0.0) AS avg_historical_los,
+    days_from_prev AS days_since_last_stay,
+    COALESCE(prior_total_paid, 0.0) AS total_historical_paid
+FROM gaps
+ORDER BY member_id, discharge_jd NULLS LAST, IPSTAY_ID
+""".format(stays=STAY_AGGREGATE_SQL)
+
+# Columns produced by the readmission target and member-history steps
+SEQUENTIAL_FEATURES = [
+    'readmitted_30d',
+    'stay_sequence',
+    'total_historical_stays',
+    'avg_historical_los',
+    'days_since_last_stay',
+    'total_historical_paid',
+]
+SQL_HELPER_COLUMNS = [
+    'admit_jd', 'discharge_jd', 'gap_to_next', 'gap_from_prev',
+    'days_to_next', 'days_from_prev', 'prior_avg_los', 'prior_total_paid',
+]
+
+
+def _add_stay_derived_columns(df):
+    """Parse dates and add the per-stay derived columns."""
     # Convert dates
     date_cols = ['admit_date', 'discharge_date', 'stay_beg_date', 'stay_end_date']
     for col in date_cols:
@@ -83,39 +185,99 @@ def extract_stay_level_features(conn):
     # Extract diagnosis category (first 3 chars of ICD-10)
     if 'primary_diagnosis' in df.columns:
         df['diag_category'] = df['primary_diagnosis'].str[:3]
+    return df
+
+
+def extract_stay_level_features(conn, member_range=None):
+    """
+    Extract features at the inpatient stay level.
+    Groups claim-level data by IPSTAY_ID.
     
+    ``member_range`` (first, last member id) limits the extraction to one
+    partition of members.
+    """
+    print("Extracting stay-level features...")
+    
+    if member_range is None:
+        df = pd.read_sql_query(STAY_AGGREGATE_SQL, conn)
+    else:
+        member_lo, member_hi = member_range
+        df = pd.read_sql_query(
+            STAY_PARTITION_SQL, conn,
+            params={"member_lo": member_lo, "member_hi": member_hi},
+        )
+    df = _add_stay_derived_columns(df)
+    
+    print(f"  Extracted {len(df):,} stay-level records")
+    return df
+
+
+def ensure_indexes(conn, indexes=STAY_INDEXES):
+    """Create the indexes an extraction mode relies on (idempotent)."""
+    for name, columns in indexes.items():
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON sas_table_subset ({columns})"
+        )
+    conn.commit()
+
+
+def iter_stay_features_sql(conn, readmission_window_days=30, chunksize=100_000):
+    """
+    Yield stay-level frames with the readmission target and member-history
+    features already computed by SQLite window functions.
+    
+    Rows come out ordered by member and discharge date (ties broken by
+    IPSTAY_ID, missing discharge dates last), ``chunksize`` rows at a time.
+    """
+    ensure_indexes(conn)
+    chunks = pd.read_sql_query(
+        STAY_WINDOW_SQL,
+        conn,
+        params={"window_days": readmission_window_days},
+        chunksize=chunksize,
+    )
+    for chunk in chunks:
+        chunk = _add_stay_derived_columns(chunk)
+        chunk['days_since_last_stay'] = chunk['days_since_last_stay'].astype(float)
+        # Same column layout as the pandas mode
+        stay_columns = [
+            col for col in chunk.columns
+            if col not in SQL_HELPER_COLUMNS and col not in SEQUENTIAL_FEATURES
+        ]
+        yield chunk[stay_columns + SEQUENTIAL_FEATURES]
+
+
+def extract_stay_features_sql(conn, readmission_window_days=30, chunksize=100_000):
+    """SQL extraction mode: stays, target and history features in one query."""
+    print(f"Extracting stay-level features in SQLite ({readmission_window_days}-day window)...")
+    chunks = iter_stay_features_sql(conn, readmission_window_days, chunksize)
+    df = pd.concat(chunks, ignore_index=True)
     print(f"  Extracted {len(df):,} stay-level records")
+    print(f"  Readmission rate: {df['readmitted_30d'].mean() * 100:.2f}%")
     return df
 
 
 def calculate_readmission_target(stays_df, readmission_window_days=30):
     """
     Calculate readmission target variable.
-    For each stay, check if the member had another stay within the readmission window.
+    For each stay, check if the member's next stay (by discharge date) is
+    admitted within the readmission window after this discharge.
     """
     print(f"Calculating {readmission_window_days}-day readmission target...")
     
     # Sort by member and discharge date
     stays_df = stays_df.sort_values(['member_id', 'discharge_date']).copy()
     
-    # Initialize target
-    stays_df['readmitted_30d'] = 0
+    # Next stay of the same member is simply the next row after sorting
+    member_id = stays_df['member_id']
+    same_member = member_id.eq(member_id.shift(-1))
+    next_admit = stays_df['admit_date'].shift(-1).where(same_member)
+    days_between = (next_admit - stays_df['discharge_date']).dt.days
+    readmitted = (days_between > 0) & (days_between <= readmission_window_days)
     
-    # For each member, check if next stay is within readmission window
-    for member_id in stays_df['member_id'].unique():
-        member_stays = stays_df[stays_df['member_id'] == member_id].copy()
-        
-        if len(member_stays) > 1:
-            for i in range(len(member_stays) - 1):
-                current_discharge = member_stays.iloc[i]['discharge_date']
-                next_admit = member_stays.iloc[i + 1]['admit_date']
-                
-                if pd.notna(current_discharge) and pd.notna(next_admit):
-                    days_between = (next_admit - current_discharge).days
-                    if 0 < days_between <= readmission_window_days:
-                        # Mark current stay as having a readmission
-                        stay_id = member_stays.iloc[i]['IPSTAY_ID']
-                        stays_df.loc[stays_df['IPSTAY_ID'] == stay_id, 'readmitted_30d'] = 1
+    # Label every row of a flagged stay ID (stay IDs can repeat across members)
+    flagged_stays = stays_df.loc[readmitted, 'IPSTAY_ID'].unique()
+    stays_df['readmitted_30d'] = stays_df['IPSTAY_ID'].isin(flagged_stays).astype(int)
     
     readmission_rate = stays_df['readmitted_30d'].mean() * 100
     print(f"  Readmission rate: {readmission_rate:.2f}%")
@@ -124,54 +286,68 @@ def calculate_readmission_target(stays_df, readmission_window_days=30):
     return stays_df
 
 
+def _last_write_per_stay(stays_df, values, written, default):
+    """
+    Spread per-row values to every row sharing the row's IPSTAY_ID.
+    
+    Stay IDs can repeat across members; as with per-stay ``.loc`` writes, the
+    last written value (in sorted row order) wins for every row with that ID,
+    and IDs that were never written keep ``default``.
+    """
+    stay_ids = stays_df['IPSTAY_ID']
+    last = values[written].groupby(stay_ids[written], sort=False).last()
+    return stay_ids.map(last).fillna(default)
+
+
 def add_member_historical_features(stays_df):
     """
     Add member-level historical features (prior stays, historical averages, etc.)
+    computed from each member's earlier stays in discharge order.
     """
     print("Adding member historical features...")
     
     stays_df = stays_df.sort_values(['member_id', 'discharge_date']).copy()
     
-    # Initialize historical feature columns
-    stays_df['stay_sequence'] = 0
-    stays_df['total_historical_stays'] = 0
-    stays_df['avg_historical_los'] = 0.0
-    stays_df['days_since_last_stay'] = np.nan
-    stays_df['total_historical_paid'] = 0.0
+    # Rows are grouped by member, so "earlier stays of this member" are the
+    # preceding rows up to the member boundary
+    member_id = stays_df['member_id']
+    known_member = member_id.notna()
+    same_as_prev = member_id.eq(member_id.shift(1))
+    stay_sequence = stays_df.groupby('member_id', sort=False).cumcount() + 1
+    has_prior = known_member & (stay_sequence > 1)
     
-    for member_id in stays_df['member_id'].unique():
-        member_stays = stays_df[stays_df['member_id'] == member_id].copy()
-        member_stays = member_stays.sort_values('discharge_date')
-        
-        for idx, (_, stay) in enumerate(member_stays.iterrows()):
-            stay_id = stay['IPSTAY_ID']
-            
-            # Stay sequence (1st, 2nd, 3rd, etc.)
-            stays_df.loc[stays_df['IPSTAY_ID'] == stay_id, 'stay_sequence'] = idx + 1
-            
-            # Historical features (only for stays after the first)
-            if idx > 0:
-                prior_stays = member_stays.iloc[:idx]
-                
-                # Total historical stays
-                stays_df.loc[stays_df['IPSTAY_ID'] == stay_id, 'total_historical_stays'] = len(prior_stays)
-                
-                # Average historical LOS
-                if prior_stays['length_of_stay'].notna().any():
-                    avg_los = prior_stays['length_of_stay'].mean()
-                    stays_df.loc[stays_df['IPSTAY_ID'] == stay_id, 'avg_historical_los'] = avg_los
-                
-                # Days since last stay
-                last_discharge = prior_stays.iloc[-1]['discharge_date']
-                current_admit = stay['admit_date']
-                if pd.notna(last_discharge) and pd.notna(current_admit):
-                    days_since = (current_admit - last_discharge).days
-                    stays_df.loc[stays_df['IPSTAY_ID'] == stay_id, 'days_since_last_stay'] = days_since
-                
-                # Total historical paid amount
-                if prior_stays['total_paid_amount'].notna().any():
-                    total_paid = prior_stays['total_paid_amount'].sum()
-                    stays_df.loc[stays_df['IPSTAY_ID'] == stay_id, 'total_historical_paid'] = total_paid
+    def prior_sum_and_count(column):
+        values = stays_df[column]
+        running_sum = values.fillna(0).groupby(member_id, sort=False).cumsum()
+        running_count = values.notna().groupby(member_id, sort=False).cumsum()
+        return (
+            running_sum.shift(1).where(same_as_prev),
+            running_count.shift(1).where(same_as_prev, 0),
+        )
+    
+    los_sum, los_count = prior_sum_and_count('length_of_stay')
+    paid_sum, paid_count = prior_sum_and_count('total_paid_amount')
+    prev_discharge = stays_df['discharge_date'].shift(1).where(same_as_prev)
+    days_since = (stays_df['admit_date'] - prev_discharge).dt.days
+    
+    # Stay sequence (1st, 2nd, 3rd, etc.)
+    stays_df['stay_sequence'] = _last_write_per_stay(
+        stays_df, stay_sequence, known_member, 0
+    ).astype(int)
+    
+    # Historical features (only for stays after the first)
+    stays_df['total_historical_stays'] = _last_write_per_stay(
+        stays_df, stay_sequence - 1, has_prior, 0
+    ).astype(int)
+    stays_df['avg_historical_los'] = _last_write_per_stay(
+        stays_df, los_sum / los_count, has_prior & (los_count > 0), 0.0
+    )
+    stays_df['days_since_last_stay'] = _last_write_per_stay(
+        stays_df, days_since.astype(float), has_prior & days_since.notna(), np.nan
+    )
+    stays_df['total_historical_paid'] = _last_write_per_stay(
+        stays_df, paid_sum, has_prior & (paid_count > 0), 0.0
+    )
     
     print("  Historical features added")
     return stays_df
@@ -195,8 +371,18 @@ def add_temporal_features(stays_df):
     return stays_df
 
 
-def encode_categorical_features(stays_df):
-    """Encode categorical features for ML."""
+def top_diag_categories(diag_category, n=20):
+    """The ``n`` most frequent diagnosis categories."""
+    return diag_category.value_counts().head(n).index
+
+
+def encode_categorical_features(stays_df, top_diag_cats=None):
+    """
+    Encode categorical features for ML.
+    
+    ``top_diag_cats`` fixes the one-hot diagnosis categories (stream mode
+    passes the dataset-wide ones); by default the top 20 of ``stays_df``.
+    """
     print("Encoding categorical features...")
     
     # Gender encoding (F=0, M=1, other=2)
@@ -217,7 +403,8 @@ def encode_categorical_features(stays_df):
     
     # Top N diagnosis categories (one-hot encode)
     if 'diag_category' in stays_df.columns:
-        top_diag_cats = stays_df['diag_category'].value_counts().head(20).index
+        if top_diag_cats is None:
+            top_diag_cats = top_diag_categories(stays_df['diag_category'])
         for diag_cat in top_diag_cats:
             stays_df[f'diag_cat_{diag_cat}'] = (stays_df['diag_category'] == diag_cat).astype(int)
     
@@ -225,34 +412,225 @@ def encode_categorical_features(stays_df):
     return stays_df
 
 
-def handle_missing_values(stays_df):
-    """Handle missing values."""
-    print("Handling missing values...")
+def missing_value_fills(stays_df):
+    """Fill value per column: median for numeric, mode (or 'Unknown') for text."""
+    fills = {}
     
     # Fill numeric columns with median
     numeric_cols = stays_df.select_dtypes(include=[np.number]).columns
     for col in numeric_cols:
         if col not in ['readmitted_30d', 'IPSTAY_ID']:  # Don't fill target or ID
-            stays_df[col] = stays_df[col].fillna(stays_df[col].median())
+            fills[col] = stays_df[col].median()
     
     # Fill categorical columns with mode or 'Unknown'
     categorical_cols = stays_df.select_dtypes(include=['object']).columns
     for col in categorical_cols:
         if col not in ['IPSTAY_ID', 'member_id']:  # Don't fill IDs
             mode_val = stays_df[col].mode()[0] if len(stays_df[col].mode()) > 0 else 'Unknown'
-            stays_df[col] = stays_df[col].fillna(mode_val)
+            fills[col] = mode_val
+    return fills
+
+
+def handle_missing_values(stays_df, fill_values=None):
+    """
+    Handle missing values.
+    
+    ``fill_values`` (column -> value) overrides the medians / modes of
+    ``stays_df``; stream mode passes values computed over all partitions.
+    """
+    print("Handling missing values...")
+    
+    if fill_values is None:
+        fill_values = missing_value_fills(stays_df)
+    for col, value in fill_values.items():
+        if col in stays_df.columns:
+            stays_df[col] = stays_df[col].fillna(value)
     
     print("  Missing values handled")
     return stays_df
 
 
-def main():
-    """Main feature extraction function."""
+def member_partitions(conn, partitions):
+    """
+    Split member ids into at most ``partitions`` contiguous key ranges with
+    roughly equal numbers of claim lines.
+    
+    Returns ``(first, last)`` member id pairs in member id order. Every
+    member's stays fall in exactly one range, so the per-member features
+    computed on a partition match those of the full table.
+    """
+    ensure_indexes(conn, MEMBER_INDEXES)
+    total = conn.execute(
+        "SELECT COUNT(*) FROM sas_table_subset"
+        " WHERE IPSTAY_ID IS NOT NULL AND C_HDR_MBR_SYS_ID IS NOT NULL"
+    ).fetchone()[0]
+    
+    ranges, first, last, filled = [], None, None, 0
+    for member_id, n_lines in conn.execute(MEMBER_LINE_COUNTS_SQL):
+        if first is None:
+            first = member_id
+        last = member_id
+        filled += n_lines
+        if filled >= total * (len(ranges) + 1) / partitions:
+            ranges.append((first, last))
+            first = None
+    if first is not None:
+        ranges.append((first, last))
+    return ranges
+
+
+def _extract_partition(task, db_path, readmission_window_days):
+    """Stream pass 1: steps 1-4 for one ``(member_range, staging_path)`` task."""
+    member_range, staging_path = task
+    conn = sqlite3.connect(db_path)
+    try:
+        stays_df = extract_stay_level_features(conn, member_range=member_range)
+    finally:
+        conn.close()
+    stays_df = calculate_readmission_target(
+        stays_df, readmission_window_days=readmission_window_days
+    )
+    stays_df = add_member_historical_features(stays_df)
+    stays_df = add_temporal_features(stays_df)
+    save_frame(stays_df, staging_path, legacy_csv=False)
+    return len(stays_df)
+
+
+def partitioned_feature_stats(paths):
+    """
+    Dataset-wide statistics of the pass-1 partition files.
+    
+    Returns the unified column dtypes (a column that has NaNs or is all
+    NULL in some partitions gets the dtype the full table would have), the
+    top diagnosis categories and the missing-value fills. Only one column
+    of the whole dataset is in memory at a time.
+    """
+    schemas = [pq.read_schema(path).remove_metadata() for path in paths]
+    schema = pa.unify_schemas(schemas, promote_options='permissive')
+    dataset = ds.dataset(paths, schema=schema, format='parquet')
+    empty = schema.empty_table().to_pandas()
+    
+    # All-NULL in some partition: integers become float, booleans object,
+    # as they would be in the full table
+    all_null = {
+        field.name for part in schemas for field in part if pa.types.is_null(field.type)
+    }
+    for col in all_null & set(empty.columns):
+        if empty[col].dtype.kind in 'iu':
+            empty[col] = empty[col].astype(float)
+        elif empty[col].dtype.kind == 'b':
+            empty[col] = empty[col].astype(object)
+    
+    def column(name):
+        return dataset.to_table(columns=[name]).to_pandas()
+    
+    top_diag_cats = None
+    if 'diag_category' in empty.columns:
+        top_diag_cats = top_diag_categories(column('diag_category')['diag_category'])
+    
+    fill_values = {}
+    candidates = missing_value_fills(empty)
+    for col in candidates:
+        fill_values.update(missing_value_fills(column(col)))
+    return empty.dtypes.to_dict(), top_diag_cats, fill_values
+
+
+def _finish_partition(task, dtypes, top_diag_cats, fill_values):
+    """Stream pass 2: steps 5-6 with dataset-wide statistics, then write."""
+    staging_path, output_path = task
+    stays_df = load_frame(staging_path)
+    stays_df = stays_df.astype(
+        {col: dtype for col, dtype in dtypes.items() if stays_df[col].dtype != dtype}
+    )
+    stays_df = encode_categorical_features(stays_df, top_diag_cats=top_diag_cats)
+    stays_df = handle_missing_values(stays_df, fill_values=fill_values)
+    save_frame(stays_df, output_path, legacy_csv=False)
+    os.remove(staging_path)
+    return len(stays_df), int(stays_df['readmitted_30d'].sum())
+
+
+def _map(fn, items, workers):
+    if workers <= 1:
+        return [fn(item) for item in items]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(fn, items))
+
+
+def extract_features_partitioned(db_path, output_dir=OUTPUT_DIR, partitions=16,
+                                 workers=1, readmission_window_days=30):
+    """
+    Stream mode: run the whole feature pipeline one member range at a time.
+    
+    Members are split into ``partitions`` key ranges (see
+    :func:`member_partitions`). Pass 1 computes steps 1-4 per range and
+    writes them to ``<output_dir>/_staging``; the diagnosis categories and
+    missing-value fills are then computed over all partitions, and pass 2
+    encodes, imputes and writes ``<output_dir>/part-NNNNN.parquet``. Peak
+    memory is about one partition per worker (``workers`` > 1 processes
+    partitions in parallel). Read the result with ``load_frame(output_dir)``.
+    
+    Rows come out in member id order; stay IDs shared by members of
+    different partitions are labelled per partition.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        ranges = member_partitions(conn, partitions)
+    finally:
+        conn.close()
+    print(f"Streaming {len(ranges)} member partitions with {workers} worker(s)...")
+    
+    staging_dir = os.path.join(output_dir, '_staging')
+    for stale in glob.glob(os.path.join(output_dir, 'part-*.parquet')):
+        os.remove(stale)
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+    
+    names = [f'part-{i:05d}.parquet' for i in range(len(ranges))]
+    staging_paths = [os.path.join(staging_dir, name) for name in names]
+    output_paths = [os.path.join(output_dir, name) for name in names]
+    
+    # Pass 1: per-member features, one partition per task
+    extract = partial(
+        _extract_partition, db_path=db_path,
+        readmission_window_days=readmission_window_days,
+    )
+    _map(extract, list(zip(ranges, staging_paths)), workers)
+    
+    # Dataset-wide encoding and imputation statistics
+    dtypes, top_diag_cats, fill_values = partitioned_feature_stats(staging_paths)
+    
+    # Pass 2: encode, impute and write the final partitions
+    finish = partial(
+        _finish_partition, dtypes=dtypes, top_diag_cats=top_diag_cats,
+        fill_values=fill_values,
+    )
+    counts = _map(finish, list(zip(staging_paths, output_paths)), workers)
+    shutil.rmtree(staging_dir)
+    
+    total = sum(n for n, _ in counts)
+    readmissions = sum(r for _, r in counts)
+    print(f"  Wrote {total:,} stay-level records to {len(output_paths)} partitions")
+    if total:
+        print(f"  Readmission rate: {readmissions / total * 100:.2f}%")
+    return output_paths
+
+
+def main(readmission_window_days=30, mode="pandas", chunksize=100_000,
+         partitions=16, workers=1):
+    """
+    Main feature extraction function.
+    
+    ``mode="sql"`` computes the readmission target and member-history
+    features inside SQLite (window functions) instead of in pandas.
+    ``mode="stream"`` runs the pipeline per member partition into the
+    partitioned dataset at ``OUTPUT_DIR`` (bounded memory).
+    """
+    output = OUTPUT_DIR if mode == "stream" else OUTPUT_PATH
     print("\n" + "=" * 80)
     print("FFS CLAIMS FEATURE EXTRACTION")
     print("=" * 80)
     print(f"Database: {DB_PATH}")
-    print(f"Output: {OUTPUT_PATH}")
+    print(f"Output: {output}")
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
     
@@ -260,17 +638,34 @@ def main():
         print(f"ERROR: Database file not found at {DB_PATH}")
         return
     
+    if mode == "stream":
+        extract_features_partitioned(
+            DB_PATH, OUTPUT_DIR, partitions=partitions, workers=workers,
+            readmission_window_days=readmission_window_days,
+        )
+        print(f"\nOutput saved to: {OUTPUT_DIR} (read with load_frame('{OUTPUT_DIR}'))")
+        print(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        return
+    
     conn = sqlite3.connect(DB_PATH)
     
     try:
-        # Step 1: Extract stay-level features
-        stays_df = extract_stay_level_features(conn)
-        
-        # Step 2: Calculate readmission target
-        stays_df = calculate_readmission_target(stays_df, readmission_window_days=30)
-        
-        # Step 3: Add member historical features
-        stays_df = add_member_historical_features(stays_df)
+        if mode == "sql":
+            # Steps 1-3 in one windowed query, streamed in chunks
+            stays_df = extract_stay_features_sql(
+                conn, readmission_window_days=readmission_window_days, chunksize=chunksize
+            )
+        else:
+            # Step 1: Extract stay-level features
+            stays_df = extract_stay_level_features(conn)
+            
+            # Step 2: Calculate readmission target
+            stays_df = calculate_readmission_target(
+                stays_df, readmission_window_days=readmission_window_days
+            )
+            
+            # Step 3: Add member historical features
+            stays_df = add_member_historical_features(stays_df)
         
         # Step 4: Add temporal features
         stays_df = add_temporal_features(stays_df)
@@ -281,10 +676,11 @@ def main():
         # Step 6: Handle missing values
         stays_df = handle_missing_values(stays_df)
         
-        # Step 7: Save to CSV
+        # Step 7: Save as Parquet (plus legacy CSV if requested)
         print(f"\nSaving features to {OUTPUT_PATH}...")
-        Path(OUTPUT_PATH).parent.mkdir(parents=True, exist_ok=True)
-        stays_df.to_csv(OUTPUT_PATH, index=False)
+        save_frame(stays_df, OUTPUT_PATH)
+        if legacy_csv_enabled():
+            print(f"Legacy CSV export: {csv_path_for(OUTPUT_PATH)}")
         
         print("\n" + "=" * 80)
         print("FEATURE EXTRACTION COMPLETE")
@@ -296,7 +692,7 @@ def main():
         print(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print()
         print("Next Steps:")
-        print("1. Review the extracted features: df = pd.read_csv('data/ffs_features.csv')")
+        print("1. Review the extracted features: df = load_frame('data/ffs_features.parquet')")
         print("2. Explore feature distributions and correlations")
         print("3. Train model with new features")
         print("4. Compare performance with existing model")
@@ -306,5 +702,44 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--readmission-window-days",
+        type=int,
+        default=30,
+        help="Days after discharge in which a new admission counts as a readmission",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=["pandas", "sql", "stream"],
+        default="pandas",
+        help="Where to compute the per-member ordering features; stream "
+             "processes member partitions with bounded memory",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=100_000,
+        help="Rows per chunk streamed out of SQLite in sql mode",
+    )
+    parser.add_argument(
+        "--partitions",
+        type=int,
+        default=16,
+        help="Member key ranges in stream mode (peak memory ~ one partition per worker)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes working on partitions in parallel in stream mode",
+    )
+    args = parser.parse_args()
+    main(
+        readmission_window_days=args.readmission_window_days,
+        mode=args.mode,
+        chunksize=args.chunksize,
+        partitions=args.partitions,
+        workers=args.workers,
+    )
 
@@ -8,6 +8,7 @@ import os
 import subprocess
 import time
 import signal
+import json
 
 
 @pytest.fixture(scope="module")
@@ -17,8 +18,11 @@ def api_server():
     if not os.path.exists("readmission_model.json"):
         pytest.skip("Model file does not exist. Run training first.")
 
-    if not os.path.exists("data/training_snapshot.csv"):
-        pytest.skip("Training snapshot does not exist. Run training first.")
+    if not os.path.exists("reference_profile.json"):
+        pytest.skip("Reference profile does not exist. Run training first.")
+
+    if not os.path.exists("feature_pipeline.json"):
+        pytest.skip("Feature pipeline does not exist. Run training first.")
 
     base_url = "http://127.0.0.1:8000"
     process = None
@@ -166,3 +170,154 @@ def test_predict_endpoint_edge_cases(api_server):
     ), f"Expected 200, got {response.status_code}: {response.text}"
     data = response.json()
     assert "probability" in data
+
+
+def test_predict_batch_endpoint(api_server):
+    """Test /predict/batch keeps input order and reports per-row errors."""
+    client = httpx.Client(base_url=api_server, timeout=30.0)
+
+    patient = {
+        "age": 72,
+        "gender": 1,
+        "num_encounters": 2,
+        "avg_los": 4.5,
+        "creatinine": 1.8,
+        "heart_rate": 110,
+        "systolic_bp": 145,
+    }
+    batch = [
+        patient,
+        {**patient, "age": 200},  # out of schema range
+        {"age": 72},  # missing required fields
+        {**patient, "age": 30, "creatinine": 0.8},
+    ]
+
+    response = client.post("/predict/batch", json=batch)
+
+    assert (
+        response.status_code == 200
+    ), f"Expected 200, got {response.status_code}: {response.text}"
+    data = response.json()
+
+    assert data["n_scored"] == 2
+    assert data["n_errors"] == 2
+    results = data["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3]
+    assert "error" in results[1] and "age" in results[1]["error"]
+    assert "error" in results[2]
+    for r in (results[0], results[3]):
+        assert 0 <= r["probability"] <= 1
+        assert r["risk_level"] in ["High", "Low"]
+
+    # Batch scoring must agree with the single-patient endpoint
+    single = client.post("/predict", json=patient).json()
+    assert abs(single["probability"] - results[0]["probability"]) < 1e-6
+
+
+def test_predict_batch_endpoint_dtype_error_is_per_row(api_server):
+    """Test a value that breaks a column's dtype only fails its own row."""
+    client = httpx.Client(base_url=api_server, timeout=30.0)
+
+    patient = {
+        "age": 58,
+        "gender": 0,
+        "num_encounters": 1,
+        "avg_los": 3.0,
+        "creatinine": 1.0,
+        "heart_rate": 75,
+        "systolic_bp": 120,
+    }
+    # Too large for int64: the age column becomes object dtype
+    batch = [patient, {**patient, "age": 10**30}, patient]
+
+    response = client.post("/predict/batch", json=batch)
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["n_scored"] == 2 and data["n_errors"] == 1
+    assert "age" in data["results"][1]["error"]
+    assert data["results"][0]["probability"] == data["results"][2]["probability"]
+
+
+def test_predict_batch_endpoint_ndjson(api_server):
+    """Test /predict/batch accepts NDJSON and isolates malformed lines."""
+    client = httpx.Client(base_url=api_server, timeout=30.0)
+
+    patient = {
+        "age": 65,
+        "gender": 0,
+        "num_encounters": 3,
+        "avg_los": 5.0,
+        "creatinine": 1.2,
+        "heart_rate": 88,
+        "systolic_bp": 130,
+    }
+    body = "\n".join([json.dumps(patient), "{not json", json.dumps(patient)]) + "\n"
+
+    response = client.post(
+        "/predict/batch",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["n_scored"] == 2
+    assert "error" in data["results"][1]
+    assert data["results"][0]["probability"] == data["results"][2]["probability"]
+
+
+def test_drift_endpoint(api_server):
+    """Test /drift returns the background monitor's latest report."""
+    client = httpx.Client(base_url=api_server, timeout=10.0)
+
+    response = client.get("/drift")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert {"computed_at", "window_rows", "report"} <= set(data)
+
+
+def test_drift_sketch_endpoint(api_server):
+    """Test /drift/sketch returns a mergeable per-feature sketch state."""
+    client = httpx.Client(base_url=api_server, timeout=10.0)
+
+    response = client.get("/drift/sketch")
+
+    assert response.status_code == 200
+    state = response.json()
+    assert "age" in state["features"]
+    assert {"counts", "quantiles"} <= set(state["features"]["age"])
+
+
+def test_predict_endpoint_out_of_range(api_server):
+    """Test /predict rejects values outside the schema ranges."""
+    client = httpx.Client(base_url=api_server, timeout=10.0)
+
+    response = client.post(
+        "/predict",
+        json={
+            "age": 200,
+            "gender": 1,
+            "num_encounters": 2,
+            "avg_los": 4.5,
+            "creatinine": 1.8,
+            "heart_rate": 110,
+            "systolic_bp": 145,
+        },
+    )
+
+    assert response.status_code == 422
+
+
+def test_lineage_endpoint_utc_bounds(api_server):
+    """Test /lineage accepts offset-aware UTC bounds and rejects bad ones."""
+    client = httpx.Client(base_url=api_server, timeout=10.0)
+
+    for start in ("2020-01-01T00:00:00Z", "2020-01-01T00:00:00+00:00"):
+        response = client.get("/lineage", params={"start": start})
+        assert response.status_code == 200
+        assert "records" in response.json()
+
+    response = client.get("/lineage", params={"start": "yesterday"})
+    assert response.status_code == 400
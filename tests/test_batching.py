@@ -0,0 +1,98 @@
+"""
+Unit tests for the /predict micro-batcher.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api.batching import MicroBatcher
+
+
+def test_microbatcher_groups_concurrent_requests():
+    """Concurrent submits are scored together and fanned back out in order."""
+    batch_sizes = []
+    release = threading.Event()
+
+    def score_fn(rows):
+        release.wait(timeout=5)
+        batch_sizes.append(len(rows))
+        return [row["x"] * 2 for row in rows]
+
+    batcher = MicroBatcher(score_fn, max_batch_size=16, max_wait_ms=50)
+    try:
+        # The first row blocks the worker so the rest queue up behind it
+        first = batcher.submit({"x": -1})
+        futures = [batcher.submit({"x": i}) for i in range(10)]
+        release.set()
+
+        assert first.result(timeout=5) == -2
+        assert [f.result(timeout=5) for f in futures] == [i * 2 for i in range(10)]
+        assert sum(batch_sizes) == 11
+        assert max(batch_sizes) > 1
+    finally:
+        batcher.stop()
+
+
+def test_microbatcher_respects_max_batch_size():
+    batch_sizes = []
+
+    def score_fn(rows):
+        batch_sizes.append(len(rows))
+        return [0.0] * len(rows)
+
+    batcher = MicroBatcher(score_fn, max_batch_size=4, max_wait_ms=20)
+    try:
+        with ThreadPoolExecutor(max_workers=12) as pool:
+            results = list(pool.map(lambda i: batcher.predict({"x": i}), range(12)))
+        assert results == [0.0] * 12
+        assert max(batch_sizes) <= 4
+    finally:
+        batcher.stop()
+
+
+def test_microbatcher_propagates_errors():
+    def score_fn(rows):
+        raise RuntimeError("booster failed")
+
+    batcher = MicroBatcher(score_fn, max_batch_size=8, max_wait_ms=1)
+    try:
+        with pytest.raises(RuntimeError, match="booster failed"):
+            batcher.predict({"x": 1}, timeout=5)
+    finally:
+        batcher.stop()
+
+
+def test_microbatcher_fails_every_row_on_a_short_score_list():
+    def score_fn(rows):
+        return [0.5] * (len(rows) - 1)
+
+    batcher = MicroBatcher(score_fn, max_batch_size=8, max_wait_ms=1)
+    try:
+        with pytest.raises(ValueError, match="0 scores for 1 rows"):
+            batcher.predict({"x": 1}, timeout=5)
+    finally:
+        batcher.stop()
+
+
+def test_microbatcher_predict_times_out_and_drops_the_row():
+    release = threading.Event()
+    scored = []
+
+    def score_fn(rows):
+        release.wait(timeout=5)
+        scored.extend(row["x"] for row in rows)
+        return [0.0] * len(rows)
+
+    batcher = MicroBatcher(score_fn, max_batch_size=1, max_wait_ms=1)
+    try:
+        # The first row holds the worker; the second times out in the queue
+        first = batcher.submit({"x": 1})
+        with pytest.raises(TimeoutError):
+            batcher.predict({"x": 2}, timeout=0.05)
+        release.set()
+        assert first.result(timeout=5) == 0.0
+    finally:
+        batcher.stop()
+    assert scored == [1]
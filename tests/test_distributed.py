@@ -0,0 +1,64 @@
+"""
+Tests for data-parallel training across local worker processes.
+"""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from pipeline.distributed import train_distributed
+from pipeline.feature_engineering import FeaturePipeline
+from pipeline.model import BASE_PARAMS, DEFAULT_PARAMS
+from pipeline.out_of_core import predict_split, row_hashes, shard_mask
+from pipeline.storage import save_frame
+from tests.test_out_of_core import make_dataset
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    df = make_dataset(n=2000)
+    df["readmitted_30d"] = (df["creatinine"].fillna(1.0) > 1.5).astype(int)
+    return df, save_frame(df, str(tmp_path / "dataset.parquet"), legacy_csv=False)
+
+
+def test_shards_partition_rows():
+    hashes = row_hashes([f"P{i}" for i in range(10000)])
+    owners = sum(shard_mask(hashes, rank, 3).astype(int) for rank in range(3))
+
+    assert (owners == 1).all()
+    assert shard_mask(hashes, 0, 3).mean() == pytest.approx(1 / 3, abs=0.03)
+
+
+@pytest.mark.parametrize("matrix", ["quantile", "external"])
+def test_train_distributed(dataset, tmp_path, matrix):
+    df, path = dataset
+    pipeline = FeaturePipeline().fit(df)
+    params = {**BASE_PARAMS, **DEFAULT_PARAMS, "max_bin": 64}
+
+    booster = train_distributed(
+        path,
+        pipeline,
+        params,
+        num_boost_round=30,
+        early_stopping_rounds=5,
+        workers=2,
+        matrix=matrix,
+        batch_rows=300,
+        cache_dir=str(tmp_path),
+    )
+
+    assert 0 < booster.num_boosted_rounds() <= 30
+    assert "best_iteration" in booster.attributes()
+    labels, preds = predict_split(booster, path, pipeline, "test")
+    assert np.mean((preds > 0.5) == labels) > 0.9
+
+
+def test_worker_failure_is_raised(dataset):
+    df, path = dataset
+    params = {**BASE_PARAMS, "objective": "not:an-objective", "max_bin": 64}
+
+    with pytest.raises(RuntimeError, match="worker failed"):
+        train_distributed(path, FeaturePipeline().fit(df), params, 5, workers=2)
+    # Every worker was terminated and reaped
+    assert multiprocessing.active_children() == []
@@ -0,0 +1,232 @@
+"""
+Unit tests for drift detection and the background drift monitor.
+"""
+
+import datetime
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scipy.stats import ks_2samp
+
+from pipeline.monitor.drift import (
+    DriftMonitor,
+    DriftSketch,
+    QuantileSketch,
+    build_reference_profile,
+    detect_drift,
+    ks_from_profile,
+    merge_drift_sketches,
+    psi,
+)
+
+
+@pytest.fixture
+def reference_df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "heart_rate": rng.normal(80, 10, 2000),
+            "creatinine": rng.normal(1.2, 0.3, 2000),
+        }
+    )
+
+
+def _wait_for_report(monitor, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        latest = monitor.latest()
+        if latest["report"]:
+            return latest
+        time.sleep(0.01)
+    pytest.fail("Drift monitor did not publish a report")
+
+
+def test_detect_drift_flags_shifted_feature(reference_df, tmp_path):
+    current = reference_df.copy()
+    current["heart_rate"] += 40
+
+    report = detect_drift(reference_df, current, save_path=tmp_path / "drift.json")
+
+    assert report["heart_rate"]["drift_detected"]
+    assert not report["creatinine"]["drift_detected"]
+    assert (tmp_path / "drift.json").exists()
+
+
+def test_reference_profile_matches_raw_reference(reference_df, tmp_path):
+    """A full-sample ECDF sketch reproduces ks_2samp's statistic exactly."""
+    profile = build_reference_profile(reference_df, sketch_size=len(reference_df))
+    current = reference_df.sample(300, random_state=1) + 0.5
+
+    for col in reference_df.columns:
+        ks_stat, _ = ks_from_profile(profile["features"][col], current[col])
+        expected, _ = ks_2samp(reference_df[col], current[col])
+        assert ks_stat == pytest.approx(expected)
+
+    # Same sample as the reference -> no drift; proportions sum to one
+    feature = profile["features"]["heart_rate"]
+    assert sum(feature["proportions"]) == pytest.approx(1.0)
+    assert psi(feature, reference_df["heart_rate"]) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_detect_drift_from_profile(reference_df, tmp_path):
+    profile = build_reference_profile(reference_df, sketch_size=200)
+    current = reference_df.copy()
+    current["heart_rate"] += 40
+
+    report = detect_drift(profile, current, save_path=tmp_path / "drift.json")
+
+    assert report["heart_rate"]["drift_detected"]
+    assert report["heart_rate"]["psi"] > 1.0
+    assert not report["creatinine"]["drift_detected"]
+
+
+def test_quantile_sketch_rank_error_and_merge():
+    rng = np.random.default_rng(2)
+    values = rng.lognormal(size=200_000)
+    grid = np.quantile(values, np.linspace(0.01, 0.99, 99))
+    exact = np.searchsorted(np.sort(values), grid, side="right") / len(values)
+
+    parts = [
+        QuantileSketch(k=200, seed=i).update(chunk)
+        for i, chunk in enumerate(np.array_split(values, 4))
+    ]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(QuantileSketch.from_dict(part.to_dict()))
+
+    assert merged.n == len(values)
+    assert np.abs(merged.cdf(grid) - exact).max() < 0.017
+    assert merged.quantile(0.5) == pytest.approx(np.median(values), rel=0.05)
+
+
+def test_drift_sketch_merge_matches_exact_report(reference_df):
+    profile = build_reference_profile(reference_df, sketch_size=len(reference_df))
+    current = reference_df.sample(1500, random_state=3).reset_index(drop=True)
+    current["heart_rate"] += 5
+
+    replicas = [DriftSketch(profile).update(current.iloc[i::3]) for i in range(3)]
+    merged = merge_drift_sketches([r.to_dict() for r in replicas], profile)
+    report = merged.report()
+    exact = detect_drift(profile, current, save_path="/dev/null")
+
+    for col in reference_df.columns:
+        # Bucket counts are exact, so PSI matches; KS is within the sketch bound
+        assert report[col]["psi"] == pytest.approx(exact[col]["psi"])
+        assert abs(report[col]["ks_stat"] - exact[col]["ks_stat"]) < 0.017
+        assert report[col]["n"] == len(current)
+    assert report["heart_rate"]["drift_detected"]
+
+
+def test_drift_monitor_recomputes_every_n_rows(reference_df, tmp_path):
+    monitor = DriftMonitor(
+        reference_df,
+        window_size=100,
+        recompute_every=50,
+        interval_seconds=60,
+        save_path=tmp_path / "drift.json",
+    )
+    try:
+        rows = reference_df.assign(heart_rate=reference_df["heart_rate"] + 40)
+        for row in rows.head(50).to_dict("records"):
+            monitor.ingest(row)
+
+        latest = _wait_for_report(monitor)
+        assert latest["window_rows"] == 50
+        assert latest["report"]["heart_rate"]["drift_detected"]
+        computed_at = datetime.datetime.fromisoformat(latest["computed_at"])
+        assert computed_at.utcoffset() == datetime.timedelta(0)
+    finally:
+        monitor.stop()
+
+
+def test_drift_monitor_exports_sketch_state(reference_df, tmp_path):
+    profile = build_reference_profile(reference_df)
+    monitor = DriftMonitor(
+        profile, recompute_every=10_000, save_path=tmp_path / "drift.json"
+    )
+    try:
+        monitor.ingest_many(reference_df.head(120).to_dict("records"))
+        state = monitor.sketch_state()
+
+        sketch = DriftSketch.from_dict(state, profile)
+        assert sketch.quantiles["heart_rate"].n == 120
+        assert sum(state["features"]["heart_rate"]["counts"]) == 120
+    finally:
+        monitor.stop()
+
+
+def test_drift_monitor_count_and_time_windows(reference_df, tmp_path):
+    monitor = DriftMonitor(
+        reference_df,
+        window_size=40,
+        window_seconds=0.05,
+        recompute_every=10_000,
+        interval_seconds=60,
+        min_rows=1,
+        save_path=tmp_path / "drift.json",
+    )
+    try:
+        monitor.ingest_many(reference_df.head(100).to_dict("records"))
+        assert monitor.recompute()["window_rows"] == 40
+
+        time.sleep(0.1)
+        monitor.ingest_many(reference_df.head(5).to_dict("records"))
+        assert monitor.recompute()["window_rows"] == 5
+    finally:
+        monitor.stop()
+
+
+def test_drift_monitor_sketch_report_matches_exact(reference_df, tmp_path):
+    profile = build_reference_profile(reference_df, sketch_size=len(reference_df))
+    current = reference_df.sample(600, random_state=1).reset_index(drop=True)
+    current["heart_rate"] += 5
+    monitor = DriftMonitor(
+        profile, recompute_every=10_000, save_path=tmp_path / "drift.json"
+    )
+    try:
+        monitor.ingest_many(current.to_dict("records"))
+        latest = monitor.recompute()
+    finally:
+        monitor.stop()
+
+    assert monitor.method == "sketch" and len(monitor._window) == 0
+    assert latest["window_rows"] == 600
+    exact = detect_drift(profile, current, save_path=tmp_path / "exact.json")
+    for col in reference_df.columns:
+        report = latest["report"][col]
+        assert report["psi"] == pytest.approx(exact[col]["psi"])
+        assert abs(report["ks_stat"] - exact[col]["ks_stat"]) < 0.017
+    assert latest["report"]["heart_rate"]["drift_detected"]
+
+
+def test_drift_monitor_sketch_ring_expires_old_buckets(reference_df, tmp_path):
+    profile = build_reference_profile(reference_df)
+    monitor = DriftMonitor(
+        profile,
+        window_seconds=0.1,
+        bucket_seconds=0.05,
+        recompute_every=10_000,
+        interval_seconds=60,
+        min_rows=1,
+        save_path=tmp_path / "drift.json",
+    )
+    try:
+        monitor.ingest_many(reference_df.head(100).to_dict("records"))
+        assert monitor.recompute()["window_rows"] == 100
+
+        time.sleep(0.2)
+        monitor.ingest_many(reference_df.head(5).to_dict("records"))
+        assert monitor.recompute()["window_rows"] == 5
+        state = monitor.sketch_state()
+        assert state["features"]["heart_rate"]["quantiles"]["n"] == 5
+        assert state["window_start"] <= state["window_end"]
+    finally:
+        monitor.stop()
+
+
+def test_drift_monitor_sketch_method_needs_profile(reference_df):
+    with pytest.raises(ValueError, match="reference profile"):
+        DriftMonitor(reference_df, method="sketch")
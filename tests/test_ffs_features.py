@@ -0,0 +1,300 @@
+"""
+Regression tests for scripts/extract_ffs_features.py against the original
+row-by-row implementations.
+"""
+
+import importlib.util
+import os
+import sqlite3
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+SCRIPT_PATH = os.path.join(
+    os.path.dirname(__file__), "..", "scripts", "extract_ffs_features.py"
+)
+
+
+@pytest.fixture(scope="module")
+def ffs():
+    spec = importlib.util.spec_from_file_location("extract_ffs_features", SCRIPT_PATH)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so stream-mode workers can unpickle its functions
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_stays(n_stays, n_members, seed=0):
+    """Synthetic stay table with ties, missing dates and shared stay IDs."""
+    rng = np.random.default_rng(seed)
+    admit = pd.Timestamp("2023-01-01") + pd.to_timedelta(
+        rng.integers(0, 365, n_stays), unit="D"
+    )
+    los = rng.integers(0, 12, n_stays)
+    stays = pd.DataFrame(
+        {
+            "IPSTAY_ID": np.arange(n_stays),
+            "member_id": rng.integers(0, n_members, n_stays).astype(str),
+            "admit_date": admit,
+            "discharge_date": admit + pd.to_timedelta(los, unit="D"),
+            "length_of_stay": los.astype(float),
+            "total_paid_amount": rng.uniform(500, 50000, n_stays).round(2),
+        }
+    )
+    stays.loc[rng.random(n_stays) < 0.03, "admit_date"] = pd.NaT
+    stays.loc[rng.random(n_stays) < 0.03, "discharge_date"] = pd.NaT
+    stays.loc[rng.random(n_stays) < 0.05, "length_of_stay"] = np.nan
+    # A few stay IDs shared by two members
+    stays.loc[stays.index[-5:], "IPSTAY_ID"] = stays["IPSTAY_ID"].iloc[:5].values
+    return stays
+
+
+def loop_readmission_target(stays_df, readmission_window_days=30):
+    """The original per-member / per-stay implementation."""
+    stays_df = stays_df.sort_values(["member_id", "discharge_date"]).copy()
+    stays_df["readmitted_30d"] = 0
+    for member_id in stays_df["member_id"].unique():
+        member_stays = stays_df[stays_df["member_id"] == member_id].copy()
+        if len(member_stays) > 1:
+            for i in range(len(member_stays) - 1):
+                current_discharge = member_stays.iloc[i]["discharge_date"]
+                next_admit = member_stays.iloc[i + 1]["admit_date"]
+                if pd.notna(current_discharge) and pd.notna(next_admit):
+                    days_between = (next_admit - current_discharge).days
+                    if 0 < days_between <= readmission_window_days:
+                        stay_id = member_stays.iloc[i]["IPSTAY_ID"]
+                        stays_df.loc[
+                            stays_df["IPSTAY_ID"] == stay_id, "readmitted_30d"
+                        ] = 1
+    return stays_df
+
+
+@pytest.mark.parametrize("window", [7, 30, 90])
+def test_readmission_target_matches_loop(ffs, window):
+    stays = make_stays(1500, 200)
+
+    expected = loop_readmission_target(stays, readmission_window_days=window)
+    result = ffs.calculate_readmission_target(stays, readmission_window_days=window)
+
+    assert expected["readmitted_30d"].sum() > 0
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def loop_member_historical_features(stays_df):
+    """The original nested iterrows implementation."""
+    stays_df = stays_df.sort_values(["member_id", "discharge_date"]).copy()
+    stays_df["stay_sequence"] = 0
+    stays_df["total_historical_stays"] = 0
+    stays_df["avg_historical_los"] = 0.0
+    stays_df["days_since_last_stay"] = np.nan
+    stays_df["total_historical_paid"] = 0.0
+    for member_id in stays_df["member_id"].unique():
+        member_stays = stays_df[stays_df["member_id"] == member_id].copy()
+        member_stays = member_stays.sort_values("discharge_date")
+        for idx, (_, stay) in enumerate(member_stays.iterrows()):
+            rows = stays_df["IPSTAY_ID"] == stay["IPSTAY_ID"]
+            stays_df.loc[rows, "stay_sequence"] = idx + 1
+            if idx > 0:
+                prior_stays = member_stays.iloc[:idx]
+                stays_df.loc[rows, "total_historical_stays"] = len(prior_stays)
+                if prior_stays["length_of_stay"].notna().any():
+                    avg_los = prior_stays["length_of_stay"].mean()
+                    stays_df.loc[rows, "avg_historical_los"] = avg_los
+                last_discharge = prior_stays.iloc[-1]["discharge_date"]
+                current_admit = stay["admit_date"]
+                if pd.notna(last_discharge) and pd.notna(current_admit):
+                    days_since = (current_admit - last_discharge).days
+                    stays_df.loc[rows, "days_since_last_stay"] = days_since
+                if prior_stays["total_paid_amount"].notna().any():
+                    total_paid = prior_stays["total_paid_amount"].sum()
+                    stays_df.loc[rows, "total_historical_paid"] = total_paid
+    return stays_df
+
+
+def test_member_historical_features_match_loop(ffs):
+    stays = make_stays(1500, 200, seed=1)
+    stays.loc[stays.sample(frac=0.05, random_state=1).index, "total_paid_amount"] = (
+        np.nan
+    )
+
+    expected = loop_member_historical_features(stays)
+    result = ffs.add_member_historical_features(stays)
+
+    assert (expected["stay_sequence"] > 3).any()
+    pd.testing.assert_frame_equal(result, expected)
+
+
+CLAIM_COLUMNS = [
+    "IPSTAY_ID",
+    "C_HDR_MBR_SYS_ID",
+    "C_HDR_ADMIT_DT",
+    "C_HDR_DISCH_DT",
+    "IPSTAY_BEG_DT",
+    "IPSTAY_END_DT",
+    "IPSTAY_LOS",
+    "C_HDR_MBR_AGE",
+    "C_HDR_MBR_GENDER_CD",
+    "C_HDR_MBR_RACE_CD",
+    "C_HDR_DIAG_PRIM_CD",
+    "C_HDR_DIAG_1_CD",
+    "C_HDR_DIAG_2_CD",
+    "C_HDR_DIAG_3_CD",
+    "C_HDR_DRG_CD",
+    "C_HDR_DRG_CD_DESC",
+    "R_CD_REL_WT_AMT",
+    "C_HDR_ADMIT_TYP_CD",
+    "C_HDR_ADMIT_TYP_CD_DESC",
+    "C_HDR_PMT_TY_CD",
+    "C_HDR_PMT_TY_CD_DESC",
+    "C_HDR_CLM_STAT_CD",
+    "IPSTAY_ID_PRIOR",
+    "IPSTAY_NUM_CLAIMS",
+    "BILL_AMT",
+    "PAID_AMT",
+    "ALLOW_AMT",
+    "IPSTAY_TOTAL_PAID",
+    "EXC_CD_H_1",
+    "EXC_CD_H_2",
+]
+
+
+def make_claims_db(n_stays, n_members, seed=0, path=":memory:"):
+    """Claims table (in memory by default) with 1-3 claim lines per stay."""
+    rng = np.random.default_rng(seed)
+    # Distinct discharge days, so stay order within a member has no ties
+    discharge = pd.Timestamp("2021-01-01") + pd.to_timedelta(
+        rng.permutation(n_stays), unit="D"
+    )
+    los = rng.integers(0, 10, n_stays)
+    stays = pd.DataFrame(
+        {
+            "IPSTAY_ID": np.arange(1, n_stays + 1),
+            "C_HDR_MBR_SYS_ID": rng.integers(0, n_members, n_stays),
+            "C_HDR_ADMIT_DT": (discharge - pd.to_timedelta(los, unit="D")).strftime(
+                "%Y-%m-%d"
+            ),
+            "C_HDR_DISCH_DT": discharge.strftime("%Y-%m-%d"),
+            "IPSTAY_LOS": np.where(rng.random(n_stays) < 0.05, np.nan, los),
+            "C_HDR_MBR_AGE": rng.integers(18, 90, n_stays),
+            "C_HDR_MBR_GENDER_CD": rng.choice(["F", "M"], n_stays),
+            "C_HDR_DIAG_PRIM_CD": rng.choice(["I500", "J441", "N179"], n_stays),
+            "PAID_AMT": rng.uniform(100, 9000, n_stays).round(2),
+            "BILL_AMT": rng.uniform(9000, 20000, n_stays).round(2),
+        }
+    )
+    stays.loc[stays.sample(frac=0.03, random_state=seed).index, "C_HDR_ADMIT_DT"] = None
+    # A missing discharge date for a few members (at most one each)
+    first_stays = stays.drop_duplicates("C_HDR_MBR_SYS_ID").index[:5]
+    stays.loc[first_stays, "C_HDR_DISCH_DT"] = None
+
+    lines = stays.loc[stays.index.repeat(rng.integers(1, 4, n_stays))]
+    lines = lines.reindex(columns=CLAIM_COLUMNS)
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE sas_table_subset ({', '.join(CLAIM_COLUMNS)})")
+    conn.executemany(
+        f"INSERT INTO sas_table_subset VALUES ({', '.join('?' * len(CLAIM_COLUMNS))})",
+        lines.astype(object).where(lines.notna(), None).itertuples(index=False),
+    )
+    conn.commit()
+    return conn
+
+
+@pytest.mark.parametrize("window", [7, 30])
+def test_sql_mode_matches_pandas_mode(ffs, window):
+    conn = make_claims_db(1200, 150)
+
+    expected = ffs.calculate_readmission_target(
+        ffs.extract_stay_level_features(conn), readmission_window_days=window
+    )
+    expected = ffs.add_member_historical_features(expected).reset_index(drop=True)
+    result = ffs.extract_stay_features_sql(
+        conn, readmission_window_days=window, chunksize=100
+    )
+
+    assert expected["readmitted_30d"].sum() > 0
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_sql_mode_uses_stay_index(ffs):
+    conn = make_claims_db(50, 10)
+    ffs.ensure_indexes(conn)
+    ffs.ensure_indexes(conn)  # idempotent
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN " + ffs.STAY_WINDOW_SQL, {"window_days": 30}
+    ).fetchall()
+    details = " | ".join(row[-1] for row in plan)
+
+    assert "idx_sas_stay_member" in details
+    assert "TEMP B-TREE FOR GROUP BY" not in details
+
+
+def full_table_features(ffs, conn):
+    """Steps 1-6 of main() on the whole table."""
+    stays = ffs.extract_stay_level_features(conn)
+    stays = ffs.calculate_readmission_target(stays)
+    stays = ffs.add_member_historical_features(stays)
+    stays = ffs.add_temporal_features(stays)
+    stays = ffs.encode_categorical_features(stays)
+    return ffs.handle_missing_values(stays).reset_index(drop=True)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_stream_mode_matches_full_table(ffs, tmp_path, workers):
+    from pipeline.storage import load_frame
+
+    db_path = str(tmp_path / "claims.db")
+    conn = make_claims_db(1200, 150, path=db_path)
+    # All-NULL ages in the first partition: still numeric there and imputed
+    # with the dataset-wide median
+    conn.execute(
+        "UPDATE sas_table_subset SET C_HDR_MBR_AGE = NULL"
+        " WHERE C_HDR_MBR_SYS_ID BETWEEN ? AND ?",
+        ffs.member_partitions(conn, 4)[0],
+    )
+    conn.commit()
+    expected = full_table_features(ffs, conn)
+    conn.close()
+    output_dir = str(tmp_path / "features")
+    paths = ffs.extract_features_partitioned(
+        db_path, output_dir, partitions=4, workers=workers
+    )
+    result = load_frame(output_dir)
+
+    assert len(paths) == 4
+    assert sorted(os.listdir(output_dir)) == [os.path.basename(p) for p in paths]
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_member_partitions_are_balanced_key_ranges(ffs):
+    conn = make_claims_db(1200, 150)
+
+    ranges = ffs.member_partitions(conn, 4)
+
+    assert len(ranges) == 4
+    assert all(first <= last for first, last in ranges)
+    assert all(a[1] < b[0] for a, b in zip(ranges, ranges[1:]))
+    lines = [
+        conn.execute(
+            "SELECT COUNT(*) FROM sas_table_subset"
+            " WHERE C_HDR_MBR_SYS_ID BETWEEN ? AND ?",
+            member_range,
+        ).fetchone()[0]
+        for member_range in ranges
+    ]
+    assert (
+        sum(lines)
+        == conn.execute("SELECT COUNT(*) FROM sas_table_subset").fetchone()[0]
+    )
+    assert max(lines) < 1.5 * min(lines)
+
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN " + ffs.STAY_PARTITION_SQL,
+        {"member_lo": ranges[1][0], "member_hi": ranges[1][1]},
+    ).fetchall()
+    details = " | ".join(row[-1] for row in plan)
+    assert "idx_sas_member_stay" in details
+    assert "TEMP B-TREE FOR GROUP BY" not in details
@@ -0,0 +1,234 @@
+"""
+Tests for streaming FHIR bundle ingestion.
+"""
+
+import json
+import os
+import random
+
+import pandas as pd
+import pytest
+
+from pipeline.feature_cache import FeatureCache
+from pipeline.fhir_loader import (
+    build_bulk_dataset,
+    build_dataset,
+    bundle_to_features,
+    iter_bulk_feature_rows,
+    iter_feature_rows,
+    load_fhir_bundles,
+)
+
+
+def _write_bundles(directory, n):
+    rng = random.Random(0)
+    for i in range(n):
+        patient_id = f"patient-{i}"
+        entries = [
+            {
+                "resource": {
+                    "resourceType": "Patient",
+                    "id": patient_id,
+                    "gender": rng.choice(["male", "female"]),
+                    "birthDate": f"{rng.randint(1950, 2005)}-01-01",
+                }
+            }
+        ]
+        for _ in range(rng.randint(1, 3)):
+            day = rng.randint(1, 20)
+            entries.append(
+                {
+                    "resource": {
+                        "resourceType": "Encounter",
+                        "period": {
+                            "start": f"2024-03-{day:02d}T00:00:00",
+                            "end": f"2024-03-{day + rng.randint(1, 7):02d}T00:00:00",
+                        },
+                    }
+                }
+            )
+        for code in ("creatinine", "heart_rate", "systolic_bp"):
+            entries.append(
+                {
+                    "resource": {
+                        "resourceType": "Observation",
+                        "code": {"text": code},
+                        "valueQuantity": {"value": round(rng.uniform(0.5, 150), 2)},
+                    }
+                }
+            )
+        bundle = {"entry": entries, "readmission_label": rng.randint(0, 1)}
+        (directory / f"{patient_id}.json").write_text(json.dumps(bundle))
+
+
+@pytest.fixture
+def fhir_glob(tmp_path):
+    _write_bundles(tmp_path, 40)
+    return str(tmp_path / "*.json")
+
+
+def test_streaming_rows_match_legacy_loader(fhir_glob):
+    expected = [bundle_to_features(b) for b in load_fhir_bundles(fhir_glob)]
+
+    serial = list(iter_feature_rows(fhir_glob, workers=1, parser="json"))
+    parallel = list(iter_feature_rows(fhir_glob, workers=2, chunksize=3))
+
+    assert serial == expected
+    assert parallel == expected
+
+
+def test_build_dataset_assembles_column_chunks(fhir_glob):
+    expected = pd.DataFrame(
+        [bundle_to_features(b) for b in load_fhir_bundles(fhir_glob)]
+    )
+
+    df = build_dataset(fhir_glob, workers=1, frame_chunk_rows=7)
+
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_unknown_parser_rejected(fhir_glob):
+    with pytest.raises(ValueError):
+        next(iter_feature_rows(fhir_glob, workers=1, parser="yaml"))
+
+
+def _write_bulk_export(bundles, directory):
+    """Split per-patient bundles into one NDJSON file per resource type."""
+    files = {}
+    for bundle in bundles:
+        resources = [entry["resource"] for entry in bundle["entry"]]
+        patient_id = resources[0]["id"]
+        for resource in resources:
+            if resource["resourceType"] != "Patient":
+                resource = {
+                    **resource,
+                    "subject": {"reference": f"Patient/{patient_id}"},
+                }
+            files.setdefault(resource["resourceType"], []).append(json.dumps(resource))
+    # Bulk exports may split a type across several files
+    encounters = files.pop("Encounter")
+    files["Encounter.1"], files["Encounter.2"] = encounters[::2], encounters[1::2]
+    for name, lines in files.items():
+        (directory / f"{name}.ndjson").write_text("\n".join(lines) + "\n")
+
+
+def test_bulk_export_matches_bundle_features(fhir_glob, tmp_path):
+    bundles = load_fhir_bundles(fhir_glob)
+    bulk_dir = tmp_path / "bulk"
+    bulk_dir.mkdir()
+    _write_bulk_export(bundles, bulk_dir)
+    expected = {row["patient_id"]: row for row in map(bundle_to_features, bundles)}
+    labels = {pid: row["readmitted_30d"] for pid, row in expected.items()}
+
+    stats = {}
+    rows = list(iter_bulk_feature_rows(bulk_dir, labels=labels, stats=stats))
+
+    assert {row["patient_id"]: row for row in rows} == expected
+    assert stats["Patient"] == len(bundles)
+    assert stats["Observation"] == 3 * len(bundles)
+    assert len(build_bulk_dataset(bulk_dir, labels=labels)) == len(bundles)
+
+
+def _write_encounter_export(directory, periods):
+    """Bulk export of patients with only the given encounter periods."""
+    patients = [
+        {"resourceType": "Patient", "id": pid, "birthDate": "1960-01-01"}
+        for pid in periods
+    ]
+    (directory / "Patient.ndjson").write_text("\n".join(map(json.dumps, patients)))
+    (directory / "Encounter.ndjson").write_text(
+        "\n".join(
+            json.dumps(
+                {
+                    "resourceType": "Encounter",
+                    "subject": {"reference": f"Patient/{pid}"},
+                    "period": {"start": start, "end": end},
+                }
+            )
+            for pid, spans in periods.items()
+            for start, end in reversed(spans)
+        )
+    )
+
+
+def test_bulk_export_derives_readmission_labels(tmp_path):
+    periods = {
+        "a": [("2024-01-01", "2024-01-05"), ("2024-01-20", "2024-01-22")],
+        "b": [("2024-01-01", "2024-01-05"), ("2024-04-01", "2024-04-03")],
+    }
+    _write_encounter_export(tmp_path, periods)
+
+    rows = {row["patient_id"]: row for row in iter_bulk_feature_rows(tmp_path)}
+
+    assert rows["a"]["readmitted_30d"] is True
+    assert rows["b"]["readmitted_30d"] is False
+    assert rows["a"]["avg_los"] == 3.0
+    assert rows["a"]["creatinine"] is None
+
+
+@pytest.mark.parametrize(
+    "spans, readmitted",
+    [
+        # Overlapping encounters are one stay
+        ([("2024-01-01", "2024-01-10"), ("2024-01-05", "2024-01-12")], False),
+        # Back-to-back (same-day transfer): zero-day gap
+        (
+            [
+                ("2024-01-01T08:00", "2024-01-05T10:00"),
+                ("2024-01-05T14:00", "2024-01-08"),
+            ],
+            False,
+        ),
+        ([("2024-01-01", "2024-01-05"), ("2024-01-06", "2024-01-08")], True),
+        ([("2024-01-01", "2024-01-05"), ("2024-02-04", "2024-02-06")], True),
+        ([("2024-01-01", "2024-01-05"), ("2024-02-05", "2024-02-06")], False),
+    ],
+)
+def test_derived_label_requires_positive_gap(tmp_path, spans, readmitted):
+    _write_encounter_export(tmp_path, {"p": spans})
+    (row,) = iter_bulk_feature_rows(tmp_path)
+    assert row["readmitted_30d"] is readmitted
+
+
+def test_feature_cache_parses_only_changed_bundles(tmp_path):
+    bundle_dir = tmp_path / "fhir"
+    bundle_dir.mkdir()
+    _write_bundles(bundle_dir, 12)
+    fhir_glob = str(bundle_dir / "*.json")
+    cache = FeatureCache(str(tmp_path / "cache.parquet"))
+
+    cold = cache.build(fhir_glob, workers=1)
+    assert cache.stats == {"hits": 0, "misses": 12, "evicted": 0}
+    pd.testing.assert_frame_equal(cold, build_dataset(fhir_glob, workers=1))
+
+    # Modify one bundle, delete another, add a new one
+    changed = bundle_dir / "patient-0.json"
+    bundle = json.loads(changed.read_text())
+    bundle["readmission_label"] = 1 - bundle["readmission_label"]
+    changed.write_text(json.dumps(bundle) + "\n")
+    (bundle_dir / "patient-1.json").unlink()
+    (bundle_dir / "patient-99.json").write_text(
+        (bundle_dir / "patient-2.json").read_text()
+    )
+
+    warm = cache.build(fhir_glob, workers=1)
+    assert cache.stats == {"hits": 10, "misses": 2, "evicted": 1}
+    pd.testing.assert_frame_equal(warm, build_dataset(fhir_glob, workers=1))
+
+    cache.build(fhir_glob, workers=1)
+    assert cache.stats == {"hits": 12, "misses": 0, "evicted": 0}
+
+
+def test_feature_cache_hash_mode_survives_touch(tmp_path):
+    bundle_dir = tmp_path / "fhir"
+    bundle_dir.mkdir()
+    _write_bundles(bundle_dir, 5)
+    fhir_glob = str(bundle_dir / "*.json")
+    cache = FeatureCache(str(tmp_path / "cache.parquet"), verify="hash")
+    cache.build(fhir_glob, workers=1)
+
+    touched = bundle_dir / "patient-3.json"
+    os.utime(touched, ns=(0, 0))
+
+    cache.build(fhir_glob, workers=1)
+    assert cache.stats == {"hits": 5, "misses": 0, "evicted": 0}
@@ -0,0 +1,72 @@
+"""
+Equivalence tests for the pandas-free inference fast path.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from pipeline.feature_engineering import FeaturePipeline, prepare_features
+from pipeline.inference import FastPathScorer, best_iteration_range
+from pipeline.schema.data_schema import patient_feature_schema, record_violations
+
+
+@pytest.fixture(scope="module")
+def artifacts():
+    if not (
+        os.path.exists("readmission_model.json")
+        and os.path.exists("feature_pipeline.json")
+    ):
+        pytest.skip("Model artifacts do not exist. Run training first.")
+    booster = xgb.Booster()
+    booster.load_model("readmission_model.json")
+    return booster, FeaturePipeline.load("feature_pipeline.json")
+
+
+def _patients(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "age": rng.integers(18, 90, n),
+            "gender": rng.integers(0, 2, n),
+            "num_encounters": rng.integers(1, 10, n),
+            "avg_los": rng.uniform(1, 15, n),
+            "creatinine": rng.uniform(0.5, 3.0, n),
+            "heart_rate": rng.uniform(60, 120, n),
+            "systolic_bp": rng.uniform(100, 180, n),
+        }
+    )
+
+
+def test_fast_path_matches_dataframe_path(artifacts):
+    booster, feature_pipeline = artifacts
+    scorer = FastPathScorer(booster, feature_pipeline)
+
+    for row in _patients(200).to_dict("records"):
+        # Reference: the original DataFrame -> prepare_features -> DMatrix path
+        df = prepare_features(patient_feature_schema.validate(pd.DataFrame([row])))
+        prediction = booster.predict(
+            xgb.DMatrix(df), iteration_range=best_iteration_range(booster)
+        )
+        expected = float(prediction[0])
+
+        assert scorer.predict(row) == pytest.approx(expected, abs=1e-6)
+
+
+def test_record_violations_agree_with_pandera():
+    rows = _patients(300, seed=1)
+    rows.loc[::10, "age"] = 150
+    rows.loc[::15, "heart_rate"] = 10.0
+    rows.loc[::20, "gender"] = 3
+
+    for row in rows.to_dict("records"):
+        frame = pd.DataFrame([row])
+        try:
+            patient_feature_schema.validate(frame)
+            pandera_ok = True
+        except Exception:
+            pandera_ok = False
+        assert (record_violations(row) == []) == pandera_ok
@@ -0,0 +1,123 @@
+"""
+Unit tests for the asynchronous lineage writer and reader.
+"""
+
+import datetime
+import os
+import time
+
+from pipeline.monitor.lineage import (
+    LineageWriter,
+    build_lineage_record,
+    log_lineage,
+    read_lineage,
+)
+
+
+def _features(i):
+    return {"age": 50 + i, "gender": i % 2, "heart_rate": 80.0}
+
+
+def test_lineage_writer_batches_rotates_and_reads_back(tmp_path):
+    writer = LineageWriter(
+        directory=tmp_path, batch_size=10, max_file_bytes=1024, fsync="always"
+    )
+    records = [
+        log_lineage(_features(i), 0.1 * (i % 10), "v1", sink=writer) for i in range(50)
+    ]
+    writer.stop()
+
+    assert writer.written == 50
+    assert writer.dropped == 0
+    assert len(os.listdir(tmp_path)) > 1  # rotated by size
+
+    stored = list(read_lineage(tmp_path))
+    assert [r["input_hash"] for r in stored] == [r["input_hash"] for r in records]
+
+    target = records[7]["input_hash"]
+    assert [r["inputs"] for r in read_lineage(tmp_path, input_hash=target)] == [
+        _features(7)
+    ]
+
+
+def test_read_lineage_filters_by_time(tmp_path):
+    writer = LineageWriter(directory=tmp_path, fsync="never")
+    writer.submit(build_lineage_record(_features(0), 0.2, "v1"))
+    writer.stop()
+
+    now = datetime.datetime.utcnow()
+    hour = datetime.timedelta(hours=1)
+    assert len(list(read_lineage(tmp_path, start=now - hour, end=now + hour))) == 1
+    assert list(read_lineage(tmp_path, start=(now + hour).isoformat())) == []
+
+
+def test_read_lineage_accepts_offset_aware_bounds(tmp_path):
+    writer = LineageWriter(directory=tmp_path, fsync="never")
+    writer.submit(build_lineage_record(_features(0), 0.2, "v1"))
+    writer.stop()
+
+    now = datetime.datetime.now(datetime.timezone.utc)
+    hour = datetime.timedelta(hours=1)
+    start = (now - hour).isoformat().replace("+00:00", "Z")
+    assert len(list(read_lineage(tmp_path, start=start))) == 1
+    # A bound in another offset is compared as the same instant in UTC
+    ahead = (now + hour).astimezone(datetime.timezone(datetime.timedelta(hours=2)))
+    assert len(list(read_lineage(tmp_path, start=now - hour, end=ahead))) == 1
+    assert list(read_lineage(tmp_path, end=(now - hour).isoformat())) == []
+
+
+def test_lineage_writer_drops_when_queue_full(tmp_path):
+    writer = LineageWriter(directory=tmp_path, max_queue=2, autostart=False)
+
+    accepted = [
+        writer.submit(build_lineage_record(_features(i), 0.5, "v1")) for i in range(3)
+    ]
+
+    assert accepted == [True, True, False]
+    assert writer.dropped == 1
+
+    writer.start()
+    writer.stop()
+    assert writer.written == 2
+
+
+def _wait_written(writer, n, timeout=5.0):
+    deadline = time.time() + timeout
+    while writer.written < n and time.time() < deadline:
+        time.sleep(0.005)
+    assert writer.written == n
+
+
+def test_read_lineage_with_writers_sharing_a_directory(tmp_path):
+    a = LineageWriter(
+        directory=tmp_path, fsync="never", flush_interval=0.01, writer_id="a"
+    )
+    b = LineageWriter(
+        directory=tmp_path, fsync="never", flush_interval=0.01, writer_id="b"
+    )
+    try:
+        a.submit(build_lineage_record(_features(0), 0.1, "v1"))
+        _wait_written(a, 1)
+        time.sleep(0.01)
+        b.submit(build_lineage_record(_features(1), 0.2, "v1"))  # newer file
+        _wait_written(b, 1)
+        time.sleep(0.01)
+        start = datetime.datetime.now(datetime.timezone.utc)
+        # Still appended to a's older file
+        a.submit(build_lineage_record(_features(2), 0.3, "v1"))
+        _wait_written(a, 2)
+    finally:
+        a.stop()
+        b.stop()
+
+    assert [r["inputs"] for r in read_lineage(tmp_path, start=start)] == [_features(2)]
+    assert [r["inputs"]["age"] for r in read_lineage(tmp_path)] == [50, 51, 52]
+
+
+def test_stop_does_not_hang_on_a_full_queue(tmp_path):
+    writer = LineageWriter(directory=tmp_path, max_queue=1, autostart=False)
+    writer.submit(build_lineage_record(_features(0), 0.5, "v1"))
+
+    started = time.monotonic()
+    writer.stop(timeout=1.0)
+    assert time.monotonic() - started < 1.0
@@ -8,8 +8,10 @@ import numpy as np
 import os
 import tempfile
 import shutil
-from pipeline.model import train_model, load_model
-from pipeline.feature_engineering import prepare_features
+from pipeline.inference import best_iteration_range
+from pipeline.model import MODEL_PATH, train_model, train_model_out_of_core, load_model
+from pipeline.feature_engineering import FeaturePipeline, prepare_features
+from pipeline.storage import load_frame, save_frame
 
 
 @pytest.fixture
@@ -64,7 +66,9 @@ def test_train_model_basic(sample_data, temp_mlruns):
 
     assert model is not None
     assert os.path.exists("readmission_model.json")
-    assert os.path.exists("data/training_snapshot.csv")
+    assert os.path.exists("data/training_snapshot.parquet")
+    assert os.path.exists("reference_profile.json")
+    assert os.path.exists("feature_pipeline.json")
 
 
 def test_model_metrics_exist(sample_data, temp_mlruns):
@@ -106,6 +110,56 @@ def test_model_metrics_exist(sample_data, temp_mlruns):
     assert 0 <= metrics["F1"] <= 1
 
 
+def test_early_stopping_records_best_iteration(sample_data, temp_mlruns):
+    """Noise labels stop early; the artifact keeps the best iteration."""
+    import xgboost as xgb
+
+    model = train_model(sample_data, tune=False, early_stopping_rounds=5, max_bin=64)
+
+    saved = xgb.Booster(model_file=MODEL_PATH)
+    config = saved.save_config()
+    best_iteration = int(saved.attributes()["best_iteration"])
+
+    assert '"name":"binary:logistic"' in config.replace(" ", "")
+    assert saved.num_boosted_rounds() <= best_iteration + 6 < 200
+    assert best_iteration_range(saved) == (0, best_iteration + 1)
+
+    X = prepare_features(sample_data).drop(columns=["patient_id", "readmitted_30d"])
+    full = model.predict(xgb.DMatrix(X))
+    best = model.predict(xgb.DMatrix(X), iteration_range=best_iteration_range(model))
+    inplace = model.inplace_predict(X, iteration_range=best_iteration_range(model))
+    np.testing.assert_allclose(inplace, best, rtol=1e-6)
+    if saved.num_boosted_rounds() > best_iteration + 1:
+        assert not np.allclose(full, best)
+
+
+def test_best_iteration_range_without_early_stopping():
+    import xgboost as xgb
+
+    X = np.random.default_rng(0).normal(size=(50, 3))
+    booster = xgb.train({}, xgb.DMatrix(X, label=X[:, 0]), num_boost_round=3)
+    assert best_iteration_range(booster) == (0, 0)
+
+
+@pytest.mark.parametrize("matrix", ["quantile", "external"])
+def test_train_model_out_of_core(sample_data, temp_mlruns, tmp_path, matrix):
+    """Training from a Parquet file in batches writes the same artifacts."""
+    import xgboost as xgb
+
+    path = save_frame(sample_data, str(tmp_path / "dataset.parquet"))
+
+    model = train_model_out_of_core(path, tune=False, matrix=matrix, batch_rows=30)
+
+    pipeline = FeaturePipeline.load("feature_pipeline.json")
+    snapshot = load_frame("data/training_snapshot.parquet")
+    assert pipeline.to_dict() == FeaturePipeline().fit(sample_data).to_dict()
+    assert list(snapshot.columns) == pipeline.feature_columns + ["readmitted_30d"]
+    assert 0 < len(snapshot) < len(sample_data)
+    assert os.path.exists("reference_profile.json")
+    saved = xgb.Booster(model_file=MODEL_PATH)
+    assert saved.num_boosted_rounds() == model.num_boosted_rounds()
+
+
 def test_load_model():
     """Test that model can be loaded."""
     if os.path.exists("readmission_model.json"):
@@ -128,3 +182,48 @@ def test_feature_engineering(sample_data):
     # Check that original features are still present
     assert "age" in df.columns
     assert "creatinine" in df.columns
+
+
+def test_feature_pipeline_matches_prepare_features(sample_data, tmp_path):
+    """The fitted NumPy pipeline reproduces prepare_features on training data."""
+    data = sample_data.copy()
+    data.loc[::7, "creatinine"] = np.nan
+    data.loc[::11, "avg_los"] = np.nan
+
+    pipeline = FeaturePipeline().fit(data)
+    expected = prepare_features(data).drop(columns=["patient_id", "readmitted_30d"])
+
+    assert pipeline.feature_columns == list(expected.columns)
+    np.testing.assert_allclose(
+        pipeline.transform(data), expected.to_numpy(dtype=np.float32), rtol=1e-6
+    )
+
+    # Serving-time rows are imputed with training medians, not their own
+    loaded = FeaturePipeline.load(pipeline.save(tmp_path / "feature_pipeline.json"))
+    row = data.iloc[[0]].drop(columns=["patient_id", "readmitted_30d"])
+    row["creatinine"] = np.nan
+    out = np.empty((1, len(loaded.feature_columns)), dtype=np.float32)
+    features = loaded.transform(row, out=out)
+
+    creatinine = loaded.feature_columns.index("creatinine")
+    assert features is not None and np.shares_memory(features, out)
+    assert features[0, creatinine] == np.float32(data["creatinine"].median())
+
+
+def test_feature_pipeline_rejects_bad_out_buffer(sample_data):
+    """A preallocated buffer of the wrong size or dtype is refused up front."""
+    pipeline = FeaturePipeline().fit(sample_data)
+    rows = sample_data.head(4)
+    width = len(pipeline.feature_columns)
+
+    for out in (
+        np.empty((3, width), dtype=np.float32),
+        np.empty((4, width + 1), dtype=np.float32),
+        np.empty((4, width), dtype=np.float64),
+    ):
+        with pytest.raises(ValueError, match="out must"):
+            pipeline.transform(rows, out=out)
+
+    # A taller buffer is fine; only the first rows are written
+    out = np.zeros((8, width), dtype=np.float32)
+    assert pipeline.transform(rows, out=out).shape == (4, width)
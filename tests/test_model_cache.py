@@ -0,0 +1,150 @@
+"""
+Tests for the local content-addressed model cache and cached model loading.
+"""
+
+import os
+
+import mlflow
+import numpy as np
+import pytest
+
+from pipeline import model as model_module
+from pipeline.feature_engineering import FeaturePipeline
+from pipeline.monitor.drift import build_reference_profile, save_reference_profile
+from pipeline.model_cache import ModelCache
+from tests.test_model_watcher import train
+from tests.test_out_of_core import make_dataset
+
+
+@pytest.fixture
+def data():
+    df = make_dataset(n=300)
+    return df, FeaturePipeline().fit(df)
+
+
+@pytest.mark.parametrize("fmt", ["ubj", "json"])
+def test_cache_round_trip_predicts_the_same(data, tmp_path, fmt):
+    df, pipeline = data
+    booster = train(df, pipeline, 10)
+    cache = ModelCache(str(tmp_path), fmt=fmt)
+
+    assert cache.get("risk", "1") is None
+    ref = cache.put("risk", "1", booster, pipeline)
+    assert os.path.exists(tmp_path / "blobs" / f"{ref['model']}.{fmt}")
+
+    cached_booster, cached_pipeline = cache.get("risk", "1")
+    X = pipeline.transform(df)
+    np.testing.assert_allclose(
+        cached_booster.inplace_predict(X), booster.inplace_predict(X), rtol=1e-6
+    )
+    assert cached_pipeline.to_dict() == pipeline.to_dict()
+    assert cache.stats == {"hits": 1, "misses": 1, "corrupt": 0}
+
+
+def test_corrupt_blob_is_evicted(data, tmp_path):
+    df, pipeline = data
+    cache = ModelCache(str(tmp_path))
+    booster = train(df, pipeline, 5)
+    ref = cache.put("risk", "1", booster)
+    blob = tmp_path / "blobs" / f"{ref['model']}.ubj"
+    with open(blob, "r+b") as f:
+        f.write(b"garbage")
+
+    assert cache.get("risk", "1") is None
+    assert cache.stats["corrupt"] == 1
+    assert not os.path.exists(tmp_path / "refs" / "risk" / "1.json")
+    assert not os.path.exists(blob)
+
+    # Re-caching the same model (same sha) replaces the bad blob
+    cache.put("risk", "1", booster)
+    assert cache.get("risk", "1") is not None
+    assert cache.stats == {"hits": 1, "misses": 1, "corrupt": 1}
+
+
+def test_put_rewrites_a_corrupt_blob_it_would_reuse(data, tmp_path):
+    df, pipeline = data
+    cache = ModelCache(str(tmp_path))
+    booster = train(df, pipeline, 5)
+    ref = cache.put("risk", "1", booster)
+    with open(tmp_path / "blobs" / f"{ref['model']}.ubj", "r+b") as f:
+        f.write(b"garbage")
+
+    # A second version with the same model bytes must not trust the bad file
+    cache.put("risk", "2", booster)
+    assert cache.get("risk", "2") is not None
+
+
+def test_stage_version(tmp_path):
+    cache = ModelCache(str(tmp_path))
+    assert cache.stage_version("risk", "Production") is None
+    cache.set_stage("risk", "Production", 3)
+    assert cache.stage_version("risk", "Production") == "3"
+
+
+def test_cached_version_is_not_downloaded(data, tmp_path, monkeypatch):
+    df, pipeline = data
+    booster = train(df, pipeline, 5)
+    cache = ModelCache(str(tmp_path))
+    cache.put("risk", "2", booster, pipeline)
+
+    def fail(**kwargs):
+        raise AssertionError("cached model was downloaded")
+
+    monkeypatch.setattr(mlflow.artifacts, "download_artifacts", fail)
+    timings = {}
+    loaded, loaded_pipeline = model_module.load_registered_model(
+        "risk", "2", cache, timings
+    )
+    assert loaded.num_boosted_rounds() == 5
+    assert loaded_pipeline.to_dict() == pipeline.to_dict()
+    assert set(timings) == {"cache"}
+
+
+def test_unreachable_registry_serves_last_cached_stage(data, tmp_path, monkeypatch):
+    df, pipeline = data
+    cache = ModelCache(str(tmp_path))
+    cache.put("risk", "4", train(df, pipeline, 7), pipeline)
+    cache.set_stage("risk", "Production", "4")
+
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("tracking server down")
+
+    monkeypatch.setattr(model_module, "registered_version", unreachable)
+    booster, _, version = model_module.load_model_artifacts(
+        "risk", "Production", cache=cache
+    )
+    assert version == "4"
+    assert booster.num_boosted_rounds() == 7
+
+
+def test_registry_load_fills_the_cache(data, tmp_path, monkeypatch):
+    df, pipeline = data
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MLFLOW_TRACKING_URI", f"file://{tmp_path}/mlruns")
+    mlflow.end_run()
+    mlflow.set_experiment("model-cache")
+    # Registered the way training does: the model file itself is the source
+    train(df, pipeline, 6).save_model(model_module.MODEL_PATH)
+    pipeline.save(model_module.FEATURE_PIPELINE_PATH)
+    profile = build_reference_profile(df[["age", "creatinine"]])
+    save_reference_profile(profile, model_module.REFERENCE_PROFILE_PATH)
+    with mlflow.start_run() as run:
+        mlflow.log_artifact(model_module.MODEL_PATH)
+        mlflow.log_artifact(model_module.FEATURE_PIPELINE_PATH)
+        mlflow.log_artifact(model_module.REFERENCE_PROFILE_PATH)
+    mlflow.register_model(f"runs:/{run.info.run_id}/{model_module.MODEL_PATH}", "risk")
+
+    cache = ModelCache(str(tmp_path / "cache"))
+    cold, warm = {}, {}
+    booster, _, version = model_module.load_model_artifacts(
+        "risk", None, cache=cache, timings=cold
+    )
+    cached, cached_pipeline, _ = model_module.load_model_artifacts(
+        "risk", None, cache=cache, timings=warm
+    )
+    assert version == "1" and "download" in cold and "download" not in warm
+    assert cache.stats == {"hits": 1, "misses": 1, "corrupt": 0}
+    assert cached.save_raw("json") == booster.save_raw("json")
+    assert cached_pipeline.to_dict() == pipeline.to_dict()
+    # The reference profile comes from the training run that logged the model
+    assert model_module.load_registered_reference_profile("risk", version) == profile
@@ -0,0 +1,45 @@
+"""
+Unit tests for the in-process live metrics aggregator.
+"""
+
+import numpy as np
+import pytest
+
+from pipeline.monitor.model_health import LiveMetricsAggregator
+
+
+def test_aggregator_matches_numpy_statistics():
+    rng = np.random.default_rng(0)
+    probs = rng.uniform(size=1000)
+
+    aggregator = LiveMetricsAggregator(autostart=False)
+    aggregator.update(probs[0])
+    for chunk in np.array_split(probs[1:], 7):
+        aggregator.update(chunk)
+
+    stats = aggregator.snapshot()
+    assert stats["count"] == 1000
+    assert stats["mean"] == pytest.approx(probs.mean())
+    assert stats["variance"] == pytest.approx(probs.var())
+    assert stats["histogram"] == np.histogram(probs, bins=10, range=(0, 1))[0].tolist()
+
+
+def test_aggregator_flushes_to_one_mlflow_run(tmp_path):
+    import mlflow
+
+    tracking_uri = f"file://{tmp_path}"
+    aggregator = LiveMetricsAggregator(tracking_uri=tracking_uri, autostart=False)
+
+    aggregator.update([0.2, 0.4])
+    aggregator.flush()
+    aggregator.update(0.9)
+    aggregator.stop()
+
+    client = mlflow.tracking.MlflowClient(tracking_uri=tracking_uri)
+    experiment = client.get_experiment_by_name("Default")
+    runs = client.search_runs([experiment.experiment_id])
+
+    assert len(runs) == 1
+    history = client.get_metric_history(runs[0].info.run_id, "live_prediction_count")
+    assert [m.value for m in history] == [2.0, 3.0]
+    assert runs[0].data.metrics["live_average_confidence"] == pytest.approx(0.5)
@@ -0,0 +1,180 @@
+"""
+Tests for hot-swapping the served model.
+"""
+
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from api.model_watcher import DirectorySource, ModelWatcher, ServedModel
+from pipeline.feature_engineering import FeaturePipeline
+from pipeline.inference import best_iteration_range
+from pipeline.monitor.drift import build_reference_profile, save_reference_profile
+from tests.test_out_of_core import make_dataset
+
+
+@pytest.fixture
+def data():
+    df = make_dataset(n=300)
+    pipeline = FeaturePipeline().fit(df)
+    return df, pipeline
+
+
+def train(df, pipeline, rounds):
+    dtrain = xgb.DMatrix(
+        pipeline.transform(df),
+        label=df["readmitted_30d"],
+        feature_names=pipeline.feature_columns,
+    )
+    return xgb.train({"max_depth": 3}, dtrain, rounds)
+
+
+def publish(directory, version, booster, pipeline=None, mtime=None, profile=None):
+    path = os.path.join(directory, version)
+    os.makedirs(path)
+    if pipeline is not None:
+        pipeline.save(os.path.join(path, "feature_pipeline.json"))
+    if profile is not None:
+        save_reference_profile(profile, os.path.join(path, "reference_profile.json"))
+    model_file = os.path.join(path, "readmission_model.json")
+    booster.save_model(model_file)
+    if mtime is not None:
+        os.utime(model_file, ns=(mtime, mtime))
+
+
+def test_served_model_scores_like_the_booster(data):
+    df, pipeline = data
+    booster = train(df, pipeline, 10)
+    served = ServedModel(booster, pipeline, "v1", fast_path=True).warm_up()
+
+    rows = df.drop(columns=["patient_id", "readmitted_30d"])
+    expected = booster.inplace_predict(
+        pipeline.transform(rows), iteration_range=best_iteration_range(booster)
+    )
+    np.testing.assert_allclose(served.predict_rows(rows), expected, rtol=1e-6)
+    assert served.fast_scorer.predict(rows.iloc[0]) == pytest.approx(expected[0])
+
+
+def test_feature_frame_matches_the_training_features(data):
+    df, pipeline = data
+    served = ServedModel(train(df, pipeline, 2), pipeline, "v1")
+    rows = df.drop(columns=["patient_id", "readmitted_30d"]).head(20)
+
+    frame = served.feature_frame(rows)
+    assert list(frame.columns) == pipeline.feature_columns
+    np.testing.assert_array_equal(frame.to_numpy(), pipeline.transform(rows))
+
+
+def test_watcher_swaps_in_newer_directory_versions(data, tmp_path):
+    df, pipeline = data
+    rows = df.drop(columns=["patient_id", "readmitted_30d"]).head(5)
+    watcher = ModelWatcher(DirectorySource(str(tmp_path)), autostart=False)
+
+    assert watcher.check() is False and watcher.current is None
+
+    publish(tmp_path, "v1", train(df, pipeline, 2), pipeline, mtime=1_000)
+    assert watcher.check() is True
+    first = watcher.current
+    assert first.version == "v1"
+    assert watcher.check() is False and watcher.current is first
+
+    v2 = train(df, pipeline, 20)
+    publish(tmp_path, "v2", v2, pipeline, mtime=2_000)
+    assert watcher.check() is True
+    assert watcher.current.version == "v2"
+    np.testing.assert_allclose(
+        watcher.current.predict_rows(rows),
+        v2.inplace_predict(pipeline.transform(rows)),
+        rtol=1e-6,
+    )
+    # A request that read the old reference still scores with v1
+    assert first.version == "v1" and first.booster.num_boosted_rounds() == 2
+
+
+def test_failed_load_keeps_serving_current_version(data, tmp_path):
+    df, pipeline = data
+    publish(tmp_path, "v1", train(df, pipeline, 2), pipeline, mtime=1_000)
+    watcher = ModelWatcher(DirectorySource(str(tmp_path)), autostart=False)
+    watcher.check()
+
+    broken = tmp_path / "v2"
+    broken.mkdir()
+    (broken / "readmission_model.json").write_text("{not a model")
+    with pytest.raises(xgb.core.XGBoostError):
+        watcher.check()
+    assert watcher.current.version == "v1"
+
+
+def test_version_without_feature_pipeline_is_rejected(data, tmp_path):
+    df, pipeline = data
+    publish(tmp_path, "v1", train(df, pipeline, 2), pipeline, mtime=1_000)
+    watcher = ModelWatcher(DirectorySource(str(tmp_path)), autostart=False)
+    watcher.check()
+
+    publish(tmp_path, "v2", train(df, pipeline, 20), mtime=2_000)
+    with pytest.raises(ValueError, match="no feature pipeline"):
+        watcher.check()
+    assert watcher.current.version == "v1"
+
+
+def test_reference_profile_is_swapped_with_the_model(data, tmp_path):
+    df, pipeline = data
+    X = pd.DataFrame(pipeline.transform(df), columns=pipeline.feature_columns)
+    profile_v1 = build_reference_profile(X)
+    profile_v2 = build_reference_profile(X * 2)
+    swapped = []
+    watcher = ModelWatcher(
+        DirectorySource(str(tmp_path)), autostart=False, on_swap=swapped.append
+    )
+
+    publish(tmp_path, "v1", train(df, pipeline, 2), pipeline, 1_000, profile_v1)
+    watcher.check()
+    assert watcher.current.reference_profile == profile_v1
+
+    publish(tmp_path, "v2", train(df, pipeline, 5), pipeline, 2_000, profile_v2)
+    watcher.check()
+    assert watcher.current.reference_profile == profile_v2
+    assert [served.version for served in swapped] == ["v1", "v2"]
+
+    # A version shipped without a profile has nothing to measure drift against
+    publish(tmp_path, "v3", train(df, pipeline, 5), pipeline, 3_000)
+    watcher.check()
+    assert watcher.current.reference_profile is None
+
+
+def test_background_thread_picks_up_new_version(data, tmp_path):
+    df, pipeline = data
+    publish(tmp_path, "v1", train(df, pipeline, 2), pipeline)
+    watcher = ModelWatcher(DirectorySource(str(tmp_path)), interval_seconds=0.05)
+    try:
+        for _ in range(100):
+            if watcher.current is not None:
+                break
+            watcher._stopped.wait(0.05)
+    finally:
+        watcher.stop()
+    assert watcher.current.version == "v1"
+
+
+def test_stop_does_not_wait_forever_for_a_hung_load():
+    release = threading.Event()
+
+    class HungSource:
+        def latest_version(self):
+            release.wait()  # e.g. a registry call that never returns
+            return None
+
+    watcher = ModelWatcher(HungSource(), interval_seconds=0.05)
+    try:
+        start = time.perf_counter()
+        watcher.stop(timeout=0.1)
+        assert time.perf_counter() - start < 2.0
+        assert watcher._thread.is_alive()
+    finally:
+        release.set()
+        watcher.stop()
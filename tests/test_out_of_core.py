@@ -0,0 +1,102 @@
+"""
+Tests for out-of-core training inputs (batched Parquet -> XGBoost).
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost as xgb
+
+from pipeline.feature_engineering import FeaturePipeline
+from pipeline.out_of_core import (
+    BatchIter,
+    fit_feature_pipeline,
+    predict_split,
+    row_hashes,
+    split_mask,
+)
+from pipeline.storage import save_frame
+
+
+def make_dataset(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "patient_id": [f"P{i}" for i in range(n)],
+            "age": rng.integers(18, 90, n),
+            "gender": rng.integers(0, 2, n),
+            "num_encounters": rng.integers(1, 10, n),
+            "avg_los": rng.uniform(1, 15, n),
+            "creatinine": rng.uniform(0.5, 3.0, n),
+            "heart_rate": rng.uniform(60, 120, n),
+            "systolic_bp": rng.uniform(100, 180, n),
+            "readmitted_30d": rng.integers(0, 2, n),
+        }
+    )
+    df.loc[::7, "creatinine"] = np.nan
+    df.loc[::11, "avg_los"] = np.nan
+    return df
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """The same rows as one file and as a directory of part files."""
+    df = make_dataset()
+    save_frame(df, str(tmp_path / "dataset.parquet"), legacy_csv=False)
+    for i, start in enumerate(range(0, len(df), 250)):
+        part = tmp_path / "parts" / f"part-{i:03d}.parquet"
+        save_frame(df.iloc[start : start + 250], str(part), legacy_csv=False)
+    return df, tmp_path
+
+
+def test_fit_feature_pipeline_matches_in_memory_fit(dataset):
+    df, tmp_path = dataset
+    expected = FeaturePipeline().fit(df).to_dict()
+
+    assert fit_feature_pipeline(str(tmp_path / "dataset.parquet")).to_dict() == expected
+    assert fit_feature_pipeline(str(tmp_path / "parts")).to_dict() == expected
+
+
+def test_splits_are_disjoint_and_stable():
+    ids = [f"P{i}" for i in range(20000)]
+    hashes = row_hashes(ids)
+    masks = {s: split_mask(hashes, s) for s in ("train", "validation", "test")}
+
+    assert (sum(m.astype(int) for m in masks.values()) == 1).all()
+    assert masks["test"].mean() == pytest.approx(0.2, abs=0.02)
+    assert masks["validation"].mean() == pytest.approx(0.16, abs=0.02)
+    # A row's split depends on its id only, not on the batch it is read in
+    np.testing.assert_array_equal(row_hashes(ids[5000:6000]), hashes[5000:6000])
+    with pytest.raises(ValueError):
+        split_mask(hashes, "holdout")
+
+
+@pytest.mark.parametrize("matrix", ["quantile", "external"])
+def test_batch_iter_streams_prepared_split(dataset, matrix):
+    df, tmp_path = dataset
+    path = str(tmp_path / "parts")
+    pipeline = FeaturePipeline().fit(df)
+    train = df[split_mask(row_hashes(df["patient_id"]), "train")]
+
+    batches = BatchIter(
+        path,
+        pipeline,
+        "train",
+        batch_rows=100,
+        cache_prefix=str(tmp_path / "train.cache") if matrix == "external" else None,
+    )
+    if matrix == "quantile":
+        dtrain = xgb.QuantileDMatrix(batches, max_bin=64)
+    else:
+        dtrain = xgb.DMatrix(batches)
+
+    assert dtrain.num_row() == len(train)
+    assert dtrain.feature_names == pipeline.feature_columns
+    np.testing.assert_array_equal(dtrain.get_label(), train["readmitted_30d"])
+
+    booster = xgb.train({"tree_method": "hist", "max_bin": 64}, dtrain, 5)
+    labels, preds = predict_split(booster, path, pipeline, "train")
+    np.testing.assert_array_equal(labels, train["readmitted_30d"])
+    np.testing.assert_allclose(
+        preds, booster.inplace_predict(pipeline.transform(train)), rtol=1e-6
+    )
@@ -0,0 +1,87 @@
+"""
+Tests for the compiled schema validator, using pandera as the reference.
+"""
+
+import numpy as np
+import pandas as pd
+import pandera as pa
+from pandera import Column, DataFrameSchema
+from pandera.errors import SchemaErrors
+
+from pipeline.schema.data_schema import (
+    CompiledValidator,
+    patient_feature_schema,
+    patient_feature_validator,
+    record_violations,
+)
+
+
+def _random_batch(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "age": rng.integers(-10, 140, n),
+            "gender": rng.integers(0, 3, n),
+            "num_encounters": rng.integers(-2, 20, n),
+            "avg_los": rng.uniform(-1, 15, n),
+            "creatinine": rng.uniform(-0.5, 3.0, n),
+            "heart_rate": rng.uniform(20, 260, n),
+            "systolic_bp": rng.uniform(40, 260, n),
+        }
+    )
+    df.loc[df.sample(frac=0.05, random_state=seed).index, "creatinine"] = np.nan
+    return df
+
+
+def _pandera_failures(schema, df):
+    """Set of (row, column) pairs pandera flags, plus column-level failures."""
+    try:
+        schema.validate(df, lazy=True)
+    except SchemaErrors as err:
+        cases = err.failure_cases
+        rows = cases[cases["index"].notna()]
+        return (
+            {(int(i), c) for i, c in zip(rows["index"], rows["column"])},
+            set(cases[cases["index"].isna()]["column"]),
+        )
+    return set(), set()
+
+
+def _compiled_failures(validator, df):
+    result = validator.validate(df)
+    rows, cols = np.nonzero(result.mask)
+    failed_columns = {message.split(":")[0] for message in result.dtype_errors}
+    return {(int(r), result.columns[c]) for r, c in zip(rows, cols)}, failed_columns
+
+
+def test_compiled_validator_matches_pandera():
+    df = _random_batch(2000)
+    expected = _pandera_failures(patient_feature_schema, df)
+
+    assert expected[0], "batch should contain violations"
+    assert _compiled_failures(patient_feature_validator, df) == expected
+
+
+def test_compiled_validator_dtype_and_custom_checks():
+    schema = DataFrameSchema(
+        {
+            "a": Column(int, pa.Check.lt(10)),
+            "b": Column(float, pa.Check(lambda s: s % 2 == 0), nullable=True),
+        }
+    )
+    validator = CompiledValidator(schema)
+    df = pd.DataFrame({"a": [1.0, 20.0, 3.0], "b": [2.0, 3.0, np.nan]})
+
+    result = validator.validate(df)
+    assert result.dtype_errors == ["a: expected int64, got float64"]
+    assert _compiled_failures(validator, df) == _pandera_failures(schema, df)
+    assert result.invalid_rows.tolist() == [1]
+    assert not result.ok
+
+
+def test_row_errors_match_record_violations():
+    df = _random_batch(200, seed=3)
+    result = patient_feature_validator.validate(df)
+
+    for position, record in enumerate(df.to_dict(orient="records")):
+        assert result.row_errors(position) == record_violations(record)
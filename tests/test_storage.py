@@ -0,0 +1,46 @@
+"""
+Tests for typed columnar dataset storage.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline.storage import load_frame, save_frame
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(
+        {
+            "patient_id": ["a", "b", "c"],
+            "age": np.array([40, 55, 71], dtype=np.int64),
+            "gender": np.array([0, 1, 1], dtype=np.int64),
+            "creatinine": [1.1, np.nan, 2.4],
+            "readmitted_30d": [True, False, True],
+        }
+    )
+
+
+@pytest.mark.parametrize("name", ["snapshot.parquet", "snapshot.feather"])
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_columnar_round_trip_keeps_dtypes(tmp_path, frame, name, memory_map):
+    path = str(tmp_path / name)
+    save_frame(frame, path, legacy_csv=False)
+
+    loaded = load_frame(path, memory_map=memory_map)
+
+    pd.testing.assert_frame_equal(loaded, frame)
+    assert load_frame(path, columns=["age"]).columns.tolist() == ["age"]
+
+
+def test_legacy_csv_export(tmp_path, frame, monkeypatch):
+    path = str(tmp_path / "snapshot.parquet")
+    monkeypatch.setenv("EXPORT_LEGACY_CSV", "true")
+    save_frame(frame, path)
+
+    legacy = load_frame(str(tmp_path / "snapshot.csv"))
+    pd.testing.assert_frame_equal(legacy, frame)
+
+    with pytest.raises(ValueError):
+        save_frame(frame, str(tmp_path / "snapshot.xlsx"))
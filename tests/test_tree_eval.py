@@ -0,0 +1,113 @@
+"""
+Tests for the NumPy tree ensemble evaluator against Booster.predict.
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+import xgboost as xgb
+
+from pipeline.inference import best_iteration_range
+from pipeline.tree_eval import TreeEnsemble, compile_predictor
+
+
+def _features(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = np.column_stack(
+        [
+            rng.integers(18, 90, n),
+            rng.integers(0, 2, n),
+            rng.integers(1, 10, n),
+            rng.uniform(1, 15, n),
+            rng.uniform(0.5, 3.0, n),
+            rng.uniform(60, 120, n),
+            rng.uniform(100, 180, n),
+            rng.integers(0, 2, n),
+            rng.integers(0, 2, n),
+            rng.integers(0, 2, n),
+            rng.uniform(0, 5, n),
+        ]
+    ).astype(np.float32)
+    X[::9, 4] = np.nan  # exercise default directions
+    return X
+
+
+def test_tree_ensemble_matches_saved_model():
+    if not os.path.exists("readmission_model.json"):
+        pytest.skip("Model file does not exist. Run training first.")
+
+    booster = xgb.Booster()
+    booster.load_model("readmission_model.json")
+    ensemble = TreeEnsemble.load("readmission_model.json")
+    X = _features(2000)
+
+    # Like serving: trees up to the early-stopping best iteration, if any
+    expected = booster.predict(
+        xgb.DMatrix(X, feature_names=booster.feature_names),
+        iteration_range=best_iteration_range(booster),
+    )
+
+    np.testing.assert_allclose(ensemble.predict(X), expected, rtol=0, atol=1e-6)
+    predict_row = compile_predictor(ensemble)
+    for i in range(0, 2000, 50):
+        assert predict_row(X[i]) == pytest.approx(expected[i], abs=1e-6)
+
+
+def test_tree_ensemble_logistic_and_iteration_range(tmp_path):
+    X = _features(1000, seed=1)
+    y = (np.nan_to_num(X[:, 4]) > 1.5).astype(int)
+    y[::7] ^= 1
+    booster = xgb.train(
+        {"objective": "binary:logistic", "max_depth": 4, "tree_method": "hist"},
+        xgb.DMatrix(X, label=y),
+        num_boost_round=30,
+    )
+    booster.save_model(tmp_path / "model.json")
+    ensemble = TreeEnsemble.load(tmp_path / "model.json")
+    dmatrix = xgb.DMatrix(X)
+
+    np.testing.assert_allclose(
+        ensemble.predict(X), booster.predict(dmatrix), rtol=0, atol=1e-6
+    )
+    np.testing.assert_allclose(
+        ensemble.predict(X, iteration_range=(0, 10)),
+        booster.predict(dmatrix, iteration_range=(0, 10)),
+        rtol=0,
+        atol=1e-6,
+    )
+    predict_row = compile_predictor(ensemble)
+    assert predict_row(X[0]) == pytest.approx(booster.predict(dmatrix)[0], abs=1e-6)
+
+
+def test_iteration_range_zero_means_all_trees_like_xgboost():
+    X = _features(600, seed=2)
+    y = (np.nan_to_num(X[:, 4]) > 1.5).astype(int)
+    y[::5] ^= 1
+    dtrain = xgb.DMatrix(X[:400], label=y[:400])
+    dval = xgb.DMatrix(X[400:], label=y[400:])
+    booster = xgb.train(
+        {"objective": "binary:logistic", "max_depth": 4, "eta": 0.5},
+        dtrain,
+        num_boost_round=200,
+        evals=[(dval, "validation")],
+        early_stopping_rounds=3,
+        verbose_eval=False,
+    )
+    ensemble = TreeEnsemble(json.loads(booster.save_raw("json")))
+    assert ensemble.best_iteration + 1 < booster.num_boosted_rounds()
+
+    np.testing.assert_allclose(
+        ensemble.inplace_predict(X, iteration_range=(0, 0)),
+        booster.inplace_predict(X, iteration_range=(0, 0)),
+        rtol=0,
+        atol=1e-6,
+    )
+    # None is this evaluator's shorthand for the best iteration
+    np.testing.assert_allclose(
+        ensemble.predict(X),
+        booster.inplace_predict(X, iteration_range=best_iteration_range(booster)),
+        rtol=0,
+        atol=1e-6,
+    )
@@ -0,0 +1,84 @@
+"""
+Tests for Optuna hyperparameter tuning.
+"""
+
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+
+from pipeline import tuning
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(400, 5)), columns=list("abcde"))
+    y = (X["a"] + rng.normal(scale=0.5, size=400) > 0).astype(int)
+    return X, y
+
+
+def test_tune_hyperparams_returns_search_space(data, monkeypatch):
+    monkeypatch.setattr(tuning, "MAX_BOOST_ROUNDS", 120)
+    best = tuning.tune_hyperparams(*data, n_trials=3, storage="")
+
+    assert set(best) == {
+        "eta",
+        "max_depth",
+        "subsample",
+        "colsample_bytree",
+        "lambda",
+        "alpha",
+        "min_child_weight",
+        "num_boost_round",
+    }
+
+
+def test_study_resumes_from_storage(data, tmp_path, monkeypatch):
+    monkeypatch.setattr(tuning, "MAX_BOOST_ROUNDS", 120)
+    storage = f"sqlite:///{tmp_path / 'optuna.db'}"
+
+    tuning.tune_hyperparams(*data, n_trials=2, storage=storage, n_jobs=2)
+    tuning.tune_hyperparams(*data, n_trials=3, storage=storage)
+    tuning.tune_hyperparams(*data, n_trials=3, storage=storage)  # already done
+
+    study_name = tuning.tuning_study_name(*data)
+    study = optuna.load_study(study_name=study_name, storage=storage)
+    assert len(study.trials) == 3
+
+
+def test_stored_study_is_not_resumed_for_new_data(data, tmp_path, monkeypatch):
+    monkeypatch.setattr(tuning, "MAX_BOOST_ROUNDS", 120)
+    storage = f"sqlite:///{tmp_path / 'optuna.db'}"
+    X, y = data
+    X_new = X.assign(a=X["a"] * 2)
+
+    tuning.tune_hyperparams(X, y, n_trials=2, storage=storage)
+    tuning.tune_hyperparams(X_new, y, n_trials=2, storage=storage)
+
+    new_study = optuna.load_study(
+        study_name=tuning.tuning_study_name(X_new, y), storage=storage
+    )
+    assert len(new_study.trials) == 2
+    assert tuning.tuning_study_name(X_new, y) != tuning.tuning_study_name(X, y)
+
+    # An explicit name resumes whatever study has that name
+    tuning.tune_hyperparams(X, y, n_trials=2, storage=storage, study_name="shared")
+    tuning.tune_hyperparams(X_new, y, n_trials=2, storage=storage, study_name="shared")
+    assert len(optuna.load_study(study_name="shared", storage=storage).trials) == 2
+
+
+def test_pruning_callback_stops_training(data):
+    """Metric is reported every REPORT_INTERVAL rounds and pruning stops the trial."""
+
+    class PruneAfterTwentyRounds(optuna.pruners.BasePruner):
+        def prune(self, study, trial):
+            return trial.last_step is not None and trial.last_step >= 20
+
+    dtrain, dval, y_val = tuning.make_tuning_data(*data)
+    study = optuna.create_study(direction="maximize", pruner=PruneAfterTwentyRounds())
+    study.optimize(lambda t: tuning.objective(t, dtrain, dval, y_val), n_trials=1)
+
+    trial = study.trials[0]
+    assert trial.state == optuna.trial.TrialState.PRUNED
+    assert sorted(trial.intermediate_values) == [10, 20]